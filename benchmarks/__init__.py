@@ -0,0 +1 @@
+"""Benchmarks for Eagle MCP Server."""
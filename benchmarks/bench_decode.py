@@ -0,0 +1,110 @@
+"""Benchmark decoding and formatting of a large /api/item/list response.
+
+Compares the original path (``json.loads`` + recursive
+``clean_response_text`` + string concatenation) against the fast codec and
+typed struct decoding. Run from the repository root:
+
+    python -m benchmarks.bench_decode --items 100000
+"""
+
+import argparse
+import json
+import random
+import time
+
+from schemas.base import ItemListResponse
+from utils import json_codec
+from utils.encoding import clean_response_text, format_japanese_safe, get_display_name
+
+EXTENSIONS = ["jpg", "png", "gif", "webp", "psd", "mp4"]
+WORDS = ["風景", "ポートレート", "sunset", "architecture", "猫", "texture", "UI", "sketch"]
+
+
+def make_payload(count: int, seed: int = 0) -> bytes:
+    """Build a synthetic /api/item/list response body with ``count`` items."""
+    rng = random.Random(seed)
+    items = []
+    for i in range(count):
+        items.append({
+            "id": f"K{i:012d}",
+            "name": f"{rng.choice(WORDS)}_{i}",
+            "size": rng.randint(10_000, 50_000_000),
+            "ext": rng.choice(EXTENSIONS),
+            "tags": rng.sample(WORDS, rng.randint(0, 4)),
+            "folders": [f"F{rng.randint(0, 500):08d}"],
+            "isDeleted": False,
+            "url": "",
+            "annotation": "",
+            "modificationTime": 1_700_000_000_000 + i,
+            "height": rng.randint(100, 8000),
+            "width": rng.randint(100, 8000),
+            "lastModified": 1_700_000_000_000 + i,
+            "palettes": [{"color": [rng.randint(0, 255) for _ in range(3)], "ratio": 50}],
+        })
+    return json.dumps({"status": "success", "data": items}, ensure_ascii=False).encode("utf-8")
+
+
+def format_concat(items) -> str:
+    """Format items the way ``_search_items`` originally did."""
+    response = f"Found {len(items)} items:\n\n"
+    for item in items:
+        name = get_display_name(item, 'Unnamed Item')
+        response += f"- {name} ({item.get('ext', 'unknown')})\n"
+        response += f"  ID: {item.get('id', 'Unknown')}\n"
+        if item.get('tags'):
+            safe_tags = [format_japanese_safe(tag) for tag in item.get('tags', [])]
+            response += f"  Tags: {', '.join(safe_tags)}\n"
+        response += "\n"
+    return response
+
+
+def format_join(items) -> str:
+    """Format items by collecting chunks and joining once."""
+    parts = [f"Found {len(items)} items:\n\n"]
+    append = parts.append
+    for item in items:
+        append(f"- {get_display_name(item, 'Unnamed Item')} ({item.ext or 'unknown'})\n  ID: {item.id}\n")
+        if item.tags:
+            append(f"  Tags: {', '.join(format_japanese_safe(tag) for tag in item.tags)}\n")
+        append("\n")
+    return "".join(parts)
+
+
+def timed(label: str, func, repeat: int):
+    """Run ``func`` ``repeat`` times and report the best wall time."""
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<44} {best * 1000:>10.1f} ms")
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    
+    payload = make_payload(args.items)
+    print(f"Payload: {args.items} items, {len(payload) / 1_000_000:.1f} MB, codec backend: {json_codec.BACKEND}\n")
+    
+    baseline = timed("json.loads + clean_response_text",
+                     lambda: clean_response_text(json.loads(payload)), args.repeat)
+    timed("json_codec.loads", lambda: json_codec.loads(payload), args.repeat)
+    typed = timed("json_codec.decode_as(ItemListResponse)",
+                  lambda: json_codec.decode_as(payload, ItemListResponse), args.repeat)
+    print()
+    timed("format: += concatenation (dicts)", lambda: format_concat(baseline["data"]), args.repeat)
+    timed("format: list + join (structs)", lambda: format_join(typed.data), args.repeat)
+    print()
+    timed("total: original decode + format",
+          lambda: format_concat(clean_response_text(json.loads(payload))["data"]), args.repeat)
+    timed("total: typed decode + join format",
+          lambda: format_join(json_codec.decode_as(payload, ItemListResponse).data), args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""Benchmark small-call latency while a large image is being read.
+
+Reads one large file (an original) and, concurrently, keeps issuing small
+thumbnail reads. In ``blocking`` mode both are read with ``open().read()``
+on the event loop, as the image handler used to; in ``pool`` mode they go
+through ``utils.file_io.FileIO``. Reports small-call latency percentiles and
+the worst event-loop stall. Run from the repository root:
+
+    python -m benchmarks.bench_file_io --large-mb 200
+"""
+
+import argparse
+import asyncio
+import base64
+import os
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from utils.file_io import FileIO
+
+
+def _blocking_read_base64(path: str) -> str:
+    with open(path, "rb") as f:
+        return base64.b64encode(f.read()).decode("ascii")
+
+
+async def _loop_lag(stop: asyncio.Event, interval: float = 0.001) -> float:
+    """Return the longest delay of a periodic timer on the event loop."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def run(mode: str, large: str, small: str, file_io: FileIO, interval: float):
+    if mode == "pool":
+        async def read(path: str) -> str:
+            return await file_io.read_base64(path)
+    else:
+        async def read(path: str) -> str:
+            return _blocking_read_base64(path)
+    
+    stop = asyncio.Event()
+    lag = asyncio.ensure_future(_loop_lag(stop))
+    latencies = []
+    
+    async def small_calls():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await read(small)
+            latencies.append(time.perf_counter() - start)
+            await asyncio.sleep(interval)
+    
+    small_task = asyncio.ensure_future(small_calls())
+    await asyncio.sleep(interval)
+    start = time.perf_counter()
+    await read(large)
+    large_seconds = time.perf_counter() - start
+    stop.set()
+    await small_task
+    return large_seconds, latencies, await lag
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--large-mb", type=int, default=200)
+    parser.add_argument("--small-kb", type=int, default=64)
+    parser.add_argument("--interval-ms", type=float, default=5.0)
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--chunk-mb", type=float, default=4.0)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        large = Path(tmp) / "original.png"
+        small = Path(tmp) / "original_thumbnail.png"
+        large.write_bytes(os.urandom(args.large_mb * 1024 * 1024))
+        small.write_bytes(os.urandom(args.small_kb * 1024))
+        
+        file_io = FileIO(args.threads, int(args.chunk_mb * 1024 * 1024))
+        try:
+            for mode in ("blocking", "pool"):
+                large_seconds, latencies, lag = asyncio.run(
+                    run(mode, str(large), str(small), file_io, args.interval_ms / 1000)
+                )
+                latencies.sort()
+                p95 = latencies[int(len(latencies) * 0.95)] if latencies else 0.0
+                print(f"{mode:>8}: large read {large_seconds * 1000:7.0f} ms | "
+                      f"small calls n={len(latencies):4d} "
+                      f"p50 {statistics.median(latencies) * 1000 if latencies else 0:6.1f} ms "
+                      f"p95 {p95 * 1000:6.1f} ms max {max(latencies, default=0) * 1000:6.1f} ms | "
+                      f"worst loop stall {lag * 1000:6.1f} ms")
+        finally:
+            file_io.shutdown()
+
+
+if __name__ == "__main__":
+    main()
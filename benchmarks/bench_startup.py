@@ -0,0 +1,69 @@
+"""Benchmark server startup: time from process spawn to the ``initialize`` reply.
+
+Starts ``main.py`` over stdio, sends an MCP ``initialize`` request and measures
+how long the response takes. The Eagle health check runs in the background,
+so the result should not depend on whether Eagle is reachable. Run from the
+repository root:
+
+    python -m benchmarks.bench_startup --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+INITIALIZE = {
+    "jsonrpc": "2.0",
+    "id": 1,
+    "method": "initialize",
+    "params": {
+        "protocolVersion": "2025-03-26",
+        "capabilities": {},
+        "clientInfo": {"name": "bench_startup", "version": "0"},
+    },
+}
+
+
+def time_initialize(env: dict) -> float:
+    """Spawn the server once and return seconds until the initialize response."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "main.py"], cwd=REPO_ROOT, env=env,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+    )
+    try:
+        process.stdin.write((json.dumps(INITIALIZE) + "\n").encode())
+        process.stdin.flush()
+        response = json.loads(process.stdout.readline())
+        elapsed = time.perf_counter() - start
+        if response.get("id") != 1 or "result" not in response:
+            raise RuntimeError(f"Unexpected response: {response}")
+        return elapsed
+    finally:
+        process.kill()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--eagle-url", default="http://127.0.0.1:9",
+                        help="Eagle API URL (default: an unreachable port)")
+    args = parser.parse_args()
+    
+    env = dict(os.environ, EAGLE_API_URL=args.eagle_url, LOG_FILE="", CONFIG_RELOAD_INTERVAL="0")
+    timings = [time_initialize(env) for _ in range(args.runs)]
+    print(f"initialize response: median {statistics.median(timings) * 1000:.0f} ms, "
+          f"min {min(timings) * 1000:.0f} ms, max {max(timings) * 1000:.0f} ms "
+          f"over {args.runs} runs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""Benchmark MCP tools end to end against the Eagle simulator.
+
+Each tool is called through the real ``EagleMCPServer`` request handler
+(argument handling, registry dispatch, Eagle client, caches and formatting),
+with Eagle replaced by ``benchmarks.eagle_simulator``: in-process over
+``httpx.ASGITransport`` by default, or a running simulator with ``--url``.
+Reports latency percentiles, throughput and resident memory per tool. Run
+from the repository root:
+
+    python -m benchmarks.bench_tools --items 100000 --iterations 200 --concurrency 8
+"""
+
+import argparse
+import asyncio
+import random
+import resource
+import statistics
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import httpx
+from mcp.types import CallToolRequest, CallToolRequestParams
+
+from benchmarks.eagle_simulator import EagleSimulator, SyntheticLibrary
+from eagle_client import EagleClient
+from handlers.base import ErrorTextContent
+from main import EagleMCPServer
+
+ArgsFactory = Callable[[random.Random], Dict[str, Any]]
+
+
+def rss_mb() -> float:
+    """Current resident set size in MiB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def tool_cases(library: SyntheticLibrary) -> Dict[str, ArgsFactory]:
+    """Tool name -> factory of random arguments drawn from the library."""
+    item_ids = list(library.items)
+    folder_ids = list(library.folder_index)
+    keywords = ["夕焼け", "桜", "logo", "texture", "背景"]
+    return {
+        "item_search": lambda rng: {"keyword": rng.choice(keywords), "limit": 20},
+        "item_info": lambda rng: {"item_id": rng.choice(item_ids)},
+        "folder_list": lambda rng: {},
+        "folder_info": lambda rng: {"folder_id": rng.choice(folder_ids)},
+        "library_info": lambda rng: {},
+        "library_stats": lambda rng: {"top_n": 10},
+        "thumbnail_get_base64": lambda rng: {"item_id": rng.choice(item_ids)},
+        "image_get_filepath": lambda rng: {"item_id": rng.choice(item_ids)},
+        "item_update_tags": lambda rng: {"item_id": rng.choice(item_ids), "tags": ["bench"], "mode": "add"},
+    }
+
+
+async def bench_tool(server: EagleMCPServer, name: str, make_args: ArgsFactory, iterations: int,
+                     concurrency: int, rng: random.Random) -> Tuple[List[float], int, float]:
+    """Call one tool ``iterations`` times, ``concurrency`` at a time.
+    
+    Returns per-call latencies, the number of error results and wall time.
+    """
+    handler = server.server.request_handlers[CallToolRequest]
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(iterations))
+    
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            request = CallToolRequest(method="tools/call", params=CallToolRequestParams(name=name, arguments=make_args(rng)))
+            start = time.perf_counter()
+            result = await handler(request)
+            latencies.append(time.perf_counter() - start)
+            errors += any(isinstance(content, ErrorTextContent) for content in result.root.content)
+    
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, errors, time.perf_counter() - start
+
+
+async def run(args) -> None:
+    start = time.perf_counter()
+    library = SyntheticLibrary(args.items, args.folder_depth, args.folder_breadth, args.seed)
+    print(f"Library: {len(library.items)} items, {len(library.folder_index)} folders "
+          f"(generated in {time.perf_counter() - start:.1f}s, RSS {rss_mb():.0f} MiB)")
+    
+    server = EagleMCPServer()
+    if args.url:
+        server.eagle_client = EagleClient(args.url)
+    else:
+        simulator = EagleSimulator(library, args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, args.seed)
+        server.eagle_client = EagleClient("http://eagle-simulator", transport=httpx.ASGITransport(simulator.app))
+    
+    cases = tool_cases(library)
+    selected = args.tools.split(",") if args.tools else list(cases)
+    rng = random.Random(args.seed)
+    print(f"{'tool':<22} {'calls':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'calls/s':>8} {'RSS MiB':>8}")
+    failed = []
+    # Keep the connection pool open across tools, as a long-running server would
+    async with server.eagle_client:
+        for name in selected:
+            latencies, errors, wall = await bench_tool(server, name, cases[name], args.iterations, args.concurrency, rng)
+            if errors:
+                failed.append(name)
+            print(f"{name:<22} {len(latencies):>6} {errors:>6} "
+                  f"{statistics.median(latencies) * 1000:>8.1f} {percentile(latencies, 0.95) * 1000:>8.1f} "
+                  f"{percentile(latencies, 0.99) * 1000:>8.1f} {len(latencies) / wall:>8.0f} {rss_mb():>8.0f}")
+    # Without injected errors every call should succeed; otherwise the numbers time error paths
+    if failed and not args.error_rate:
+        raise SystemExit(f"Tool calls failed without --error-rate: {', '.join(failed)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000)
+    parser.add_argument("--folder-depth", type=int, default=4)
+    parser.add_argument("--folder-breadth", type=int, default=5)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--tools", help="Comma-separated tool names (default: all)")
+    parser.add_argument("--url", help="Use a running simulator (started with the same --items/--seed) instead of an in-process one")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+"""Local stand-in for the Eagle API, backed by a synthetic library.
+
+Implements the endpoints the server uses (``/api/item/list|info|thumbnail|
+update|moveToTrash``, ``/api/folder/list|create|update``, ``/api/library/
+info|history|switch`` and ``/api/application/info``) with Eagle's response
+envelopes, over a generated library with deep folder trees and Japanese
+names. Latency, jitter and error rates can be injected per request.
+
+Use it in-process through ``httpx.ASGITransport(simulator.app)`` (see
+``benchmarks.bench_tools``) or run it as a server in place of Eagle:
+
+    python -m benchmarks.eagle_simulator --items 100000 --port 41595
+"""
+
+import argparse
+import asyncio
+import random
+import struct
+import tempfile
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+
+from utils import json_codec
+
+FOLDER_WORDS = ["写真", "素材", "プロジェクト", "参考資料", "背景", "人物", "風景", "アイコン",
+                "テクスチャ", "UI", "archive", "2024年", "クライアント", "ラフ", "完成品"]
+NAME_WORDS = ["夕焼け", "桜", "猫", "東京タワー", "ポートレート", "sunset", "logo", "texture",
+              "スケッチ", "背景素材", "アイコン", "mockup", "富士山", "海", "夜景", "banner"]
+TAGS = ["風景", "人物", "動物", "建築", "食べ物", "抽象", "モノクロ", "ドラフト", "採用",
+        "reference", "UI", "illustration", "photo", "3D", "typography", "pattern"]
+EXTENSIONS = [("jpg", 40), ("png", 30), ("psd", 8), ("gif", 5), ("webp", 7), ("mp4", 5), ("pdf", 5)]
+
+# Eagle's orderBy values and the item field each sorts on
+ORDER_FIELDS = {"CREATEDATE": "btime", "FILESIZE": "size", "NAME": "name", "RESOLUTION": "width"}
+
+
+def _tiny_png() -> bytes:
+    """A valid 1x1 grey PNG, used for every thumbnail and placeholder original."""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    header = struct.pack(">IIBBBBB", 1, 1, 8, 0, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header)
+            + chunk(b"IDAT", zlib.compress(b"\x00\x80")) + chunk(b"IEND", b""))
+
+
+TINY_PNG = _tiny_png()
+
+
+class SyntheticLibrary:
+    """A generated Eagle library held in memory.
+    
+    Items and folders use Eagle's JSON shapes (including fields the server
+    ignores, such as ``palettes``, so payload sizes are realistic). Files are
+    only created on disk when a thumbnail path is requested.
+    """
+    
+    def __init__(self, items: int = 1000, folder_depth: int = 4, folder_breadth: int = 5,
+                 seed: int = 0, root: Optional[Path] = None, name: str = "シミュレーション"):
+        self.rng = random.Random(seed)
+        self.root = Path(root) if root is not None else Path(tempfile.mkdtemp(prefix="eagle-sim-"))
+        self.name = name
+        self.path = str(self.root / f"{name}.library")
+        self.modification_time = 1_700_000_000_000
+        self._next_id = 0
+        self.folders: List[Dict[str, Any]] = self._make_folders(folder_depth, folder_breadth)
+        self.folder_index: Dict[str, Dict[str, Any]] = {}
+        self._index_folders(self.folders, None)
+        folder_ids = list(self.folder_index)
+        self.items: Dict[str, Dict[str, Any]] = {}
+        for _ in range(items):
+            item = self._make_item(folder_ids)
+            self.items[item["id"]] = item
+    
+    def _new_id(self, prefix: str) -> str:
+        self._next_id += 1
+        return f"{prefix}{self._next_id:012X}"
+    
+    def _make_folders(self, depth: int, breadth: int, level: int = 0) -> List[Dict[str, Any]]:
+        if level >= depth:
+            return []
+        folders = []
+        for i in range(breadth):
+            folders.append({
+                "id": self._new_id("F"),
+                "name": f"{self.rng.choice(FOLDER_WORDS)}_{level}-{i}",
+                "description": "",
+                "children": self._make_folders(depth, breadth, level + 1),
+                "modificationTime": self.modification_time,
+                "tags": [],
+                "iconColor": None,
+                "password": "",
+                "passwordTips": "",
+            })
+        return folders
+    
+    def _index_folders(self, folders: List[Dict[str, Any]], parent: Optional[str]) -> None:
+        for folder in folders:
+            folder["parent"] = parent
+            self.folder_index[folder["id"]] = folder
+            self._index_folders(folder["children"], folder["id"])
+    
+    def _make_item(self, folder_ids: List[str]) -> Dict[str, Any]:
+        rng = self.rng
+        ext = rng.choices([e for e, _ in EXTENSIONS], [w for _, w in EXTENSIONS])[0]
+        width, height = rng.randint(64, 12000), rng.randint(64, 12000)
+        created = self.modification_time - rng.randint(0, 3 * 365 * 86400) * 1000
+        return {
+            "id": self._new_id("K"),
+            "name": f"{rng.choice(NAME_WORDS)}_{self._next_id}",
+            "size": int(10 ** rng.uniform(3.5, 8.5)),
+            "btime": created,
+            "mtime": created,
+            "ext": ext,
+            "tags": rng.sample(TAGS, rng.choice((0, 0, 1, 2, 3, 5))),
+            "folders": rng.sample(folder_ids, rng.choice((0, 1, 1, 1, 2))) if folder_ids else [],
+            "isDeleted": False,
+            "url": rng.choice(("", "", "https://example.com/asset")),
+            "annotation": rng.choice(("", "", "", "クライアント確認済み", "要修正")),
+            "modificationTime": created,
+            "height": height,
+            "width": width,
+            "lastModified": created,
+            "star": rng.choice((0, 0, 0, 0, 1, 2, 3, 4, 5)),
+            "palettes": [
+                {"color": [rng.randint(0, 255) for _ in range(3)], "ratio": rng.randint(1, 60), "$$hashKey": "object:1"}
+                for _ in range(rng.randint(3, 8))
+            ],
+        }
+    
+    def touch(self) -> None:
+        """Mark the library as modified."""
+        self.modification_time = max(self.modification_time + 1, int(time.time() * 1000))
+    
+    def live_items(self) -> List[Dict[str, Any]]:
+        return [item for item in self.items.values() if not item["isDeleted"]]
+    
+    def list_items(self, params: Dict[str, str]) -> List[Dict[str, Any]]:
+        """Filter, sort and page items like ``/api/item/list``."""
+        items = self.live_items()
+        if keyword := params.get("keyword"):
+            keyword = keyword.lower()
+            items = [i for i in items if keyword in i["name"].lower() or any(keyword in t.lower() for t in i["tags"])]
+        if ext := params.get("ext"):
+            items = [i for i in items if i["ext"] == ext]
+        if tags := params.get("tags"):
+            wanted = set(tags.split(","))
+            items = [i for i in items if wanted.issubset(i["tags"])]
+        if folders := params.get("folders"):
+            wanted = set(folders.split(","))
+            items = [i for i in items if wanted.intersection(i["folders"])]
+        if order_by := params.get("orderBy"):
+            field = ORDER_FIELDS.get(order_by.lstrip("-"))
+            if field:
+                items.sort(key=lambda i: i[field], reverse=order_by.startswith("-"))
+        limit = int(params.get("limit", 200))
+        # Like Eagle, ``offset`` is a page number
+        start = int(params.get("offset", 0)) * limit
+        return items[start:start + limit]
+    
+    def item_dir(self, item: Dict[str, Any]) -> Path:
+        return self.root / f"{self.name}.library" / "images" / f"{item['id']}.info"
+    
+    def thumbnail_path(self, item: Dict[str, Any]) -> str:
+        """Return the item's thumbnail path, creating the thumbnail and original on first use."""
+        directory = self.item_dir(item)
+        thumbnail = directory / f"{item['name']}_thumbnail.png"
+        if not thumbnail.exists():
+            directory.mkdir(parents=True, exist_ok=True)
+            thumbnail.write_bytes(TINY_PNG)
+            (directory / f"{item['name']}.{item['ext']}").write_bytes(TINY_PNG)
+        return str(thumbnail)
+    
+    def library_info(self) -> Dict[str, Any]:
+        return {
+            "folders": self.folders,
+            "smartFolders": [],
+            "quickAccess": [],
+            "tagsGroups": [],
+            "modificationTime": self.modification_time,
+            "applicationVersion": "4.0.0",
+            "library": {"path": self.path, "name": self.name},
+        }
+
+
+class EagleSimulator:
+    """ASGI app serving a ``SyntheticLibrary`` through Eagle's HTTP API."""
+    
+    def __init__(self, library: SyntheticLibrary, latency: float = 0.0, jitter: float = 0.0,
+                 error_rate: float = 0.0, seed: int = 0):
+        self.library = library
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rng = random.Random(seed)
+        self.requests: Counter = Counter()
+        self.errors_injected = 0
+        self.history = [library.path]
+        routes = {
+            "/api/application/info": ("GET", self.application_info),
+            "/api/item/list": ("GET", self.item_list),
+            "/api/item/info": ("GET", self.item_info),
+            "/api/item/thumbnail": ("GET", self.item_thumbnail),
+            "/api/item/update": ("POST", self.item_update),
+            "/api/item/moveToTrash": ("POST", self.item_move_to_trash),
+            "/api/folder/list": ("GET", self.folder_list),
+            "/api/folder/create": ("POST", self.folder_create),
+            "/api/folder/update": ("POST", self.folder_update),
+            "/api/library/info": ("GET", self.library_info),
+            "/api/library/history": ("GET", self.library_history),
+            "/api/library/switch": ("POST", self.library_switch),
+        }
+        self.app = Starlette(routes=[
+            Route(path, self._endpoint(path, handler), methods=[method])
+            for path, (method, handler) in routes.items()
+        ])
+    
+    def _endpoint(self, path: str, handler: Callable[[Dict[str, Any]], Awaitable[Any]]):
+        async def endpoint(request: Request) -> Response:
+            self.requests[path] += 1
+            delay = self.latency + self.rng.uniform(0, self.jitter)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            if self.error_rate and self.rng.random() < self.error_rate:
+                self.errors_injected += 1
+                return Response("Injected error", status_code=500)
+            if request.method == "POST":
+                params = json_codec.loads(await request.body() or b"{}")
+            else:
+                params = dict(request.query_params)
+            body = await handler(params)
+            return Response(json_codec.dumps(body).encode("utf-8"), media_type="application/json")
+        return endpoint
+    
+    @staticmethod
+    def _ok(data: Any = None) -> Dict[str, Any]:
+        return {"status": "success", "data": data} if data is not None else {"status": "success"}
+    
+    @staticmethod
+    def _error(message: str) -> Dict[str, Any]:
+        return {"status": "error", "data": message}
+    
+    async def application_info(self, params):
+        return self._ok({"version": "4.0.0", "platform": "linux"})
+    
+    async def item_list(self, params):
+        return self._ok(self.library.list_items(params))
+    
+    async def item_info(self, params):
+        item = self.library.items.get(params.get("id", ""))
+        return self._ok(item) if item else self._error("Item does not exist")
+    
+    async def item_thumbnail(self, params):
+        item = self.library.items.get(params.get("id", ""))
+        return self._ok(self.library.thumbnail_path(item)) if item else self._error("Item does not exist")
+    
+    async def item_update(self, params):
+        item = self.library.items.get(params.get("id", ""))
+        if not item:
+            return self._error("Item does not exist")
+        for key in ("tags", "annotation", "url", "star"):
+            if key in params:
+                item[key] = params[key]
+        item["modificationTime"] = item["lastModified"] = int(time.time() * 1000)
+        self.library.touch()
+        return self._ok(item)
+    
+    async def item_move_to_trash(self, params):
+        for item_id in params.get("itemIds", []):
+            if item_id in self.library.items:
+                self.library.items[item_id]["isDeleted"] = True
+        self.library.touch()
+        return self._ok()
+    
+    async def folder_list(self, params):
+        return self._ok(self.library.folders)
+    
+    async def folder_create(self, params):
+        parent = self.library.folder_index.get(params.get("parent") or "")
+        folder = {
+            "id": self.library._new_id("F"), "name": params.get("folderName", ""), "description": "",
+            "children": [], "modificationTime": int(time.time() * 1000), "tags": [],
+            "parent": parent["id"] if parent else None,
+        }
+        (parent["children"] if parent else self.library.folders).append(folder)
+        self.library.folder_index[folder["id"]] = folder
+        self.library.touch()
+        return self._ok(folder)
+    
+    async def folder_update(self, params):
+        folder = self.library.folder_index.get(params.get("folderId", ""))
+        if not folder:
+            return self._error("Folder does not exist")
+        if "newName" in params:
+            folder["name"] = params["newName"]
+        if "newDescription" in params:
+            folder["description"] = params["newDescription"]
+        if "newColor" in params:
+            folder["iconColor"] = params["newColor"]
+        folder["modificationTime"] = int(time.time() * 1000)
+        self.library.touch()
+        return self._ok(folder)
+    
+    async def library_info(self, params):
+        return self._ok(self.library.library_info())
+    
+    async def library_history(self, params):
+        return self._ok(self.history)
+    
+    async def library_switch(self, params):
+        path = params.get("libraryPath")
+        if path not in self.history:
+            return self._error("Library does not exist")
+        # Only one synthetic library is simulated; a switch just moves it to the front
+        self.history.remove(path)
+        self.history.insert(0, path)
+        return self._ok()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--folder-depth", type=int, default=4)
+    parser.add_argument("--folder-breadth", type=int, default=5)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=41595)
+    args = parser.parse_args()
+    
+    import uvicorn
+    
+    start = time.perf_counter()
+    library = SyntheticLibrary(args.items, args.folder_depth, args.folder_breadth, args.seed)
+    print(f"Generated {len(library.items)} items in {len(library.folder_index)} folders "
+          f"in {time.perf_counter() - start:.1f}s (files under {library.root})")
+    simulator = EagleSimulator(library, args.latency_ms / 1000, args.jitter_ms / 1000, args.error_rate, args.seed)
+    uvicorn.run(simulator.app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Reading an Eagle library directly from its ``<name>.library`` directory.
+
+Eagle stores each item as ``images/<id>.info/metadata.json`` next to the
+original file and its ``<name>_thumbnail.png``, and keeps a ``mtime.json``
+map of item ID to modification time at the library root. A full scan reads
+every item's metadata; a refresh re-reads ``mtime.json`` and only the items
+whose modification time changed.
+
+The server itself reads items through the Eagle API; this reader feeds the
+on-disk benchmarks (``benchmarks/test_library_disk.py``) with realistic
+libraries of any size.
+"""
+
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+from schemas.base import ItemInfo
+from utils import json_codec, tracing
+
+logger = logging.getLogger(__name__)
+
+
+class LibraryDisk:
+    """Items of one library, read from disk without going through Eagle."""
+    
+    def __init__(self, library_path: str):
+        self.path = Path(library_path)
+        self.images_dir = self.path / "images"
+        self._items: Dict[str, ItemInfo] = {}
+        self._mtimes: Dict[str, int] = {}
+    
+    def read_mtimes(self) -> Dict[str, int]:
+        """Item ID -> modification time from ``mtime.json``.
+        
+        Falls back to listing ``images/`` (with directory mtimes) when the
+        file is missing, as it is for libraries Eagle hasn't finished writing.
+        """
+        try:
+            mtimes = json_codec.loads((self.path / "mtime.json").read_bytes())
+        except FileNotFoundError:
+            mtimes = {}
+            with os.scandir(self.images_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".info"):
+                        mtimes[entry.name[:-5]] = int(entry.stat().st_mtime * 1000)
+            return mtimes
+        # Besides item IDs the file holds an "all" entry with the item count
+        mtimes.pop("all", None)
+        return mtimes
+    
+    def item_dir(self, item_id: str) -> Path:
+        return self.images_dir / f"{item_id}.info"
+    
+    def read_item(self, item_id: str) -> Optional[ItemInfo]:
+        """Read one item's ``metadata.json`` (None if missing, unreadable or trashed)."""
+        try:
+            data = json_codec.loads((self.item_dir(item_id) / "metadata.json").read_bytes())
+        except (OSError, ValueError) as e:
+            logger.debug("Skipping item %s: %s", item_id, e)
+            return None
+        if data.get("isDeleted"):
+            return None
+        return ItemInfo.from_dict(data)
+    
+    def scan(self) -> int:
+        """Read every item from disk, replacing what was loaded before."""
+        with tracing.span("library_disk.scan", **{"library.path": str(self.path)}) as span:
+            mtimes = self.read_mtimes()
+            items = {}
+            for item_id in mtimes:
+                item = self.read_item(item_id)
+                if item is not None:
+                    items[item_id] = item
+            self._items, self._mtimes = items, mtimes
+            span.set_attribute("library.items", len(items))
+            return len(items)
+    
+    def refresh(self) -> Tuple[int, int]:
+        """Re-read only items added or modified since the last scan.
+        
+        Returns the number of items (re)loaded and the number removed.
+        """
+        with tracing.span("library_disk.refresh", **{"library.path": str(self.path)}) as span:
+            mtimes = self.read_mtimes()
+            changed = [item_id for item_id, mtime in mtimes.items() if self._mtimes.get(item_id) != mtime]
+            removed = [item_id for item_id in self._mtimes if item_id not in mtimes]
+            for item_id in removed:
+                self._items.pop(item_id, None)
+            for item_id in changed:
+                item = self.read_item(item_id)
+                if item is not None:
+                    self._items[item_id] = item
+                else:
+                    self._items.pop(item_id, None)
+            self._mtimes = mtimes
+            span.set_attribute("library.changed", len(changed))
+            span.set_attribute("library.removed", len(removed))
+            return len(changed), len(removed)
+    
+    def original_path(self, item: ItemInfo) -> Path:
+        """Path of the item's original file."""
+        return self.item_dir(item.id) / f"{item.name}.{item.ext}"
+    
+    def thumbnail_path(self, item: ItemInfo) -> Path:
+        """Path of the item's thumbnail, or of the original when Eagle didn't make one.
+        
+        Eagle skips thumbnails for small images, so the original is the
+        fallback (one ``stat`` per call).
+        """
+        thumbnail = self.item_dir(item.id) / f"{item.name}_thumbnail.png"
+        return thumbnail if thumbnail.exists() else self.original_path(item)
+    
+    def get(self, item_id: str) -> Optional[ItemInfo]:
+        return self._items.get(item_id)
+    
+    def __iter__(self) -> Iterator[ItemInfo]:
+        return iter(self._items.values())
+    
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,99 @@
+"""Write a synthetic Eagle library (``<name>.library``) to disk.
+
+Produces the layout Eagle uses: a root ``metadata.json`` (folder tree),
+``tags.json``, ``mtime.json`` and ``images/<id>.info/`` directories holding
+the item's ``metadata.json``, a placeholder original and, for most items, a
+``_thumbnail.png``. Items come from ``benchmarks.eagle_simulator``, so the
+same seed yields the same library on disk and over the simulated API. Run
+from the repository root:
+
+    python -m benchmarks.make_library /tmp/libraries --items 100000
+"""
+
+import argparse
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from typing import List
+
+from benchmarks.eagle_simulator import TINY_PNG, SyntheticLibrary
+from utils import json_codec
+
+# Eagle doesn't write thumbnails for small images; roughly this share of items has none
+NO_THUMBNAIL_RATE = 0.1
+
+
+def _write_json(path: Path, data) -> None:
+    path.write_text(json_codec.dumps(data), encoding="utf-8")
+
+
+def write_library(directory: Path, items: int = 1000, folder_depth: int = 4, folder_breadth: int = 5,
+                  seed: int = 0, name: str = "benchmark") -> Path:
+    """Generate a library under ``directory`` and return its ``.library`` path."""
+    library = SyntheticLibrary(items, folder_depth, folder_breadth, seed, root=Path(directory), name=name)
+    root = Path(library.path)
+    (root / "images").mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    
+    info = library.library_info()
+    info.pop("library")
+    _write_json(root / "metadata.json", info)
+    tag_counts = Counter(tag for item in library.items.values() for tag in item["tags"])
+    _write_json(root / "tags.json", {
+        "historyTags": [tag for tag, _ in tag_counts.most_common()],
+        "starredTags": [tag for tag, _ in tag_counts.most_common(3)],
+    })
+    
+    mtimes = {}
+    for item in library.items.values():
+        item_dir = library.item_dir(item)
+        item_dir.mkdir()
+        _write_json(item_dir / "metadata.json", item)
+        (item_dir / f"{item['name']}.{item['ext']}").write_bytes(TINY_PNG)
+        if rng.random() >= NO_THUMBNAIL_RATE:
+            (item_dir / f"{item['name']}_thumbnail.png").write_bytes(TINY_PNG)
+        mtimes[item["id"]] = item["modificationTime"]
+    mtimes["all"] = len(library.items)
+    _write_json(root / "mtime.json", mtimes)
+    return root
+
+
+def modify_items(library_path: Path, count: int, seed: int = 0) -> List[str]:
+    """Retag ``count`` random items on disk as Eagle would, updating ``mtime.json``.
+    
+    Returns the modified item IDs.
+    """
+    library_path = Path(library_path)
+    mtimes = json_codec.loads((library_path / "mtime.json").read_bytes())
+    rng = random.Random(seed)
+    item_ids = rng.sample([key for key in mtimes if key != "all"], count)
+    now = int(time.time() * 1000)
+    for item_id in item_ids:
+        path = library_path / "images" / f"{item_id}.info" / "metadata.json"
+        item = json_codec.loads(path.read_bytes())
+        item["tags"] = sorted(set(item["tags"]) | {"更新済み"})
+        item["modificationTime"] = item["lastModified"] = now
+        _write_json(path, item)
+        mtimes[item_id] = now
+    _write_json(library_path / "mtime.json", mtimes)
+    return item_ids
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", type=Path)
+    parser.add_argument("--items", type=int, default=10000)
+    parser.add_argument("--folder-depth", type=int, default=4)
+    parser.add_argument("--folder-breadth", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--name", default="benchmark")
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    path = write_library(args.directory, args.items, args.folder_depth, args.folder_breadth, args.seed, args.name)
+    print(f"Wrote {args.items} items to {path} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
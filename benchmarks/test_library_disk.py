@@ -0,0 +1,82 @@
+"""pytest-benchmark suites for reading a synthetic on-disk library.
+
+Not collected by the default test run; run them explicitly, optionally
+choosing the library sizes:
+
+    BENCH_LIBRARY_SCALES=1000,10000,100000 pytest benchmarks/test_library_disk.py
+
+Compare runs with ``--benchmark-autosave`` / ``--benchmark-compare`` to catch
+scaling regressions.
+"""
+
+import os
+
+import pytest
+
+from benchmarks.make_library import modify_items, write_library
+from benchmarks.library_disk import LibraryDisk
+from services.item_index import ItemIndex
+from services.library_stats import compute_library_stats
+from services.saved_queries import compile_query
+
+pytest.importorskip("pytest_benchmark")
+
+SCALES = [int(scale) for scale in os.getenv("BENCH_LIBRARY_SCALES", "1000,10000").split(",")]
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda scale: f"{scale}items")
+def library_path(request, tmp_path_factory):
+    return write_library(tmp_path_factory.mktemp(f"library{request.param}"), items=request.param)
+
+
+@pytest.fixture
+def library(library_path):
+    disk = LibraryDisk(str(library_path))
+    disk.scan()
+    return disk
+
+
+def test_full_scan(benchmark, library_path):
+    count = benchmark(lambda: LibraryDisk(str(library_path)).scan())
+    assert count > 0
+
+
+def test_incremental_refresh(benchmark, library):
+    # 1% of the library changes between refreshes
+    changes = max(1, len(library) // 100)
+    seeds = iter(range(1_000_000))
+    
+    def setup():
+        modify_items(library.path, changes, seed=next(seeds))
+    
+    benchmark.pedantic(library.refresh, setup=setup, rounds=10)
+    assert sum("更新済み" in item.tags for item in library) >= changes
+
+
+def test_query(benchmark, library):
+    # The server's query path: posting lists and sorted indexes of an item index
+    # loaded from the scan, then a freshly compiled plan per round
+    index = ItemIndex()
+    index.install(str(library.path), {"items": {item.id: item for item in library}})
+    filters = {"ext": "jpg", "tags": ["風景"], "star_min": 3, "width_min": 1920}
+    
+    def query():
+        return compile_query(filters).execute(index)
+    
+    ids = benchmark(query)
+    assert all(index.get(item_id).ext == "jpg" for item_id in ids)
+
+
+def test_stats(benchmark, library):
+    stats = benchmark(lambda: compute_library_stats(library))
+    assert stats["total_items"] == len(library)
+
+
+def test_path_resolution(benchmark, library):
+    items = list(library)[:1000]
+    
+    def resolve():
+        return [(library.original_path(item), library.thumbnail_path(item)) for item in items]
+    
+    paths = benchmark(resolve)
+    assert all(original.exists() for original, _ in paths[:10])
@@ -2,15 +2,26 @@
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 import json
-from dotenv import load_dotenv
 
 # Load environment variables from .env.local if it exists
+# (python-dotenv is only imported when there is a file to read)
 env_file = Path(".env.local")
 if env_file.exists():
+    from dotenv import load_dotenv
     load_dotenv(env_file)
 
+# エンドポイント別のタイムアウト既定値 (秒)。未指定のエンドポイントは EAGLE_API_TIMEOUT を使用
+DEFAULT_ENDPOINT_TIMEOUTS = {
+    "/api/application/info": 3.0,
+    "/api/item/info": 5.0,
+    "/api/item/thumbnail": 5.0,
+    "/api/library/info": 5.0,
+    "/api/folder/list": 10.0,
+    "/api/item/list": 15.0,
+}
+
 
 class Config:
     """動的設定クラス"""
@@ -19,34 +30,152 @@ class Config:
         self.eagle_api_base_url = os.getenv("EAGLE_API_URL", "http://localhost:41595")
         self.eagle_api_timeout = float(os.getenv("EAGLE_API_TIMEOUT", "30.0"))
         
+        # Eagle API concurrency limits (Eagle is a single Electron process)
+        self.eagle_max_concurrent_reads = int(os.getenv("EAGLE_MAX_CONCURRENT_READS", "4"))
+        self.eagle_max_concurrent_writes = int(os.getenv("EAGLE_MAX_CONCURRENT_WRITES", "1"))
+        self.eagle_latency_target = float(os.getenv("EAGLE_LATENCY_TARGET", "2.0"))
+        
+        # Eagle API resilience (per-endpoint timeouts, retries, circuit breaker)
+        self.eagle_endpoint_timeouts = self._parse_endpoint_timeouts(os.getenv("EAGLE_ENDPOINT_TIMEOUTS", ""))
+        self.eagle_api_max_retries = int(os.getenv("EAGLE_API_MAX_RETRIES", "2"))
+        self.eagle_api_retry_backoff = float(os.getenv("EAGLE_API_RETRY_BACKOFF", "0.2"))
+        self.eagle_circuit_failure_threshold = int(os.getenv("EAGLE_CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.eagle_circuit_reset_timeout = float(os.getenv("EAGLE_CIRCUIT_RESET_TIMEOUT", "30.0"))
+        self.eagle_stale_cache_size = int(os.getenv("EAGLE_STALE_CACHE_SIZE", "128"))
+        
         # MCP Server Configuration
         self.mcp_server_name = os.getenv("MCP_SERVER_NAME", "Eagle MCP Server")
         self.mcp_server_version = os.getenv("MCP_SERVER_VERSION", "0.1.0")
         self.mcp_server_description = "A modern MCP server for Eagle App"
         
+        # MCP transport: "stdio" (one process per client) or a network transport
+        # ("streamable-http" / "sse") where one process serves many clients
+        self.mcp_transport = os.getenv("MCP_TRANSPORT", "stdio").lower()
+        self.mcp_http_host = os.getenv("MCP_HTTP_HOST", "127.0.0.1")
+        self.mcp_http_port = int(os.getenv("MCP_HTTP_PORT", "8765"))
+        self.mcp_http_path = os.getenv("MCP_HTTP_PATH", "/mcp")
+        # Prometheus metrics: served at /metrics on the HTTP transports; with
+        # stdio a separate listener is started when a port is set (0 = disabled)
+        self.mcp_metrics_port = int(os.getenv("MCP_METRICS_PORT", "0"))
+        
+        # Tracing: fraction of tool calls traced, and which traces count as slow
+        self.trace_sample_rate = float(os.getenv("TRACE_SAMPLE_RATE", "1.0"))
+        self.trace_slow_threshold = float(os.getenv("TRACE_SLOW_THRESHOLD", "1.0"))
+        self.trace_keep = int(os.getenv("TRACE_KEEP", "20"))
+        
         # Logging Configuration
         self.log_level = os.getenv("LOG_LEVEL", "INFO")
         self.log_format = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
+        # Per-module levels, e.g. "eagle_client=DEBUG,httpx=WARNING"
+        self.log_levels = self._parse_log_levels(os.getenv("LOG_LEVELS", ""))
+        # Longer messages are cut and Base64 runs are redacted before writing
+        self.log_max_message_chars = int(os.getenv("LOG_MAX_MESSAGE_CHARS", "2000"))
+        self.log_file_max_bytes = int(os.getenv("LOG_FILE_MAX_BYTES", str(5 * 1024 * 1024)))
+        self.log_file_backup_count = int(os.getenv("LOG_FILE_BACKUP_COUNT", "3"))
         
         # Request limits
         self.default_item_limit = int(os.getenv("DEFAULT_ITEM_LIMIT", "50"))
         self.max_item_limit = int(os.getenv("MAX_ITEM_LIMIT", "500"))
         self.default_folder_limit = int(os.getenv("DEFAULT_FOLDER_LIMIT", "100"))
         self.max_folder_limit = int(os.getenv("MAX_FOLDER_LIMIT", "1000"))
+        # 0 = unlimited. Caps text listings; Base64 image data is never truncated
+        self.max_response_chars = int(os.getenv("MAX_RESPONSE_CHARS", "0"))
+        # 0 = unlimited. Most entries a listing returns per call; the rest is summarised
+        # (counts and top groups) and reachable with a continuation cursor
+        self.output_max_items = int(os.getenv("OUTPUT_MAX_ITEMS", "100"))
+        self.summary_top_groups = int(os.getenv("SUMMARY_TOP_GROUPS", "5"))
+        # Unique strings (names, tags) whose display form and search key are memoised
+        self.text_cache_size = int(os.getenv("TEXT_CACHE_SIZE", "65536"))
+        # Items fetched per /api/item/list page when building the item index
+        self.item_index_page_size = int(os.getenv("ITEM_INDEX_PAGE_SIZE", "1000"))
+        
+        # File I/O: image reads run in a bounded thread pool, in chunks, so a large
+        # file never blocks the event loop or monopolises a worker
+        self.file_io_threads = int(os.getenv("FILE_IO_THREADS", "4"))
+        self.file_io_chunk_size = int(os.getenv("FILE_IO_CHUNK_SIZE", str(4 * 1024 * 1024)))
+        
+        # image_get_region: worker processes, cached regions and the output size limit
+        self.image_process_workers = int(os.getenv("IMAGE_PROCESS_WORKERS", "2"))
+        self.image_region_cache_size = int(os.getenv("IMAGE_REGION_CACHE_SIZE", "32"))
+        self.image_region_max_pixels = int(os.getenv("IMAGE_REGION_MAX_PIXELS", str(4096 * 4096)))
+        # Largest source image accepted, in pixels (0 = no limit); replaces Pillow's ~358 MP guard
+        self.image_region_source_max_pixels = int(os.getenv("IMAGE_REGION_SOURCE_MAX_PIXELS", str(65536 * 65536)))
+        
+        # Prefetching after item_search: item info and thumbnails of the top K results
+        # are fetched at bulk priority and kept for PREFETCH_TTL seconds (0 = off)
+        self.prefetch_top_k = int(os.getenv("PREFETCH_TOP_K", "5"))
+        self.prefetch_concurrency = int(os.getenv("PREFETCH_CONCURRENCY", "2"))
+        self.prefetch_ttl = float(os.getenv("PREFETCH_TTL", "60"))
+        self.prefetch_cache_size = int(os.getenv("PREFETCH_CACHE_SIZE", "256"))
+        # Base64-encoded thumbnails, keyed by path and file modification time
+        self.thumbnail_cache_size = int(os.getenv("THUMBNAIL_CACHE_SIZE", "64"))
+        
+        # Change feed: seconds between library change checks (0 = off; with watchfiles
+        # installed, file-system events trigger earlier checks) and events kept for tokens.
+        # Checks start with the first subscription or library_changes_since call
+        self.change_poll_interval = float(os.getenv("CHANGE_POLL_INTERVAL", "5.0"))
+        self.change_feed_history = int(os.getenv("CHANGE_FEED_HISTORY", "256"))
+        
+        # batch_execute: steps run at once and the maximum number of calls per batch
+        self.batch_concurrency = int(os.getenv("BATCH_CONCURRENCY", "8"))
+        self.batch_max_calls = int(os.getenv("BATCH_MAX_CALLS", "50"))
         
         # Direct API Tools Configuration
-        self.expose_direct_api_tools = os.getenv("EXPOSE_DIRECT_API_TOOLS", "false").lower() in ("true", "1", "yes", "on")
+        self.expose_direct_api_tools = self._parse_flag(os.getenv("EXPOSE_DIRECT_API_TOOLS", "false"))
+        # Seconds between checks of .env.local for settings that change the tool list (0 = off)
+        self.config_reload_interval = float(os.getenv("CONFIG_RELOAD_INTERVAL", "5.0"))
         
         # Paths
         self.user_data_dir = self._get_user_data_dir()
         self.cache_dir = self._get_cache_dir()
         self.log_dir = self._get_log_dir()
+        self.trace_export_path = self._get_trace_export_path()
+        self.log_file = self._get_log_file()
         
         # MCP config paths
         self.claude_desktop_config_path = self._get_claude_desktop_config_path()
         self.lm_studio_config_path = self._get_lm_studio_config_path()
         self.lm_studio_conversations_dir = self._get_lm_studio_conversations_dir()
     
+    @staticmethod
+    def _parse_flag(value: str) -> bool:
+        return value.lower() in ("true", "1", "yes", "on")
+    
+    def reload_tool_settings(self) -> bool:
+        """.env.local からツール一覧に影響する設定を再読み込みし、変更があれば True を返す"""
+        values = {}
+        if env_file.exists():
+            from dotenv import dotenv_values
+            values = dotenv_values(env_file)
+        value = values.get("EXPOSE_DIRECT_API_TOOLS") or os.getenv("EXPOSE_DIRECT_API_TOOLS", "false")
+        expose = self._parse_flag(value)
+        changed = expose != self.expose_direct_api_tools
+        self.expose_direct_api_tools = expose
+        return changed
+    
+    def _parse_endpoint_timeouts(self, value: str) -> Dict[str, float]:
+        """エンドポイント別タイムアウトを解析 (例: "/api/item/list=15,/api/item/info=5")"""
+        timeouts = dict(DEFAULT_ENDPOINT_TIMEOUTS)
+        for entry in value.split(","):
+            endpoint, sep, seconds = entry.strip().partition("=")
+            if not sep:
+                continue
+            try:
+                timeouts[endpoint.strip()] = float(seconds)
+            except ValueError:
+                continue
+        return timeouts
+    
+    def _parse_log_levels(self, value: str) -> Dict[str, str]:
+        """モジュール別ログレベルを解析 (例: "eagle_client=DEBUG,httpx=WARNING")"""
+        # httpx and the MCP server log every request at INFO
+        levels = {"httpx": "WARNING", "mcp.server.lowlevel.server": "WARNING"}
+        for entry in value.split(","):
+            module, sep, level = entry.strip().partition("=")
+            if sep and module.strip():
+                levels[module.strip()] = level.strip().upper()
+        return levels
+    
     def _get_user_data_dir(self) -> Path:
         """ユーザーデータディレクトリを取得"""
         if custom_path := os.getenv("USER_DATA_DIR"):
@@ -74,6 +203,21 @@ class Config:
         
         return self.user_data_dir / "logs"
     
+    def _get_log_file(self) -> Optional[Path]:
+        """ログファイルパスを取得 (LOG_FILE を空にするとファイル出力なし)"""
+        value = os.getenv("LOG_FILE", "eagle-mcp-server.log")
+        if not value:
+            return None
+        path = Path(value).expanduser()
+        return path if path.is_absolute() else self.log_dir / path
+    
+    def _get_trace_export_path(self) -> Optional[Path]:
+        """トレース出力先 (JSONL) を取得。未設定なら出力しない"""
+        if custom_path := os.getenv("TRACE_EXPORT_FILE"):
+            path = Path(custom_path).expanduser()
+            return path if path.is_absolute() else self.log_dir / path
+        return None
+    
     def _get_claude_desktop_config_path(self) -> Path:
         """Claude Desktop設定パスを取得"""
         if custom_path := os.getenv("CLAUDE_DESKTOP_CONFIG_PATH"):
@@ -132,23 +276,67 @@ class Config:
             "eagle": {
                 "api_url": self.eagle_api_base_url,
                 "timeout": self.eagle_api_timeout,
+                "max_concurrent_reads": self.eagle_max_concurrent_reads,
+                "max_concurrent_writes": self.eagle_max_concurrent_writes,
+                "latency_target": self.eagle_latency_target,
+                "endpoint_timeouts": self.eagle_endpoint_timeouts,
+                "max_retries": self.eagle_api_max_retries,
+                "retry_backoff": self.eagle_api_retry_backoff,
+                "circuit_failure_threshold": self.eagle_circuit_failure_threshold,
+                "circuit_reset_timeout": self.eagle_circuit_reset_timeout,
+                "stale_cache_size": self.eagle_stale_cache_size,
                 "default_item_limit": self.default_item_limit,
                 "max_item_limit": self.max_item_limit,
                 "default_folder_limit": self.default_folder_limit,
-                "max_folder_limit": self.max_folder_limit
+                "max_folder_limit": self.max_folder_limit,
+                "max_response_chars": self.max_response_chars,
+                "output_max_items": self.output_max_items,
+                "summary_top_groups": self.summary_top_groups,
+                "text_cache_size": self.text_cache_size,
+                "item_index_page_size": self.item_index_page_size,
+                "file_io_threads": self.file_io_threads,
+                "file_io_chunk_size": self.file_io_chunk_size,
+                "image_process_workers": self.image_process_workers,
+                "image_region_cache_size": self.image_region_cache_size,
+                "image_region_max_pixels": self.image_region_max_pixels,
+                "image_region_source_max_pixels": self.image_region_source_max_pixels,
+                "prefetch_top_k": self.prefetch_top_k,
+                "prefetch_concurrency": self.prefetch_concurrency,
+                "prefetch_ttl": self.prefetch_ttl,
+                "prefetch_cache_size": self.prefetch_cache_size,
+                "thumbnail_cache_size": self.thumbnail_cache_size,
+                "change_poll_interval": self.change_poll_interval,
+                "change_feed_history": self.change_feed_history,
+                "batch_concurrency": self.batch_concurrency,
+                "batch_max_calls": self.batch_max_calls
             },
             "mcp": {
                 "server_name": self.mcp_server_name,
                 "server_version": self.mcp_server_version,
                 "server_description": self.mcp_server_description,
+                "transport": self.mcp_transport,
+                "http_host": self.mcp_http_host,
+                "http_port": self.mcp_http_port,
+                "http_path": self.mcp_http_path,
+                "metrics_port": self.mcp_metrics_port,
+                "trace_sample_rate": self.trace_sample_rate,
+                "trace_slow_threshold": self.trace_slow_threshold,
+                "trace_keep": self.trace_keep,
                 "log_level": self.log_level,
                 "log_format": self.log_format,
-                "expose_direct_api_tools": self.expose_direct_api_tools
+                "log_levels": self.log_levels,
+                "log_max_message_chars": self.log_max_message_chars,
+                "log_file_max_bytes": self.log_file_max_bytes,
+                "log_file_backup_count": self.log_file_backup_count,
+                "expose_direct_api_tools": self.expose_direct_api_tools,
+                "config_reload_interval": self.config_reload_interval
             },
             "paths": {
                 "user_data_dir": str(self.user_data_dir),
                 "cache_dir": str(self.cache_dir),
                 "log_dir": str(self.log_dir),
+                "log_file": str(self.log_file) if self.log_file else None,
+                "trace_export_path": str(self.trace_export_path) if self.trace_export_path else None,
                 "claude_desktop_config_path": str(self.claude_desktop_config_path),
                 "lm_studio_config_path": str(self.lm_studio_config_path),
                 "lm_studio_conversations_dir": str(self.lm_studio_conversations_dir)
@@ -162,13 +350,57 @@ config = Config()
 # 後方互換性のための定数
 EAGLE_API_BASE_URL = config.eagle_api_base_url
 EAGLE_API_TIMEOUT = config.eagle_api_timeout
+EAGLE_MAX_CONCURRENT_READS = config.eagle_max_concurrent_reads
+EAGLE_MAX_CONCURRENT_WRITES = config.eagle_max_concurrent_writes
+EAGLE_LATENCY_TARGET = config.eagle_latency_target
+EAGLE_ENDPOINT_TIMEOUTS = config.eagle_endpoint_timeouts
+EAGLE_API_MAX_RETRIES = config.eagle_api_max_retries
+EAGLE_API_RETRY_BACKOFF = config.eagle_api_retry_backoff
+EAGLE_CIRCUIT_FAILURE_THRESHOLD = config.eagle_circuit_failure_threshold
+EAGLE_CIRCUIT_RESET_TIMEOUT = config.eagle_circuit_reset_timeout
+EAGLE_STALE_CACHE_SIZE = config.eagle_stale_cache_size
 MCP_SERVER_NAME = config.mcp_server_name
 MCP_SERVER_VERSION = config.mcp_server_version
 MCP_SERVER_DESCRIPTION = config.mcp_server_description
+MCP_TRANSPORT = config.mcp_transport
+MCP_HTTP_HOST = config.mcp_http_host
+MCP_HTTP_PORT = config.mcp_http_port
+MCP_HTTP_PATH = config.mcp_http_path
+MCP_METRICS_PORT = config.mcp_metrics_port
+TRACE_SAMPLE_RATE = config.trace_sample_rate
+TRACE_SLOW_THRESHOLD = config.trace_slow_threshold
+TRACE_KEEP = config.trace_keep
+TRACE_EXPORT_PATH = config.trace_export_path
 LOG_LEVEL = config.log_level
 LOG_FORMAT = config.log_format
+LOG_LEVELS = config.log_levels
+LOG_MAX_MESSAGE_CHARS = config.log_max_message_chars
+LOG_FILE = config.log_file
+LOG_FILE_MAX_BYTES = config.log_file_max_bytes
+LOG_FILE_BACKUP_COUNT = config.log_file_backup_count
 DEFAULT_ITEM_LIMIT = config.default_item_limit
 MAX_ITEM_LIMIT = config.max_item_limit
 DEFAULT_FOLDER_LIMIT = config.default_folder_limit
 MAX_FOLDER_LIMIT = config.max_folder_limit
-EXPOSE_DIRECT_API_TOOLS = config.expose_direct_api_tools
\ No newline at end of file
+MAX_RESPONSE_CHARS = config.max_response_chars
+OUTPUT_MAX_ITEMS = config.output_max_items
+SUMMARY_TOP_GROUPS = config.summary_top_groups
+TEXT_CACHE_SIZE = config.text_cache_size
+ITEM_INDEX_PAGE_SIZE = config.item_index_page_size
+FILE_IO_THREADS = config.file_io_threads
+FILE_IO_CHUNK_SIZE = config.file_io_chunk_size
+IMAGE_PROCESS_WORKERS = config.image_process_workers
+IMAGE_REGION_CACHE_SIZE = config.image_region_cache_size
+IMAGE_REGION_MAX_PIXELS = config.image_region_max_pixels
+IMAGE_REGION_SOURCE_MAX_PIXELS = config.image_region_source_max_pixels
+PREFETCH_TOP_K = config.prefetch_top_k
+PREFETCH_CONCURRENCY = config.prefetch_concurrency
+PREFETCH_TTL = config.prefetch_ttl
+PREFETCH_CACHE_SIZE = config.prefetch_cache_size
+THUMBNAIL_CACHE_SIZE = config.thumbnail_cache_size
+CHANGE_POLL_INTERVAL = config.change_poll_interval
+CHANGE_FEED_HISTORY = config.change_feed_history
+BATCH_CONCURRENCY = config.batch_concurrency
+BATCH_MAX_CALLS = config.batch_max_calls
+EXPOSE_DIRECT_API_TOOLS = config.expose_direct_api_tools
+CONFIG_RELOAD_INTERVAL = config.config_reload_interval
\ No newline at end of file
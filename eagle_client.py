@@ -1,10 +1,32 @@
 """Eagle API client for MCP server."""
 
+import asyncio
+import functools
 import logging
-from typing import Any, Dict, Optional
+import random
+import time
+from typing import Any, Dict, Optional, Set
 
 import httpx
-from config import EAGLE_API_BASE_URL, EAGLE_API_TIMEOUT
+from config import (
+    EAGLE_API_BASE_URL,
+    EAGLE_API_MAX_RETRIES,
+    EAGLE_API_RETRY_BACKOFF,
+    EAGLE_API_TIMEOUT,
+    EAGLE_CIRCUIT_FAILURE_THRESHOLD,
+    EAGLE_CIRCUIT_RESET_TIMEOUT,
+    EAGLE_ENDPOINT_TIMEOUTS,
+    EAGLE_LATENCY_TARGET,
+    EAGLE_MAX_CONCURRENT_READS,
+    EAGLE_MAX_CONCURRENT_WRITES,
+    EAGLE_STALE_CACHE_SIZE,
+    PREFETCH_CACHE_SIZE,
+    PREFETCH_TTL,
+)
+from utils.cache import ResponseCache
+from utils.circuit_breaker import CircuitBreaker
+from utils import json_codec, metrics, tracing
+from utils.concurrency import AdaptiveLimiter, Priority
 
 logger = logging.getLogger(__name__)
 
@@ -12,82 +34,294 @@ logger = logging.getLogger(__name__)
 class EagleAPIError(Exception):
     """Exception raised for Eagle API errors."""
     
-    def __init__(self, message: str, status_code: Optional[int] = None):
+    def __init__(self, message: str, status_code: Optional[int] = None, transient: bool = False):
         super().__init__(message)
         self.status_code = status_code
+        # True for failures worth retrying (connection problems, timeouts and 5xx)
+        self.transient = transient
+
+
+class EagleUnavailableError(EagleAPIError):
+    """Raised without contacting Eagle while the circuit breaker is open."""
+    
+    def __init__(self, message: str):
+        super().__init__(message, transient=True)
 
 
 class EagleClient:
     """Client for communicating with Eagle API."""
     
-    def __init__(self, base_url: str = EAGLE_API_BASE_URL):
+    def __init__(self, base_url: str = EAGLE_API_BASE_URL,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
         self.base_url = base_url.rstrip('/')
+        # Custom transport, e.g. httpx.ASGITransport for an in-process simulator
+        self.transport = transport
         self._client: Optional[httpx.AsyncClient] = None
+        self._users = 0
+        
+        # Separate budgets so slow bulk writes cannot starve reads (and vice versa)
+        self.read_limiter = AdaptiveLimiter(
+            "read", EAGLE_MAX_CONCURRENT_READS, latency_target=EAGLE_LATENCY_TARGET
+        )
+        self.write_limiter = AdaptiveLimiter(
+            "write", EAGLE_MAX_CONCURRENT_WRITES, latency_target=EAGLE_LATENCY_TARGET
+        )
+        
+        self.circuit_breaker = CircuitBreaker(EAGLE_CIRCUIT_FAILURE_THRESHOLD, EAGLE_CIRCUIT_RESET_TIMEOUT)
+        # Last good GET responses, served only while Eagle is unreachable
+        self.stale_cache = ResponseCache(EAGLE_STALE_CACHE_SIZE)
+        self._stale_served = 0
+        # Responses fetched ahead of time by warm(), served to identical GETs
+        # for PREFETCH_TTL seconds; dropped on any write
+        self.warm_cache = ResponseCache(PREFETCH_CACHE_SIZE)
+        self._warmed_endpoints: Set[str] = set()
+        self._retries = 0
+        # Bumped by invalidate_caches() and writes; responses from older generations aren't cached
+        self._generation = 0
+        
+        # Single-flight map of identical GETs currently awaiting Eagle
+        self._in_flight: Dict[tuple, asyncio.Future] = {}
+        self._requests = 0
+        self._coalesced = 0
     
     async def __aenter__(self):
-        self._client = httpx.AsyncClient(
-            base_url=self.base_url,
-            timeout=EAGLE_API_TIMEOUT,
-            headers={"Content-Type": "application/json"}
-        )
+        # The client is shared by concurrent tool calls, so only the first
+        # entrant opens the connection pool and only the last one closes it
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                transport=self.transport,
+                timeout=EAGLE_API_TIMEOUT,
+                headers={"Content-Type": "application/json"}
+            )
+        self._users += 1
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._client:
-            await self._client.aclose()
+        self._users = max(0, self._users - 1)
+        if self._users == 0 and self._client:
+            client, self._client = self._client, None
+            await client.aclose()
     
-    async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Make GET request to Eagle API."""
+    async def get(self, endpoint: str, params: Optional[Dict[str, Any]] = None,
+                  priority: int = Priority.INTERACTIVE, model: Optional[type] = None) -> Any:
+        """Make GET request to Eagle API.
+        
+        Identical GETs issued while one is already in flight share its result
+        instead of hitting Eagle again, so callers must treat the returned
+        data as read-only. Pass a ``schemas.base`` response type as ``model``
+        to decode straight into typed structs instead of dictionaries when
+        msgspec is installed; otherwise plain dictionaries are returned (both
+        support ``get``), and ``schemas.base.as_typed`` converts if needed.
+        """
         if not self._client:
             raise RuntimeError("Client not initialized. Use async context manager.")
         
-        try:
-            logger.debug(f"GET {endpoint} with params: {params}")
-            response = await self._client.get(endpoint, params=params)
-            response.raise_for_status()
-            
-            result = response.json()
-            logger.debug(f"Response: {result.get('status', 'unknown')}")
-            return result
-            
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise EagleAPIError(f"HTTP {e.response.status_code}: {e.response.text}", e.response.status_code)
-        except httpx.RequestError as e:
-            logger.error(f"Request error: {e}")
-            raise EagleAPIError(f"Request failed: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            raise EagleAPIError(f"Unexpected error: {e}")
-    
-    async def post(self, endpoint: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        """Make POST request to Eagle API."""
+        if not json_codec.TYPED_DECODING:
+            model = None
+        self._requests += 1
+        cache_key = self._cache_key(endpoint, params, model)
+        with tracing.span(f"GET {endpoint}", **{"http.method": "GET", "eagle.endpoint": endpoint}) as span:
+            if endpoint in self._warmed_endpoints:
+                warm = self.warm_cache.get(cache_key, max_age=PREFETCH_TTL)
+                metrics.CACHE_EVENTS.inc(cache="prefetch", result="miss" if warm is None else "hit")
+                if warm is not None:
+                    span.set_attribute("eagle.prefetched", True)
+                    return warm
+            task = self._in_flight.get(cache_key)
+            if task is not None:
+                self._coalesced += 1
+                metrics.EAGLE_COALESCED.inc(endpoint=endpoint)
+                span.set_attribute("eagle.coalesced", True)
+                logger.debug("GET %s coalesced with in-flight request", endpoint)
+            else:
+                # The task inherits this context, so its HTTP spans nest under this one
+                task = asyncio.ensure_future(self._get(endpoint, params, priority, model, cache_key))
+                self._in_flight[cache_key] = task
+                task.add_done_callback(functools.partial(self._forget_in_flight, cache_key))
+            # Shield so one caller being cancelled doesn't cancel the others' request
+            return await asyncio.shield(task)
+    
+    async def warm(self, endpoint: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """Fetch a GET response at bulk priority so a later identical ``get`` is served from memory.
+        
+        Returns the response. Only successful responses are kept, and only
+        if no write or cache invalidation happened while they were fetched.
+        """
+        cache_key = self._cache_key(endpoint, params)
+        self._warmed_endpoints.add(endpoint)
+        warm = self.warm_cache.peek(cache_key, max_age=PREFETCH_TTL)
+        if warm is not None:
+            return warm
+        generation = self._generation
+        result = await self.get(endpoint, params, priority=Priority.BULK)
+        if result.get("status") == "success" and generation == self._generation:
+            self.warm_cache.put(cache_key, result)
+        return result
+    
+    def _forget_in_flight(self, cache_key: tuple, task: asyncio.Future) -> None:
+        # Only remove our own entry: invalidate_caches() may have replaced it
+        if self._in_flight.get(cache_key) is task:
+            del self._in_flight[cache_key]
+    
+    async def _get(self, endpoint: str, params: Optional[Dict[str, Any]], priority: int,
+                   model: Optional[type], cache_key: tuple) -> Any:
+        """Perform a GET with retries and stale-cache fallback.
+        
+        GETs are idempotent, so transient failures are retried with jittered
+        exponential backoff. If Eagle stays unreachable, the last good response
+        for the same request is returned when one is cached.
+        """
+        logger.debug("GET %s with params: %s", endpoint, params)
+        generation = self._generation
+        attempt = 0
+        while True:
+            try:
+                result = await self._send(self.read_limiter, priority, self._client.get, endpoint,
+                                          model, params=params)
+                if generation == self._generation:
+                    self.stale_cache.put(cache_key, result)
+                return result
+            except EagleAPIError as e:
+                if not e.transient:
+                    raise
+                if attempt < EAGLE_API_MAX_RETRIES and self.circuit_breaker.state == CircuitBreaker.CLOSED:
+                    attempt += 1
+                    self._retries += 1
+                    metrics.EAGLE_RETRIES.inc(endpoint=endpoint)
+                    delay = random.uniform(0, EAGLE_API_RETRY_BACKOFF * (2 ** (attempt - 1)))
+                    logger.warning("Retrying GET %s in %.2fs (attempt %d/%d)", endpoint, delay, attempt, EAGLE_API_MAX_RETRIES)
+                    await asyncio.sleep(delay)
+                    continue
+                stale = self.stale_cache.get(cache_key)
+                metrics.CACHE_EVENTS.inc(cache="stale", result="miss" if stale is None else "hit")
+                if stale is not None:
+                    self._stale_served += 1
+                    logger.warning("Serving stale response for GET %s: %s", endpoint, e)
+                    return stale
+                raise
+    
+    async def post(self, endpoint: str, data: Optional[Dict[str, Any]] = None,
+                   priority: int = Priority.INTERACTIVE) -> Dict[str, Any]:
+        """Make POST request to Eagle API (never retried, as it may not be idempotent)."""
         if not self._client:
             raise RuntimeError("Client not initialized. Use async context manager.")
         
-        try:
-            logger.debug(f"POST {endpoint} with data: {data}")
-            response = await self._client.post(endpoint, json=data)
-            response.raise_for_status()
+        logger.debug("POST %s with data: %s", endpoint, data)
+        # Any write may change what prefetched responses describe
+        self._generation += 1
+        self.warm_cache.clear()
+        with tracing.span(f"POST {endpoint}", **{"http.method": "POST", "eagle.endpoint": endpoint}):
+            return await self._send(self.write_limiter, priority, self._client.post, endpoint, None, json=data)
+    
+    @staticmethod
+    def _cache_key(endpoint: str, params: Optional[Dict[str, Any]], model: Optional[type] = None) -> tuple:
+        """Build a hashable key identifying a GET request and its decoded form."""
+        key_params = tuple(sorted((k, str(v)) for k, v in params.items())) if params else ()
+        return (endpoint, key_params, model.__name__ if model else None)
+    
+    async def _send(self, limiter: AdaptiveLimiter, priority: int, method, endpoint: str,
+                    model: Optional[type] = None, **kwargs) -> Any:
+        """Send a request through the circuit breaker and limiter and decode the JSON response."""
+        if not self.circuit_breaker.allow():
+            raise EagleUnavailableError(
+                f"Eagle API unavailable (circuit open, retry in {self.circuit_breaker.retry_after():.0f}s)"
+            )
+        
+        http_method = method.__name__.upper()
+        with tracing.span(f"HTTP {http_method} {endpoint}") as span:
+            queued = time.monotonic()
+            await limiter.acquire(priority)
+            span.set_attribute("eagle.queue_wait_ms", round((time.monotonic() - queued) * 1000, 3))
+            start = time.monotonic()
+            overloaded = False
+            status = "error"
+            try:
+                timeout = EAGLE_ENDPOINT_TIMEOUTS.get(endpoint, EAGLE_API_TIMEOUT)
+                response = await method(endpoint, timeout=timeout, **kwargs)
+                response.raise_for_status()
+                
+                # Decode from raw bytes: skips httpx's bytes->str step and lets
+                # orjson/msgspec do the work when installed
+                content = response.content
+                metrics.EAGLE_RESPONSE_BYTES.observe(len(content), endpoint=endpoint)
+                span.set_attribute("http.response.body.size", len(content))
+                if model is not None:
+                    result = json_codec.decode_as(content, model)
+                else:
+                    result = json_codec.loads(content)
+                logger.debug("Response from %s: %s", endpoint, result.get('status', 'unknown'))
+                self.circuit_breaker.record_success()
+                status = "ok"
+                return result
             
-            result = response.json()
-            logger.debug(f"Response: {result.get('status', 'unknown')}")
-            return result
+            except httpx.HTTPStatusError as e:
+                overloaded = e.response.status_code >= 500
+                status = str(e.response.status_code)
+                logger.error("HTTP error %s: %s", e.response.status_code, e.response.text)
+                error = EagleAPIError(f"HTTP {e.response.status_code}: {e.response.text}", e.response.status_code, overloaded)
+            except httpx.RequestError as e:
+                overloaded = True
+                status = "timeout" if isinstance(e, httpx.TimeoutException) else "connection_error"
+                logger.error("Request error: %r", e)
+                error = EagleAPIError(f"Request failed: {e!r}", transient=True)
+            except Exception as e:
+                logger.error("Unexpected error: %s", e)
+                # Not an availability problem: don't let it trip the breaker
+                self.circuit_breaker.record_success()
+                raise EagleAPIError(f"Unexpected error: {e}")
+            finally:
+                elapsed = time.monotonic() - start
+                limiter.release(elapsed, error=overloaded)
+                metrics.EAGLE_LATENCY.observe(elapsed, endpoint=endpoint, method=http_method)
+                metrics.EAGLE_REQUESTS.inc(endpoint=endpoint, method=http_method, status=status)
+                span.set_attribute("eagle.status", status)
             
-        except httpx.HTTPStatusError as e:
-            logger.error(f"HTTP error {e.response.status_code}: {e.response.text}")
-            raise EagleAPIError(f"HTTP {e.response.status_code}: {e.response.text}", e.response.status_code)
-        except httpx.RequestError as e:
-            logger.error(f"Request error: {e}")
-            raise EagleAPIError(f"Request failed: {e}")
-        except Exception as e:
-            logger.error(f"Unexpected error: {e}")
-            raise EagleAPIError(f"Unexpected error: {e}")
+            if error.transient:
+                self.circuit_breaker.record_failure(str(error))
+            else:
+                self.circuit_breaker.record_success()
+            raise error
+    
+    def invalidate_caches(self) -> None:
+        """Forget cached and in-flight GET results, e.g. after switching libraries.
+        
+        Runs without awaiting, so no other coroutine can observe a half-cleared
+        state. Requests already in flight still complete for their callers,
+        but later identical GETs no longer join them and their responses are
+        not cached.
+        """
+        self._generation += 1
+        self._in_flight.clear()
+        self.stale_cache.clear()
+        self.warm_cache.clear()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return concurrency, circuit breaker and retry metrics."""
+        return {
+            "limiters": {
+                "read": self.read_limiter.get_stats(),
+                "write": self.write_limiter.get_stats(),
+            },
+            "circuit": self.circuit_breaker.get_stats(),
+            "retries": self._retries,
+            "get_requests": self._requests,
+            "coalesced": self._coalesced,
+            "in_flight_gets": len(self._in_flight),
+            "stale_served": self._stale_served,
+            "stale_cache": self.stale_cache.get_stats(),
+            "warm_cache": self.warm_cache.get_stats(),
+        }
     
     async def health_check(self) -> bool:
-        """Check if Eagle API is accessible."""
+        """Check if Eagle API is accessible.
+        
+        Probes Eagle directly: ``get`` could answer from the stale, warm or
+        in-flight caches and report a down Eagle as healthy.
+        """
         try:
-            result = await self.get("/api/application/info")
+            result = await self._send(self.read_limiter, Priority.INTERACTIVE, self._client.get,
+                                      "/api/application/info")
             return result.get("status") == "success"
         except Exception:
             return False
@@ -111,15 +345,15 @@ class EagleClient:
         parts = tool_name.split('_')
         if len(parts) != 3:
             raise ValueError(f"Invalid Direct API tool name format: {tool_name}")
-
+        
         category = parts[1]
         action = parts[2]
-
+        
         endpoint = f"/api/{category}/{action}"
-
+        
         # Based on typical REST conventions and the API doc
         post_actions = ["create", "rename", "update", "addFromURL", "addFromURLs", "addFromPath", "addBookmark", "moveToTrash", "switch"]
         
         method = "POST" if action in post_actions else "GET"
-
+        
         return endpoint, method
\ No newline at end of file
@@ -1,14 +1,205 @@
 """Base handler for Eagle MCP Server."""
 
+import base64
+import contextvars
+import hashlib
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 from mcp.types import Tool, TextContent
+from config import MAX_RESPONSE_CHARS, OUTPUT_MAX_ITEMS, SUMMARY_TOP_GROUPS
 from eagle_client import EagleClient
+from utils import json_codec, tracing
+
+# Shared "format" tool parameter: clients that parse results can ask for JSON
+# and skip prose formatting entirely
+OUTPUT_FORMAT_PROPERTY = {
+    "type": "string",
+    "enum": ["text", "json"],
+    "description": "Response format: human-readable text or structured JSON",
+    "default": "text"
+}
+
+# Shared output budget parameters for listing tools, enforced by ``BaseHandler._page``
+BUDGET_PROPERTIES = {
+    "max_items": {
+        "type": "integer",
+        "description": "Most entries to return in this response (capped by the server's OUTPUT_MAX_ITEMS)",
+        "minimum": 1
+    },
+    "max_chars": {
+        "type": "integer",
+        "description": "Most characters of text output (capped by the server's MAX_RESPONSE_CHARS)",
+        "minimum": 1
+    },
+    "cursor": {
+        "type": "string",
+        "description": "Continuation token (next_cursor) from a previous truncated response"
+    }
+}
+# Arguments that don't change what a listing contains, only which part is returned
+_PAGING_ARGUMENTS = frozenset(("max_items", "max_chars", "cursor", "format"))
+
+# (arguments, client, output_format) -> response
+ToolMethod = Callable[[Dict[str, Any], EagleClient, str], Awaitable[List[TextContent]]]
+
+
+class ErrorTextContent(TextContent):
+    """Text content marking a failed tool call (counted as an error in metrics)."""
+
+
+def _capped(requested: Any, limit: int) -> Optional[int]:
+    """Per-call value capped by a global limit (0 = unlimited); None if neither is set."""
+    try:
+        requested = int(requested) if requested is not None else None
+    except (TypeError, ValueError):
+        requested = None
+    if requested is not None and requested < 1:
+        requested = None
+    if limit > 0:
+        return limit if requested is None else min(requested, limit)
+    return requested
+
+
+@dataclass(frozen=True)
+class OutputBudget:
+    """Output limits of one tool call: the global settings, lowered per call."""
+    max_items: Optional[int] = None
+    max_chars: Optional[int] = None
+    # Continuation token and the hash of the arguments it must have been issued for
+    cursor: Optional[str] = None
+    fingerprint: str = ""
+    
+    @classmethod
+    def for_call(cls, name: str, arguments: Dict[str, Any]) -> "OutputBudget":
+        query = {key: value for key, value in arguments.items() if key not in _PAGING_ARGUMENTS}
+        # Canonical (sorted) JSON, so the same arguments in another order match
+        digest = hashlib.sha1(json_codec.dumps([name, query], sort_keys=True).encode("utf-8")).hexdigest()[:12]
+        return cls(
+            max_items=_capped(arguments.get("max_items"), OUTPUT_MAX_ITEMS),
+            max_chars=_capped(arguments.get("max_chars"), MAX_RESPONSE_CHARS),
+            cursor=arguments.get("cursor") or None,
+            fingerprint=digest
+        )
+    
+    def offset(self) -> int:
+        """Start offset encoded in ``cursor`` (0 without one)."""
+        if self.cursor is None:
+            return 0
+        try:
+            data = json_codec.loads(base64.urlsafe_b64decode(self.cursor.encode("ascii")))
+            offset, fingerprint = int(data["o"]), data["q"]
+        except Exception:
+            raise ValueError("Invalid cursor") from None
+        if fingerprint != self.fingerprint or offset < 0:
+            raise ValueError("Cursor was issued for a different query")
+        return offset
+    
+    def cursor_for(self, offset: int) -> str:
+        """Continuation token for the entries from ``offset``."""
+        data = json_codec.dumps({"o": offset, "q": self.fingerprint}).encode("utf-8")
+        return base64.urlsafe_b64encode(data).decode("ascii")
+
+
+_current_budget: contextvars.ContextVar[OutputBudget] = contextvars.ContextVar(
+    "output_budget", default=OutputBudget(max_items=OUTPUT_MAX_ITEMS or None, max_chars=MAX_RESPONSE_CHARS or None)
+)
+
+
+@dataclass
+class Page:
+    """The part of a listing that fits the call's budget."""
+    entries: Sequence[Any]
+    total: int
+    offset: int
+    next_cursor: Optional[str]
+    # Counts and top groups over the whole listing, present when entries were left out
+    summary: Optional[Dict[str, Any]]
+    
+    @property
+    def truncated(self) -> bool:
+        return self.next_cursor is not None
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Paging fields for JSON responses (none when the whole listing is returned)."""
+        if self.summary is None:
+            return {}
+        return {"total": self.total, "offset": self.offset, "next_cursor": self.next_cursor,
+                "summary": self.summary}
+
+
+def summarise(entries: Sequence[Any], groups: Dict[str, Callable[[Any], Iterable[str]]],
+              top: int = SUMMARY_TOP_GROUPS) -> Dict[str, Any]:
+    """Total and most common values per group (ties broken by value, so output is deterministic)."""
+    summary: Dict[str, Any] = {"total": len(entries)}
+    for name, key in groups.items():
+        counts = Counter(value for entry in entries for value in key(entry))
+        ranked = sorted(counts.items(), key=lambda pair: (-pair[1], str(pair[0])))
+        summary[name] = [{"key": value, "count": count} for value, count in ranked[:top]]
+    return summary
+
+
+class ResponseBuilder:
+    """Collects response text in chunks and joins them once.
+    
+    Repeated ``str +=`` copies the whole response on every append, which adds
+    up for large listings and multi-megabyte Base64 payloads. When
+    ``max_chars`` is set, chunks past the cap are dropped and a truncation
+    marker is appended instead.
+    """
+    
+    def __init__(self, max_chars: Optional[int] = None):
+        self.max_chars = max_chars if max_chars and max_chars > 0 else None
+        self._chunks: List[str] = []
+        self._length = 0
+        self._omitted = 0
+    
+    @property
+    def truncated(self) -> bool:
+        """True if any chunk was dropped because of the size cap."""
+        return self._omitted > 0
+    
+    def add(self, *chunks: str) -> "ResponseBuilder":
+        """Append raw text chunks."""
+        for chunk in chunks:
+            if self.max_chars is not None and (self._omitted or self._length + len(chunk) > self.max_chars):
+                self._omitted += len(chunk)
+                continue
+            self._chunks.append(chunk)
+            self._length += len(chunk)
+        return self
+    
+    def line(self, text: str = "") -> "ResponseBuilder":
+        """Append a line of text followed by a newline."""
+        return self.add(text, "\n")
+    
+    def build(self) -> str:
+        """Join all chunks into the final response text."""
+        if self._omitted:
+            self._chunks.append(f"\n... [truncated: {self._omitted} more characters omitted]\n")
+            self._omitted = 0
+        return "".join(self._chunks)
 
 
 class BaseHandler(ABC):
-    """Base class for tool handlers."""
+    """Base class for tool handlers.
+    
+    Tool definitions and the name -> method dispatch table are built once per
+    handler instance; ``handle_call`` checks the tool's required parameters
+    and calls the mapped method with ``(arguments, client, output_format)``.
+    """
+    
+    def __init__(self):
+        self._tools: Tuple[Tool, ...] = tuple(self.get_tools())
+        self._required = {tool.name: tuple(tool.inputSchema.get("required", ())) for tool in self._tools}
+        self._methods: Dict[str, ToolMethod] = self._tool_methods()
+    
+    @property
+    def tools(self) -> Tuple[Tool, ...]:
+        """Tools provided by this handler (built once; treat as read-only)."""
+        return self._tools
     
     @abstractmethod
     def get_tools(self) -> List[Tool]:
@@ -16,9 +207,67 @@ class BaseHandler(ABC):
         pass
     
     @abstractmethod
+    def _tool_methods(self) -> Dict[str, ToolMethod]:
+        """Map each tool name to the coroutine implementing it."""
+        pass
+    
     async def handle_call(self, name: str, arguments: Dict[str, Any], client: EagleClient) -> List[TextContent]:
         """Handle a tool call."""
-        pass
+        with tracing.span(f"{type(self).__name__}.handle_call"):
+            method = self._methods.get(name)
+            if method is None:
+                return self._error_response(f"Unknown tool: {name}")
+            for param in self._required.get(name, ()):
+                if param not in arguments:
+                    return self._error_response(f"Missing required parameter: {param}")
+            token = _current_budget.set(OutputBudget.for_call(name, arguments))
+            try:
+                return await method(arguments, client, arguments.get("format", "text"))
+            finally:
+                _current_budget.reset(token)
+    
+    @property
+    def budget(self) -> OutputBudget:
+        """Output budget of the tool call being handled."""
+        return _current_budget.get()
+    
+    def _builder(self, uncapped: bool = False) -> ResponseBuilder:
+        """Create a response builder with the call's size cap (``uncapped`` for Base64 data)."""
+        return ResponseBuilder(None if uncapped else self.budget.max_chars)
+    
+    def _page(self, entries: Sequence[Any], groups: Optional[Dict[str, Callable[[Any], Iterable[str]]]] = None) -> Page:
+        """Cut a listing down to the call's item budget, starting at its cursor.
+        
+        When entries are left out the page carries a continuation token and a
+        deterministic summary of the whole listing (total and top ``groups``).
+        Raises ValueError for a cursor issued for different arguments.
+        """
+        budget = self.budget
+        offset = min(budget.offset(), len(entries))
+        end = len(entries) if budget.max_items is None else min(len(entries), offset + budget.max_items)
+        truncated = offset > 0 or end < len(entries)
+        return Page(
+            entries=entries[offset:end],
+            total=len(entries),
+            offset=offset,
+            next_cursor=budget.cursor_for(end) if end < len(entries) else None,
+            summary=summarise(entries, groups or {}) if truncated else None
+        )
+    
+    def _add_page_footer(self, builder: ResponseBuilder, page: Page, noun: str) -> None:
+        """Describe what a truncated page left out, with the cursor for the rest."""
+        if page.summary is None:
+            return
+        shown = len(page.entries)
+        builder.add(f"\nShowing {page.offset + 1}-{page.offset + shown} of {page.total} {noun}" if shown else
+                    f"\nNo more {noun} (total {page.total})")
+        builder.add("\n")
+        for name, values in page.summary.items():
+            if name != "total" and values:
+                builder.add(f"Top {name.replace('_', ' ')}: ",
+                            ", ".join(f"{entry['key']} ({entry['count']})" for entry in values), "\n")
+        if page.next_cursor:
+            builder.add(f"More: call again with cursor=\"{page.next_cursor}\"\n")
     
     def _success_response(self, text: str) -> List[TextContent]:
         """Create a successful response."""
@@ -26,4 +275,8 @@ class BaseHandler(ABC):
     
     def _error_response(self, text: str) -> List[TextContent]:
         """Create an error response."""
-        return [TextContent(type="text", text=text)]
\ No newline at end of file
+        return [ErrorTextContent(type="text", text=text)]
+    
+    def _json_response(self, data: Any) -> List[TextContent]:
+        """Create a structured JSON response."""
+        return [TextContent(type="text", text=json_codec.dumps(data))]
@@ -0,0 +1,263 @@
+"""Batch handler for Eagle MCP Server: many tool calls in one request."""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Set
+
+import jsonschema
+from mcp.types import Tool, TextContent
+from config import BATCH_CONCURRENCY, BATCH_MAX_CALLS
+from eagle_client import EagleClient
+from handlers.base import BaseHandler, ErrorTextContent, OUTPUT_FORMAT_PROPERTY, ToolMethod
+from handlers.registry import ToolRegistry
+from utils import json_codec, tracing
+
+BATCH_TOOL = "batch_execute"
+
+
+class BatchError(ValueError):
+    """Raised for an invalid batch (unknown tools, bad references)."""
+
+
+def _references(value: Any) -> Set[str]:
+    """IDs of the steps referenced anywhere in a step's arguments."""
+    if isinstance(value, dict):
+        if "$ref" in value:
+            return {str(value["$ref"])}
+        return set().union(*(_references(v) for v in value.values()))
+    if isinstance(value, list):
+        return set().union(*(_references(v) for v in value))
+    return set()
+
+
+def _select(data: Any, path: str) -> Any:
+    """Follow a dotted path (``items.0.id``; ``*`` maps over a list) into JSON data."""
+    if not path:
+        return data
+    key, _, rest = path.partition(".")
+    if key == "*":
+        if not isinstance(data, list):
+            raise BatchError(f"'*' needs a list, got {type(data).__name__}")
+        return [_select(entry, rest) for entry in data]
+    try:
+        data = data[int(key)] if isinstance(data, list) else data[key]
+    except (KeyError, IndexError, ValueError, TypeError):
+        raise BatchError(f"Path segment '{key}' not found") from None
+    return _select(data, rest)
+
+
+def _resolve(value: Any, outputs: Dict[str, Any]) -> Any:
+    """Replace ``{"$ref": id, "path": ...}`` objects with the referenced step's output."""
+    if isinstance(value, dict):
+        if "$ref" in value:
+            step_id, path = str(value["$ref"]), str(value.get("path", ""))
+            try:
+                return _select(outputs[step_id], path)
+            except BatchError as e:
+                raise BatchError(f"Reference to '{step_id}.{path}': {e}") from None
+        return {k: _resolve(v, outputs) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_resolve(v, outputs) for v in value]
+    return value
+
+
+class BatchHandler(BaseHandler):
+    """Runs a list of tool calls through the registered handlers in one request.
+    
+    Steps whose arguments reference earlier steps (``{"$ref": "<id>",
+    "path": "items.0.id"}``) wait for them; all other steps run concurrently,
+    up to ``concurrency`` at a time. Every step shares the batch's Eagle
+    client, so identical GETs are coalesced and cached responses are reused
+    across steps. Referenced steps are run in JSON format so their output can
+    be addressed by path. Like direct calls, each step's arguments are
+    validated against its tool's input schema (after references are resolved).
+    """
+    
+    def __init__(self, registry: Callable[[], ToolRegistry], concurrency: int = BATCH_CONCURRENCY,
+                 max_calls: int = BATCH_MAX_CALLS):
+        # A callable, so configuration reloads that rebuild the registry are picked up
+        self.registry = registry
+        self.concurrency = max(1, concurrency)
+        self.max_calls = max_calls
+        super().__init__()
+    
+    def get_tools(self) -> List[Tool]:
+        """Get batch tools."""
+        return [
+            Tool(
+                name=BATCH_TOOL,
+                description=(
+                    "Run several tool calls in one request and return all results together. "
+                    "Independent calls run concurrently. A call's arguments can use an earlier "
+                    "call's JSON result with {\"$ref\": \"<id>\", \"path\": \"items.0.id\"} "
+                    "(\"*\" in a path maps over a list); such calls wait for the referenced one, "
+                    "and are skipped if it failed"
+                ),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "calls": {
+                            "type": "array",
+                            "description": f"Tool calls to run (at most {self.max_calls})",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "id": {
+                                        "type": "string",
+                                        "description": "Step ID for references (defaults to the call's position)"
+                                    },
+                                    "tool": {
+                                        "type": "string",
+                                        "description": "Tool name"
+                                    },
+                                    "arguments": {
+                                        "type": "object",
+                                        "description": "Tool arguments, optionally with $ref objects"
+                                    }
+                                },
+                                "required": ["tool"]
+                            }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": ["calls"]
+                }
+            )
+        ]
+    
+    def _tool_methods(self) -> Dict[str, ToolMethod]:
+        """Batch tool dispatch table."""
+        return {
+            BATCH_TOOL: lambda args, client, fmt: self._execute(args["calls"], client, fmt),
+        }
+    
+    def _plan(self, calls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Validate the calls and return steps with IDs, handlers and dependencies."""
+        if not isinstance(calls, list) or not calls:
+            raise BatchError("calls must be a non-empty list")
+        if len(calls) > self.max_calls:
+            raise BatchError(f"Too many calls: {len(calls)} (at most {self.max_calls})")
+        registry = self.registry()
+        steps: List[Dict[str, Any]] = []
+        seen: Set[str] = set()
+        for position, call in enumerate(calls):
+            if not isinstance(call, dict) or not isinstance(call.get("tool"), str):
+                raise BatchError(f"Call {position}: expected an object with a tool name")
+            step_id = str(call.get("id", position))
+            tool = call["tool"]
+            arguments = call.get("arguments") or {}
+            if step_id in seen:
+                raise BatchError(f"Duplicate step ID: {step_id}")
+            if tool == BATCH_TOOL:
+                raise BatchError(f"Step {step_id}: batches can't be nested")
+            handler = registry.get_handler(tool)
+            if handler is None:
+                raise BatchError(f"Step {step_id}: unknown tool '{tool}'")
+            if not isinstance(arguments, dict):
+                raise BatchError(f"Step {step_id}: arguments must be an object")
+            depends = _references(arguments)
+            # Only earlier steps can be referenced, so a batch never has cycles
+            unknown = depends - seen
+            if unknown:
+                raise BatchError(f"Step {step_id}: references unknown or later step(s) {', '.join(sorted(unknown))}")
+            seen.add(step_id)
+            steps.append({"id": step_id, "tool": tool, "arguments": arguments, "handler": handler,
+                          "schema": registry.get_tool(tool).inputSchema, "depends": depends})
+        referenced = set().union(*(step["depends"] for step in steps))
+        for step in steps:
+            if step["id"] in referenced:
+                step["arguments"] = {**step["arguments"], "format": "json"}
+        return steps
+    
+    async def _execute(self, calls: List[Dict[str, Any]], client: EagleClient,
+                       output_format: str = "text") -> List[Any]:
+        """Run a batch and collect every step's result."""
+        try:
+            steps = self._plan(calls)
+        except BatchError as e:
+            return self._error_response(str(e))
+        
+        semaphore = asyncio.Semaphore(self.concurrency)
+        done: Dict[str, asyncio.Future] = {step["id"]: asyncio.get_running_loop().create_future() for step in steps}
+        outputs: Dict[str, Any] = {}
+        
+        async def run(step: Dict[str, Any]) -> Dict[str, Any]:
+            result = {"id": step["id"], "tool": step["tool"]}
+            try:
+                for dependency in step["depends"]:
+                    if not await done[dependency]:
+                        result.update(status="skipped", error=f"Step '{dependency}' failed")
+                        return result
+                arguments = _resolve(step["arguments"], outputs)
+                # Checked after resolving references, as the MCP server does for direct calls
+                try:
+                    jsonschema.validate(arguments, step["schema"])
+                except jsonschema.ValidationError as e:
+                    raise BatchError(f"Input validation error: {e.message}") from None
+                async with semaphore:
+                    start = time.monotonic()
+                    with tracing.span(f"batch step {step['tool']}", **{"mcp.tool": step["tool"]}):
+                        try:
+                            content = await step["handler"].handle_call(step["tool"], arguments, client)
+                        except Exception as e:
+                            content = [ErrorTextContent(type="text", text=f"Error: {e}")]
+                    result["elapsed_ms"] = round((time.monotonic() - start) * 1000, 1)
+                failed = any(isinstance(part, ErrorTextContent) for part in content)
+                result.update(status="error" if failed else "ok", content=content)
+                if not failed and arguments.get("format") == "json" and content and isinstance(content[0], TextContent):
+                    try:
+                        outputs[step["id"]] = json_codec.loads(content[0].text)
+                    except Exception:
+                        result.update(status="error", error="Result is not JSON, so it can't be referenced")
+                return result
+            except BatchError as e:
+                result.update(status="error", error=str(e))
+                return result
+            finally:
+                done[step["id"]].set_result(result.get("status") == "ok")
+        
+        with tracing.span("batch", **{"batch.calls": len(steps)}):
+            results = await asyncio.gather(*(run(step) for step in steps))
+        return self._batch_response(results, output_format)
+    
+    def _batch_response(self, results: List[Dict[str, Any]], output_format: str) -> List[Any]:
+        """Combine step results: one JSON document, or text sections with images passed through."""
+        counts = {status: sum(1 for r in results if r["status"] == status) for status in ("ok", "error", "skipped")}
+        if output_format == "json":
+            steps = []
+            for result in results:
+                step = {key: value for key, value in result.items() if key != "content"}
+                step["content"] = [self._content_json(part) for part in result.get("content", ())]
+                steps.append(step)
+            return self._json_response({**counts, "results": steps})
+        
+        response: List[Any] = []
+        builder = self._builder(uncapped=True)
+        builder.add(f"Batch: {counts['ok']} ok, {counts['error']} failed, {counts['skipped']} skipped\n")
+        for result in results:
+            timing = f", {result['elapsed_ms']} ms" if "elapsed_ms" in result else ""
+            builder.add(f"\n### [{result['id']}] {result['tool']} ({result['status']}{timing})\n")
+            if "error" in result:
+                builder.add(result["error"], "\n")
+            for part in result.get("content", ()):
+                if isinstance(part, TextContent):
+                    builder.add(part.text, "\n")
+                else:
+                    # Images and other non-text content are returned as is, in order
+                    response.append(TextContent(type="text", text=builder.build()))
+                    response.append(part)
+                    builder = self._builder(uncapped=True)
+        text = builder.build()
+        if text:
+            response.append(TextContent(type="text", text=text))
+        return response
+    
+    @staticmethod
+    def _content_json(part: Any) -> Any:
+        """A step's content item as JSON (JSON text is embedded as data)."""
+        if isinstance(part, TextContent):
+            try:
+                return json_codec.loads(part.text)
+            except Exception:
+                return part.text
+        return part.model_dump(exclude_none=True)
@@ -0,0 +1,133 @@
+"""Diagnostics handler for Eagle MCP Server (health, metrics and traces)."""
+
+from typing import Any, Dict, List
+
+from mcp.types import Tool, TextContent
+from eagle_client import EagleClient
+from handlers.base import BaseHandler, OUTPUT_FORMAT_PROPERTY, ToolMethod
+from utils import metrics, tracing
+
+
+class DiagnosticsHandler(BaseHandler):
+    """Handler for server health and observability tools."""
+    
+    def get_tools(self) -> List[Tool]:
+        """Get diagnostics tools."""
+        return [
+            Tool(
+                name="health_check",
+                description="Check Eagle API connection status",
+                inputSchema={
+                    "type": "object",
+                    "properties": {},
+                    "required": []
+                }
+            ),
+            Tool(
+                name="trace_last",
+                description="Show the span trees (handler, Eagle HTTP, file I/O timings) of recent slow tool calls",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "limit": {
+                            "type": "integer",
+                            "description": "Number of recent slow calls to return",
+                            "default": 5
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="server_metrics",
+                description="Get per-tool and per-endpoint latency, payload size, error and cache metrics",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "format": {
+                            "type": "string",
+                            "enum": ["text", "json"],
+                            "description": "Prometheus text exposition format or JSON with p50/p95/p99 estimates",
+                            "default": "text"
+                        }
+                    },
+                    "required": []
+                }
+            )
+        ]
+    
+    def _tool_methods(self) -> Dict[str, ToolMethod]:
+        """Diagnostics tool dispatch table."""
+        return {
+            "health_check": lambda args, client, fmt: self._health_check(client),
+            "trace_last": lambda args, client, fmt: self._trace_last(args.get("limit", 5), fmt),
+            "server_metrics": lambda args, client, fmt: self._server_metrics(fmt),
+        }
+    
+    async def _health_check(self, client: EagleClient) -> List[TextContent]:
+        """Report Eagle connectivity, circuit breaker and concurrency state."""
+        is_healthy = await client.health_check()
+        client_stats = client.get_stats()
+        circuit = client_stats["circuit"]
+        builder = self._builder()
+        builder.add(f"Eagle API is {'healthy' if is_healthy else 'unhealthy'}\n")
+        builder.add(f"- Circuit breaker: {circuit['state']}")
+        if circuit["state"] == "open":
+            builder.add(f" (retry in {circuit['retry_after']}s)")
+        builder.add("\n")
+        if circuit["last_error"]:
+            builder.add(f"- Last error: {circuit['last_error']}\n")
+        for stats in client_stats["limiters"].values():
+            builder.add(
+                f"- {stats['name'].capitalize()} concurrency: ",
+                f"{stats['in_flight']}/{stats['limit']} in flight ",
+                f"(max {stats['max_limit']}), queue depth {stats['queue_depth']}\n"
+            )
+        builder.add(
+            f"- Retries: {client_stats['retries']}, ",
+            f"stale responses served: {client_stats['stale_served']}\n",
+            f"- Coalesced GETs: {client_stats['coalesced']} ",
+            f"of {client_stats['get_requests']}\n"
+        )
+        warm = client_stats["warm_cache"]
+        lookups = warm["hits"] + warm["misses"]
+        if lookups:
+            builder.add(f"- Prefetch hit rate: {warm['hits'] / lookups:.0%} ({warm['hits']} of {lookups} GETs)\n")
+        return self._success_response(builder.build())
+    
+    async def _server_metrics(self, output_format: str = "text") -> List[TextContent]:
+        """Return all metrics in Prometheus text format or as JSON."""
+        if output_format == "json":
+            return self._json_response(metrics.REGISTRY.snapshot())
+        return self._success_response(metrics.REGISTRY.render())
+    
+    async def _trace_last(self, limit: int, output_format: str = "text") -> List[TextContent]:
+        """Render the span trees of the most recent slow tool calls."""
+        trees = [tracing.span_tree(root) for root in tracing.TRACER.recent_slow(limit)]
+        if output_format == "json":
+            return self._json_response({"count": len(trees), "traces": trees})
+        
+        threshold_ms = tracing.TRACER.slow_threshold_ns / 1e6
+        if not trees:
+            return self._success_response(f"No tool calls slower than {threshold_ms:.0f} ms recorded\n")
+        
+        builder = self._builder()
+        builder.line(f"Recent slow tool calls (>= {threshold_ms:.0f} ms, newest first): {len(trees)}")
+        builder.line()
+        
+        def add_node(node: Dict[str, Any], depth: int) -> None:
+            attributes = ", ".join(f"{k}={v}" for k, v in node["attributes"].items())
+            builder.add(f"{'  ' * depth}- {node['name']}: {node['duration_ms']:.1f} ms (+{node['start_offset_ms']:.1f} ms)")
+            if attributes:
+                builder.add(f" [{attributes}]")
+            if node.get("error"):
+                builder.add(f" ERROR: {node['error']}")
+            builder.line()
+            for child in node["children"]:
+                add_node(child, depth + 1)
+        
+        for tree in trees:
+            add_node(tree, 0)
+            builder.line()
+        return self._success_response(builder.build())
@@ -1,69 +1,91 @@
 """Direct API handler for Eagle MCP Server."""
 
+import functools
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 from mcp.types import Tool, TextContent
 from eagle_client import EagleClient, EagleAPIError
-from handlers.base import BaseHandler
+from handlers.base import BaseHandler, ToolMethod
+from services.library_manager import LibraryManager
+
+# In a real implementation, these would be loaded from a config file
+# or generated, but for clarity, we define them here. "required" lists only
+# the parameters the Eagle API documents as required; BaseHandler enforces it.
+TOOL_DEFINITIONS = [
+    # Application
+    {"name": "api_application_info", "description": "Get Eagle application info.", "params": {}},
+    
+    # Folder
+    {"name": "api_folder_create", "description": "Create a new folder.", "params": {"folderName": "string", "parent": "string"}, "required": ["folderName"]},
+    {"name": "api_folder_rename", "description": "Rename a folder.", "params": {"folderId": "string", "newName": "string"}, "required": ["folderId", "newName"]},
+    {"name": "api_folder_update", "description": "Update folder details.", "params": {"folderId": "string", "newName": "string", "newDescription": "string", "newColor": "string"}, "required": ["folderId"]},
+    {"name": "api_folder_list", "description": "List all folders.", "params": {}},
+    {"name": "api_folder_listRecent", "description": "List recent folders.", "params": {}},
+    
+    # Item
+    {"name": "api_item_addFromURL", "description": "Add item from a URL.", "params": {"url": "string", "name": "string", "folderId": "string", "tags": "array", "annotation": "string"}, "required": ["url", "name"]},
+    {"name": "api_item_addFromURLs", "description": "Add items from multiple URLs.", "params": {"items": "array", "folderId": "string"}, "required": ["items"]},
+    {"name": "api_item_addFromPath", "description": "Add item from a local path.", "params": {"path": "string", "name": "string", "folderId": "string", "tags": "array"}, "required": ["path", "name"]},
+    {"name": "api_item_addBookmark", "description": "Add a bookmark.", "params": {"url": "string", "name": "string", "base64": "string", "tags": "array", "folderId": "string"}, "required": ["url", "name"]},
+    {"name": "api_item_info", "description": "Get item details.", "params": {"id": "string"}, "required": ["id"]},
+    {"name": "api_item_list", "description": "Search for items.", "params": {"limit": "integer", "keyword": "string", "folders": "string", "tags": "string", "ext": "string"}},
+    {"name": "api_item_moveToTrash", "description": "Move items to trash.", "params": {"itemIds": "array"}, "required": ["itemIds"]},
+    {"name": "api_item_update", "description": "Update item metadata.", "params": {"id": "string", "tags": "array", "annotation": "string", "star": "integer", "url": "string"}, "required": ["id"]},
+    
+    # Library
+    {"name": "api_library_info", "description": "Get library info.", "params": {}},
+    {"name": "api_library_history", "description": "Get library history.", "params": {}},
+    {"name": "api_library_switch", "description": "Switch to a different library.", "params": {"libraryPath": "string"}, "required": ["libraryPath"]},
+]
+
 
 class DirectApiHandler(BaseHandler):
     """Handler for direct Eagle API calls."""
 
+    def __init__(self, library_manager: Optional[LibraryManager] = None):
+        # Library switches go through the manager so server-side state follows
+        self.library_manager = library_manager
+        super().__init__()
+    
     def get_tools(self) -> List[Tool]:
         """Get all direct API tools."""
-        # In a real implementation, these would be loaded from a config file
-        # or generated, but for clarity, we define them here.
-        tool_definitions = [
-            # Application
-            {"name": "api_application_info", "description": "Get Eagle application info.", "params": {}},
-
-            # Folder
-            {"name": "api_folder_create", "description": "Create a new folder.", "params": {"folderName": "string", "parent": "string"}},
-            {"name": "api_folder_rename", "description": "Rename a folder.", "params": {"folderId": "string", "newName": "string"}},
-            {"name": "api_folder_update", "description": "Update folder details.", "params": {"folderId": "string", "newName": "string", "newDescription": "string", "newColor": "string"}},
-            {"name": "api_folder_list", "description": "List all folders.", "params": {}},
-            {"name": "api_folder_listRecent", "description": "List recent folders.", "params": {}},
-
-            # Item
-            {"name": "api_item_addFromURL", "description": "Add item from a URL.", "params": {"url": "string", "name": "string", "folderId": "string", "tags": "array", "annotation": "string"}},
-            {"name": "api_item_addFromURLs", "description": "Add items from multiple URLs.", "params": {"items": "array", "folderId": "string"}},
-            {"name": "api_item_addFromPath", "description": "Add item from a local path.", "params": {"path": "string", "name": "string", "folderId": "string", "tags": "array"}},
-            {"name": "api_item_addBookmark", "description": "Add a bookmark.", "params": {"url": "string", "name": "string", "base64": "string", "tags": "array", "folderId": "string"}},
-            {"name": "api_item_info", "description": "Get item details.", "params": {"id": "string"}},
-            {"name": "api_item_list", "description": "Search for items.", "params": {"limit": "integer", "keyword": "string", "folders": "string", "tags": "string", "ext": "string"}},
-            {"name": "api_item_moveToTrash", "description": "Move items to trash.", "params": {"itemIds": "array"}},
-            {"name": "api_item_update", "description": "Update item metadata.", "params": {"id": "string", "tags": "array", "annotation": "string", "star": "integer", "url": "string"}},
-
-            # Library
-            {"name": "api_library_info", "description": "Get library info.", "params": {}},
-            {"name": "api_library_history", "description": "Get library history.", "params": {}},
-            {"name": "api_library_switch", "description": "Switch to a different library.", "params": {"libraryPath": "string"}},
-        ]
-
         tools = []
-        for tool_def in tool_definitions:
-            properties = {}
-            required = []
-            for param, param_type in tool_def["params"].items():
-                properties[param] = {"type": param_type}
-                # Simple logic to make params required if they are part of the core functionality
-                if "Id" in param or "Name" in param or "URL" in param or "Path" in param or "items" in param:
-                    required.append(param)
-
+        for tool_def in TOOL_DEFINITIONS:
+            properties = {param: {"type": param_type} for param, param_type in tool_def["params"].items()}
             tools.append(Tool(
                 name=tool_def["name"],
                 description=tool_def["description"],
                 inputSchema={
                     "type": "object",
                     "properties": properties,
-                    "required": list(set(required)) # Ensure no duplicates
+                    # Only what Eagle itself rejects a call without
+                    "required": tool_def.get("required", [])
                 }
             ))
         return tools
 
-    async def handle_call(self, name: str, arguments: Dict[str, Any], client: EagleClient) -> List[TextContent]:
-        """Handle direct API tool calls."""
+    def _tool_methods(self) -> Dict[str, ToolMethod]:
+        """Every Direct API tool maps onto the same generic call."""
+        methods = {tool.name: functools.partial(self._call_api, tool.name) for tool in self.tools}
+        if self.library_manager is not None:
+            methods["api_library_switch"] = self._switch_library
+        return methods
+    
+    async def _switch_library(self, arguments: Dict[str, Any], client: EagleClient,
+                              output_format: str = "text") -> List[TextContent]:
+        """Switch libraries through the library manager, returning Eagle's raw response."""
+        try:
+            result = await self.library_manager.switch(client, arguments["libraryPath"])
+            return self._success_response(json.dumps(result["response"], indent=2, ensure_ascii=False))
+        except EagleAPIError as e:
+            return self._error_response(f"Eagle API error in api_library_switch: {e}")
+        except Exception as e:
+            return self._error_response(f"Unexpected error in api_library_switch: {e}")
+    
+    async def _call_api(self, name: str, arguments: Dict[str, Any], client: EagleClient,
+                        output_format: str = "text") -> List[TextContent]:
+        """Forward a Direct API tool call to the matching Eagle endpoint."""
         try:
             # Use EagleClient's helper method for endpoint determination
             endpoint, method = client.get_endpoint_and_method(name)
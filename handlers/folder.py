@@ -1,12 +1,21 @@
 """Folder handler for Eagle MCP Server with CRUD operations."""
 
 import json
-from typing import Any, Dict, List
+from typing import Dict, List
 
 from mcp.types import Tool, TextContent
 from eagle_client import EagleClient
-from handlers.base import BaseHandler
-from utils.encoding import create_safe_summary, get_display_name, clean_response_text, format_japanese_safe
+from handlers.base import BaseHandler, BUDGET_PROPERTIES, OUTPUT_FORMAT_PROPERTY, ToolMethod
+from schemas.base import FolderListResponse, ItemListResponse
+from utils.encoding import create_safe_summary, get_display_name, format_japanese_safe
+from utils.text import fold
+
+
+# Summary groups of truncated folder listings
+FOLDER_GROUPS = {
+    "with_subfolders": lambda folder: ("yes" if folder.get("children") else "no",),
+    "tags": lambda folder: folder.get("tags") or (),
+}
 
 
 class FolderHandler(BaseHandler):
@@ -20,7 +29,10 @@ class FolderHandler(BaseHandler):
                 description="List all folders in the Eagle library",
                 inputSchema={
                     "type": "object",
-                    "properties": {},
+                    "properties": {
+                        **BUDGET_PROPERTIES,
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
                     "required": []
                 }
             ),
@@ -33,7 +45,9 @@ class FolderHandler(BaseHandler):
                         "keyword": {
                             "type": "string",
                             "description": "Search keyword for folder name"
-                        }
+                        },
+                        **BUDGET_PROPERTIES,
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["keyword"]
                 }
@@ -47,7 +61,8 @@ class FolderHandler(BaseHandler):
                         "folder_id": {
                             "type": "string",
                             "description": "The ID of the folder"
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["folder_id"]
                 }
@@ -66,7 +81,8 @@ class FolderHandler(BaseHandler):
                             "type": "string",
                             "description": "Parent folder ID (optional)",
                             "default": ""
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["folder_name"]
                 }
@@ -88,7 +104,8 @@ class FolderHandler(BaseHandler):
                         "description": {
                             "type": "string",
                             "description": "New folder description (optional)"
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["folder_id"]
                 }
@@ -106,123 +123,123 @@ class FolderHandler(BaseHandler):
                         "new_name": {
                             "type": "string",
                             "description": "New name for the folder"
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["folder_id", "new_name"]
                 }
             )
         ]
     
-    async def handle_call(self, name: str, arguments: Dict[str, Any], client: EagleClient) -> List[TextContent]:
-        """Handle folder tool calls."""
-        if name == "folder_list":
-            return await self._list_folders(client)
-        elif name == "folder_search":
-            return await self._search_folders(arguments["keyword"], client)
-        elif name == "folder_info":
-            if "folder_id" not in arguments:
-                return self._error_response("Missing required parameter: folder_id")
-            return await self._get_folder_info(arguments["folder_id"], client)
-        elif name == "folder_create":
-            if "folder_name" not in arguments:
-                return self._error_response("Missing required parameter: folder_name")
-            return await self._create_folder(
-                arguments["folder_name"],
-                arguments.get("parent_id", ""),
-                client
-            )
-        elif name == "folder_update":
-            if "folder_id" not in arguments:
-                return self._error_response("Missing required parameter: folder_id")
-            return await self._update_folder(
-                arguments["folder_id"],
-                arguments.get("folder_name"),
-                arguments.get("description"),
-                client
-            )
-        elif name == "folder_rename":
-            if "folder_id" not in arguments:
-                return self._error_response("Missing required parameter: folder_id")
-            if "new_name" not in arguments:
-                return self._error_response("Missing required parameter: new_name")
-            return await self._rename_folder(
-                arguments["folder_id"],
-                arguments["new_name"],
-                client
-            )
-        else:
-            return self._error_response(f"Unknown folder tool: {name}")
+    def _tool_methods(self) -> Dict[str, ToolMethod]:
+        """Folder tool dispatch table."""
+        return {
+            "folder_list": lambda args, client, fmt: self._list_folders(client, fmt),
+            "folder_search": lambda args, client, fmt: self._search_folders(args["keyword"], client, fmt),
+            "folder_info": lambda args, client, fmt: self._get_folder_info(args["folder_id"], client, fmt),
+            "folder_create": lambda args, client, fmt: self._create_folder(
+                args["folder_name"], args.get("parent_id", ""), client, fmt
+            ),
+            "folder_update": lambda args, client, fmt: self._update_folder(
+                args["folder_id"], args.get("folder_name"), args.get("description"), client, fmt
+            ),
+            "folder_rename": lambda args, client, fmt: self._rename_folder(
+                args["folder_id"], args["new_name"], client, fmt
+            ),
+        }
     
-    async def _list_folders(self, client: EagleClient) -> List[TextContent]:
+    async def _list_folders(self, client: EagleClient, output_format: str = "text") -> List[TextContent]:
         """List all folders."""
         try:
-            result = await client.get("/api/folder/list")
+            result = await client.get("/api/folder/list", model=FolderListResponse)
             
             if not result.get("status") == "success":
                 return self._error_response("Failed to get folder list")
             
-            folders = result.get("data", [])
+            page = self._page(result.get("data", []), FOLDER_GROUPS)
             
-            # Clean response data for proper encoding
-            folders = clean_response_text(folders)
+            if output_format == "json":
+                return self._json_response({
+                    "count": len(page.entries),
+                    **page.to_dict(),
+                    "folders": [{"id": folder.get("id"), "name": folder.get("name")} for folder in page.entries]
+                })
             
             # Format response with proper Japanese text handling
-            response = f"Found {len(folders)} folders:\n\n"
-            for folder in folders:
+            builder = self._builder()
+            builder.add(f"Found {page.total} folders:\n\n")
+            for folder in page.entries:
                 name = get_display_name(folder, 'Unnamed Folder')
-                response += f"- {name} (ID: {folder.get('id', 'Unknown')})\n"
-            
-            return self._success_response(response)
+                builder.add(f"- {name} (ID: {folder.get('id', 'Unknown')})\n")
+            self._add_page_footer(builder, page, "folders")
             
+            return self._success_response(builder.build())
+        
         except Exception as e:
             return self._error_response(f"Error listing folders: {e}")
     
-    async def _search_folders(self, keyword: str, client: EagleClient) -> List[TextContent]:
+    async def _search_folders(self, keyword: str, client: EagleClient, output_format: str = "text") -> List[TextContent]:
         """Search folders by keyword."""
         try:
-            result = await client.get("/api/folder/list")
+            result = await client.get("/api/folder/list", model=FolderListResponse)
             
             if not result.get("status") == "success":
                 return self._error_response("Failed to get folder list")
             
             folders = result.get("data", [])
-            folders = clean_response_text(folders)
             
-            # Filter by keyword (case-insensitive)
-            matching_folders = [
-                f for f in folders 
-                if keyword.lower() in get_display_name(f).lower()
-            ]
+            # Filter by keyword (NFKC, case and kana folded, on the full name)
+            needle = fold(keyword)
+            matching_folders = [f for f in folders if needle in fold(f.get("name") or "")]
+            
+            page = self._page(matching_folders, FOLDER_GROUPS)
+            
+            if output_format == "json":
+                return self._json_response({
+                    "keyword": keyword,
+                    "count": len(page.entries),
+                    **page.to_dict(),
+                    "folders": [{"id": folder.get("id"), "name": folder.get("name")} for folder in page.entries]
+                })
             
             if not matching_folders:
                 return self._success_response(f"No folders found matching '{keyword}'")
             
             # Use the safe summary function
-            response = create_safe_summary(matching_folders, "folders")
-            response = f"Search results for '{keyword}':\n\n{response}"
-            
-            return self._success_response(response)
+            builder = self._builder()
+            builder.add(f"Search results for '{keyword}':\n\n",
+                        create_safe_summary(page.entries, "folders", total=page.total, start=page.offset))
+            self._add_page_footer(builder, page, "folders")
             
+            return self._success_response(builder.build())
+        
         except Exception as e:
             return self._error_response(f"Error searching folders: {e}")
     
-    async def _get_folder_info(self, folder_id: str, client: EagleClient) -> List[TextContent]:
+    async def _get_folder_info(self, folder_id: str, client: EagleClient, output_format: str = "text") -> List[TextContent]:
         """Get detailed folder information."""
         try:
             # Get folder details
-            result = await client.get("/api/folder/list")
+            result = await client.get("/api/folder/list", model=FolderListResponse)
             
             if not result.get("status") == "success":
                 return self._error_response("Failed to get folder list")
             
-            folders = result.get("data", [])
-            folder = next((f for f in folders if f.get("id") == folder_id), None)
+            # Search the whole tree: subfolders have IDs of their own
+            stack = list(result.get("data", []))
+            folder = None
+            while stack and folder is None:
+                current = stack.pop()
+                if current.get("id") == folder_id:
+                    folder = current
+                stack.extend(current.get("children") or [])
             
             if not folder:
                 return self._error_response(f"Folder with ID '{folder_id}' not found")
             
             # Get items in folder with higher limit to get accurate count
-            items_result = await client.get("/api/item/list", {"folders": folder_id, "limit": 1000})
+            items_result = await client.get("/api/item/list", {"folders": folder_id, "limit": 1000},
+                                            model=ItemListResponse)
             items_count = 0
             sample_items = []
             total_items = 0
@@ -238,48 +255,58 @@ class FolderHandler(BaseHandler):
                     # Note: Eagle API doesn't provide total count, so we show 1000+
                     total_items = "1000+"
             
-            # Clean response data and get display name
-            folder = clean_response_text(folder)
+            if output_format == "json":
+                return self._json_response({
+                    "id": folder.get("id"),
+                    "name": folder.get("name"),
+                    "description": folder.get("description"),
+                    "items": total_items,
+                    "sample_items": sample_items
+                })
+            
             name = get_display_name(folder, 'Unnamed Folder')
             
-            response = f"Folder Information:\n"
-            response += f"- Name: {name}\n"
-            response += f"- ID: {folder.get('id', 'Unknown')}\n"
-            response += f"- Items: {total_items}\n"
+            builder = self._builder()
+            builder.add(
+                "Folder Information:\n",
+                f"- Name: {name}\n",
+                f"- ID: {folder.get('id', 'Unknown')}\n",
+                f"- Items: {total_items}\n"
+            )
             
             # Add folder status information
             if items_count == 0:
-                response += f"- Status: Empty folder (no items)\n"
+                builder.add("- Status: Empty folder (no items)\n")
             elif isinstance(total_items, str) and "+" in str(total_items):
-                response += f"- Status: Large folder (showing first 1000 items)\n"
+                builder.add("- Status: Large folder (showing first 1000 items)\n")
             else:
-                response += f"- Status: Active folder\n"
+                builder.add("- Status: Active folder\n")
             
             if folder.get("description"):
                 desc = format_japanese_safe(folder.get('description', ''))
-                response += f"- Description: {desc}\n"
+                builder.add(f"- Description: {desc}\n")
             
             # Add creation/modification info if available
             if folder.get("dateCreated"):
-                response += f"- Created: {folder.get('dateCreated')}\n"
+                builder.add(f"- Created: {folder.get('dateCreated')}\n")
             if folder.get("dateModified"):
-                response += f"- Modified: {folder.get('dateModified')}\n"
+                builder.add(f"- Modified: {folder.get('dateModified')}\n")
             
             # Enhanced sample items display
             if sample_items:
-                safe_items = [format_japanese_safe(item) for item in sample_items]
-                response += f"- Sample items ({len(sample_items)} of {total_items}):\n"
-                for i, item in enumerate(safe_items, 1):
-                    response += f"  {i}. {item}\n"
+                builder.add(f"- Sample items ({len(sample_items)} of {total_items}):\n")
+                for i, item in enumerate(sample_items, 1):
+                    builder.add(f"  {i}. {format_japanese_safe(item)}\n")
             elif items_count == 0:
-                response += f"- Sample items: None (folder is empty)\n"
-            
-            return self._success_response(response)
+                builder.add("- Sample items: None (folder is empty)\n")
             
+            return self._success_response(builder.build())
+        
         except Exception as e:
             return self._error_response(f"Error getting folder info: {e}")
     
-    async def _create_folder(self, folder_name: str, parent_id: str, client: EagleClient) -> List[TextContent]:
+    async def _create_folder(self, folder_name: str, parent_id: str, client: EagleClient,
+                             output_format: str = "text") -> List[TextContent]:
         """Create a new folder."""
         try:
             # Prepare request data
@@ -294,19 +321,31 @@ class FolderHandler(BaseHandler):
             
             created_folder = result.get("data", {})
             
-            response = f"Folder created successfully:\n"
-            response += f"- Name: {created_folder.get('name', folder_name)}\n"
-            response += f"- ID: {created_folder.get('id', 'Unknown')}\n"
+            if output_format == "json":
+                return self._json_response({
+                    "id": created_folder.get("id"),
+                    "name": created_folder.get("name", folder_name),
+                    "parent_id": parent_id or None,
+                    "modification_time": created_folder.get("modificationTime")
+                })
+            
+            builder = self._builder()
+            builder.add(
+                "Folder created successfully:\n",
+                f"- Name: {created_folder.get('name', folder_name)}\n",
+                f"- ID: {created_folder.get('id', 'Unknown')}\n"
+            )
             if parent_id:
-                response += f"- Parent ID: {parent_id}\n"
-            response += f"- Creation Time: {created_folder.get('modificationTime', 'Unknown')}\n"
-            
-            return self._success_response(response)
+                builder.add(f"- Parent ID: {parent_id}\n")
+            builder.add(f"- Creation Time: {created_folder.get('modificationTime', 'Unknown')}\n")
             
+            return self._success_response(builder.build())
+        
         except Exception as e:
             return self._error_response(f"Error creating folder: {e}")
     
-    async def _update_folder(self, folder_id: str, folder_name: str, description: str, client: EagleClient) -> List[TextContent]:
+    async def _update_folder(self, folder_id: str, folder_name: str, description: str, client: EagleClient,
+                             output_format: str = "text") -> List[TextContent]:
         """Update folder properties."""
         try:
             # Prepare update data
@@ -325,19 +364,27 @@ class FolderHandler(BaseHandler):
             if not result.get("status") == "success":
                 return self._error_response(f"Failed to update folder '{folder_id}'")
             
-            response = f"Folder updated successfully:\n"
-            response += f"- Folder ID: {folder_id}\n"
+            if output_format == "json":
+                return self._json_response({
+                    "id": folder_id,
+                    "name": folder_name,
+                    "description": description
+                })
+            
+            builder = self._builder()
+            builder.add("Folder updated successfully:\n", f"- Folder ID: {folder_id}\n")
             if folder_name:
-                response += f"- New Name: {folder_name}\n"
+                builder.add(f"- New Name: {folder_name}\n")
             if description:
-                response += f"- New Description: {description}\n"
-            
-            return self._success_response(response)
+                builder.add(f"- New Description: {description}\n")
             
+            return self._success_response(builder.build())
+        
         except Exception as e:
             return self._error_response(f"Error updating folder: {e}")
     
-    async def _rename_folder(self, folder_id: str, new_name: str, client: EagleClient) -> List[TextContent]:
+    async def _rename_folder(self, folder_id: str, new_name: str, client: EagleClient,
+                             output_format: str = "text") -> List[TextContent]:
         """Rename a folder."""
         try:
             data = {
@@ -350,11 +397,16 @@ class FolderHandler(BaseHandler):
             if not result.get("status") == "success":
                 return self._error_response(f"Failed to rename folder '{folder_id}'")
             
-            response = f"Folder renamed successfully:\n"
-            response += f"- Folder ID: {folder_id}\n"
-            response += f"- New Name: {new_name}\n"
+            if output_format == "json":
+                return self._json_response({"id": folder_id, "name": new_name})
             
-            return self._success_response(response)
+            response = (
+                "Folder renamed successfully:\n"
+                f"- Folder ID: {folder_id}\n"
+                f"- New Name: {new_name}\n"
+            )
             
+            return self._success_response(response)
+        
         except Exception as e:
             return self._error_response(f"Error renaming folder: {e}")
\ No newline at end of file
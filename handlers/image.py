@@ -1,19 +1,67 @@
 """Image handler for Eagle MCP Server - Multimodal support."""
 
-import base64
+import asyncio
 import os
 import urllib.parse
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 from pathlib import Path
 
 from mcp.types import Tool, TextContent, ImageContent
+from config import (
+    IMAGE_REGION_CACHE_SIZE, IMAGE_REGION_MAX_PIXELS, IMAGE_REGION_SOURCE_MAX_PIXELS, THUMBNAIL_CACHE_SIZE
+)
 from eagle_client import EagleClient
-from handlers.base import BaseHandler
-from utils.encoding import get_display_name, clean_response_text, format_japanese_safe
+from handlers.base import BaseHandler, OUTPUT_FORMAT_PROPERTY, ResponseBuilder, ToolMethod
+from utils import metrics, tracing
+from utils.cache import ResponseCache
+from utils.encoding import get_display_name, format_japanese_safe
+from utils.file_io import FILE_IO, FileIO
+
+
+MIME_TYPE_MAP = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg', 
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp',
+    '.bmp': 'image/bmp'
+}
+
+
+def thumbnail_mime_type(path: str) -> str:
+    """MIME type of a thumbnail file (Eagle writes PNG thumbnails, JPEG for some originals)."""
+    return 'image/jpeg' if Path(path).suffix.lower() in ('.jpg', '.jpeg') else 'image/png'
+
+
+class ImageLoadError(Exception):
+    """Raised when an item's image cannot be located or read."""
 
 
 class ImageHandler(BaseHandler):
-    """Handler for image-related tools with multimodal support."""
+    """Handler for image-related tools with multimodal support.
+    
+    All file system access goes through ``file_io`` (a bounded thread pool),
+    never directly on the event loop.
+    """
+    
+    def __init__(self, file_io: Optional[FileIO] = None):
+        self.file_io = file_io if file_io is not None else FILE_IO
+        # image_get_region results keyed by (item, mtime, region); the process
+        # pool (and Pillow) are only loaded on the first region request
+        self._region_cache = ResponseCache(IMAGE_REGION_CACHE_SIZE)
+        self._region_extractor = None
+        # Base64 thumbnails keyed by (path, mtime, size), warmed by the prefetcher
+        self._thumbnail_cache = ResponseCache(THUMBNAIL_CACHE_SIZE)
+        super().__init__()
+    
+    def shutdown(self) -> None:
+        """Stop the region worker processes and the file I/O threads.
+        
+        Both pools are created again on next use.
+        """
+        if self._region_extractor is not None:
+            self._region_extractor.shutdown()
+        self.file_io.shutdown()
     
     def get_tools(self) -> List[Tool]:
         """Get image tools."""
@@ -32,7 +80,8 @@ class ImageHandler(BaseHandler):
                             "type": "boolean",
                             "description": "Use thumbnail instead of full image (faster, smaller)",
                             "default": True
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["item_id"]
                 }
@@ -46,7 +95,8 @@ class ImageHandler(BaseHandler):
                         "item_id": {
                             "type": "string",
                             "description": "The ID of the item to get file path"
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["item_id"]
                 }
@@ -70,11 +120,48 @@ class ImageHandler(BaseHandler):
                             "type": "boolean",
                             "description": "Use thumbnail for faster analysis",
                             "default": True
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["item_id"]
                 }
             ),
+            Tool(
+                name="image_get_region",
+                description=(
+                    "Get a cropped region of an item's original image, optionally downscaled, "
+                    "to inspect details of very large images without transferring the whole file "
+                    "(requires Pillow)"
+                ),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "item_id": {
+                            "type": "string",
+                            "description": "The ID of the item"
+                        },
+                        "x": {"type": "integer", "minimum": 0, "description": "Left edge in original pixels"},
+                        "y": {"type": "integer", "minimum": 0, "description": "Top edge in original pixels"},
+                        "width": {"type": "integer", "minimum": 1, "description": "Region width in original pixels"},
+                        "height": {"type": "integer", "minimum": 1, "description": "Region height in original pixels"},
+                        "scale": {
+                            "type": "number",
+                            "exclusiveMinimum": 0,
+                            "maximum": 1,
+                            "description": "Output scale relative to the region (e.g. 0.25 for a quarter size)",
+                            "default": 1.0
+                        },
+                        "image_format": {
+                            "type": "string",
+                            "enum": ["png", "jpeg"],
+                            "description": "Encoding of the returned region",
+                            "default": "png"
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": ["item_id", "x", "y", "width", "height"]
+                }
+            ),
             Tool(
                 name="thumbnail_get_base64",
                 description="Get thumbnail image as Base64 for quick preview",
@@ -84,115 +171,172 @@ class ImageHandler(BaseHandler):
                         "item_id": {
                             "type": "string",
                             "description": "The ID of the item to get thumbnail"
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["item_id"]
                 }
             )
         ]
     
-    async def handle_call(self, name: str, arguments: Dict[str, Any], client: EagleClient) -> List[TextContent]:
-        """Handle image tool calls."""
-        if name == "image_get_base64":
-            if "item_id" not in arguments:
-                return self._error_response("Missing required parameter: item_id")
-            return await self._get_image_base64(
-                arguments["item_id"],
-                arguments.get("use_thumbnail", True),
-                client
-            )
-        elif name == "image_get_filepath":
-            if "item_id" not in arguments:
-                return self._error_response("Missing required parameter: item_id")
-            return await self._get_image_filepath(arguments["item_id"], client)
-        elif name == "image_analyze_prompt":
-            if "item_id" not in arguments:
-                return self._error_response("Missing required parameter: item_id")
-            return await self._analyze_image_prompt(
-                arguments["item_id"],
-                arguments.get("analysis_prompt", "Describe this image in detail"),
-                arguments.get("use_thumbnail", True),
-                client
-            )
-        elif name == "thumbnail_get_base64":
-            if "item_id" not in arguments:
-                return self._error_response("Missing required parameter: item_id")
-            return await self._get_thumbnail_base64(arguments["item_id"], client)
+    def _tool_methods(self) -> Dict[str, ToolMethod]:
+        """Image tool dispatch table."""
+        return {
+            "image_get_base64": lambda args, client, fmt: self._get_image_base64(
+                args["item_id"], args.get("use_thumbnail", True), client, fmt
+            ),
+            "image_get_filepath": lambda args, client, fmt: self._get_image_filepath(args["item_id"], client, fmt),
+            "image_analyze_prompt": lambda args, client, fmt: self._analyze_image_prompt(
+                args["item_id"],
+                args.get("analysis_prompt", "Describe this image in detail"),
+                args.get("use_thumbnail", True),
+                client,
+                fmt
+            ),
+            "image_get_region": lambda args, client, fmt: self._get_image_region(args, client, fmt),
+            "thumbnail_get_base64": lambda args, client, fmt: self._get_thumbnail_base64(args["item_id"], client, fmt),
+        }
+    
+    async def _fetch_item(self, item_id: str, client: EagleClient) -> Dict[str, Any]:
+        """Fetch item info, raising ImageLoadError if Eagle reports a failure."""
+        item_info = await client.get("/api/item/info", {"id": item_id})
+        if not item_info.get("status") == "success":
+            raise ImageLoadError(f"Failed to get item info for ID: {item_id}")
+        return item_info.get("data", {})
+    
+    async def _load_image(self, item_id: str, use_thumbnail: bool, client: EagleClient,
+                          item: Dict[str, Any]) -> Dict[str, Any]:
+        """Locate and Base64-encode an item's image (thumbnail or original)."""
+        if use_thumbnail:
+            # Get thumbnail path
+            thumbnail_result = await client.get("/api/item/thumbnail", {"id": item_id})
+            if not thumbnail_result.get("status") == "success":
+                raise ImageLoadError(f"Failed to get thumbnail for ID: {item_id}")
+            
+            image_path = urllib.parse.unquote(thumbnail_result.get("data") or "")
+            image_data = await self._thumbnail_data(image_path) if image_path else None
         else:
-            return self._error_response(f"Unknown image tool: {name}")
+            image_path = await self._original_path(item_id, item, client)
+            image_data = None
+            if image_path and await self.file_io.exists(image_path):
+                # Read and encode image
+                image_data = await self.file_io.read_base64(image_path)
+        
+        if image_data is None:
+            raise ImageLoadError(f"Image file not found: {image_path}")
+        
+        return {
+            "path": image_path,
+            "mime_type": MIME_TYPE_MAP.get(Path(image_path).suffix.lower(), 'image/jpeg'),
+            "data": image_data
+        }
     
-    async def _get_image_base64(self, item_id: str, use_thumbnail: bool, client: EagleClient) -> List[TextContent]:
+    async def _thumbnail_key(self, path: str) -> Optional[tuple]:
+        """Thumbnail cache key for ``path`` (None if the file doesn't exist)."""
+        try:
+            stat = await self.file_io.run(os.stat, path)
+        except OSError:
+            return None
+        return (path, stat.st_mtime_ns, stat.st_size)
+    
+    async def _thumbnail_data(self, path: str) -> Optional[str]:
+        """Base64 data of a thumbnail file, from the cache when unchanged on disk."""
+        key = await self._thumbnail_key(path)
+        if key is None:
+            return None
+        data = self._thumbnail_cache.get(key)
+        metrics.CACHE_EVENTS.inc(cache="thumbnail", result="miss" if data is None else "hit")
+        if data is None:
+            data = await self.file_io.read_base64(path)
+            self._thumbnail_cache.put(key, data)
+        return data
+    
+    async def thumbnail_base64(self, item_id: str, client: EagleClient) -> Tuple[str, str]:
+        """Return an item's thumbnail path and Base64 data (cached while unchanged on disk)."""
+        thumbnail_result = await client.get("/api/item/thumbnail", {"id": item_id})
+        if not thumbnail_result.get("status") == "success":
+            raise ImageLoadError(f"Failed to get thumbnail for ID: {item_id}")
+        thumbnail_path = urllib.parse.unquote(thumbnail_result.get("data") or "")
+        thumb_data = await self._thumbnail_data(thumbnail_path) if thumbnail_path else None
+        if thumb_data is None:
+            raise ImageLoadError(f"Thumbnail file not found: {thumbnail_path}")
+        return thumbnail_path, thumb_data
+    
+    async def warm_thumbnail(self, item_id: str, client: EagleClient) -> bool:
+        """Prefetch an item's thumbnail path and encoded data (not counted as cache lookups)."""
+        result = await client.warm("/api/item/thumbnail", {"id": item_id})
+        path = urllib.parse.unquote(result.get("data") or "") if result.get("status") == "success" else ""
+        key = await self._thumbnail_key(path) if path else None
+        if key is None:
+            return False
+        if self._thumbnail_cache.peek(key) is None:
+            self._thumbnail_cache.put(key, await self.file_io.read_base64(path))
+        return True
+    
+    async def _original_path(self, item_id: str, item: Dict[str, Any], client: EagleClient) -> Optional[str]:
+        """Construct the original file's path from the thumbnail path and the item's extension."""
+        thumbnail_result = await client.get("/api/item/thumbnail", {"id": item_id})
+        if not thumbnail_result.get("status") == "success":
+            return None
+        thumbnail_path = urllib.parse.unquote(thumbnail_result.get("data", ""))
+        if not thumbnail_path or "_thumbnail" not in thumbnail_path:
+            return None
+        # Remove _thumbnail and use actual file extension from Eagle API
+        image_path_without_ext = os.path.splitext(thumbnail_path.replace("_thumbnail", ""))[0]
+        return f"{image_path_without_ext}.{item.get('ext', 'jpg')}"
+    
+    def _add_image_base64_text(self, builder: ResponseBuilder, item_id: str, item: Dict[str, Any],
+                               image: Dict[str, Any], use_thumbnail: bool) -> None:
+        """Append the text rendering of an encoded image to a response builder."""
+        name = get_display_name(item, 'Unnamed Image')
+        mime_type = image["mime_type"]
+        builder.add(
+            f"Image Base64 Data for {name}:\n\n",
+            f"- Item ID: {item_id}\n",
+            f"- File Type: {item.get('ext', 'unknown')}\n",
+            f"- MIME Type: {mime_type}\n",
+            f"- Source: {'Thumbnail' if use_thumbnail else 'Full Image'}\n",
+            f"- Image Path: {image['path']}\n\n",
+            f"Base64 Data (length: {len(image['data'])} chars):\n",
+            f"data:{mime_type};base64,", image["data"]
+        )
+    
+    def _image_json(self, item_id: str, item: Dict[str, Any], image: Dict[str, Any],
+                    use_thumbnail: bool) -> Dict[str, Any]:
+        """Structured form of an encoded image."""
+        return {
+            "item_id": item_id,
+            "name": item.get("name"),
+            "ext": item.get("ext"),
+            "mime_type": image["mime_type"],
+            "source": "thumbnail" if use_thumbnail else "original",
+            "path": image["path"],
+            "data_length": len(image["data"]),
+            "data": image["data"]
+        }
+    
+    async def _get_image_base64(self, item_id: str, use_thumbnail: bool, client: EagleClient,
+                                output_format: str = "text") -> List[TextContent]:
         """Get image as Base64 encoded data."""
         try:
-            # Get item info first
-            item_info = await client.get("/api/item/info", {"id": item_id})
-            if not item_info.get("status") == "success":
-                return self._error_response(f"Failed to get item info for ID: {item_id}")
-            
-            item = item_info.get("data", {})
-            item = clean_response_text(item)
-            
-            if use_thumbnail:
-                # Get thumbnail path
-                thumbnail_result = await client.get("/api/item/thumbnail", {"id": item_id})
-                if not thumbnail_result.get("status") == "success":
-                    return self._error_response(f"Failed to get thumbnail for ID: {item_id}")
-                
-                image_path = thumbnail_result.get("data")
-                if image_path:
-                    image_path = urllib.parse.unquote(image_path)
-            else:
-                # Construct full image path from thumbnail path using actual file extension
-                thumbnail_result = await client.get("/api/item/thumbnail", {"id": item_id})
-                if thumbnail_result.get("status") == "success":
-                    thumbnail_path = urllib.parse.unquote(thumbnail_result.get("data", ""))
-                    if thumbnail_path and "_thumbnail" in thumbnail_path:
-                        # Remove _thumbnail and use actual file extension from Eagle API
-                        image_path_base = thumbnail_path.replace("_thumbnail", "")
-                        image_path_without_ext = os.path.splitext(image_path_base)[0]
-                        original_ext = item.get('ext', 'jpg')
-                        image_path = f"{image_path_without_ext}.{original_ext}"
-                    else:
-                        image_path = None
-                else:
-                    image_path = None
-            
-            if not image_path or not os.path.exists(image_path):
-                return self._error_response(f"Image file not found: {image_path}")
+            item = await self._fetch_item(item_id, client)
+            image = await self._load_image(item_id, use_thumbnail, client, item)
             
-            # Read and encode image
-            with open(image_path, "rb") as image_file:
-                image_data = base64.b64encode(image_file.read()).decode('utf-8')
+            if output_format == "json":
+                return self._json_response(self._image_json(item_id, item, image, use_thumbnail))
             
-            # Determine MIME type
-            file_ext = Path(image_path).suffix.lower()
-            mime_type_map = {
-                '.jpg': 'image/jpeg',
-                '.jpeg': 'image/jpeg', 
-                '.png': 'image/png',
-                '.gif': 'image/gif',
-                '.webp': 'image/webp',
-                '.bmp': 'image/bmp'
-            }
-            mime_type = mime_type_map.get(file_ext, 'image/jpeg')
-            
-            # Format response with metadata
-            name = get_display_name(item, 'Unnamed Image')
-            response = f"Image Base64 Data for {name}:\n\n"
-            response += f"- Item ID: {item_id}\n"
-            response += f"- File Type: {item.get('ext', 'unknown')}\n"
-            response += f"- MIME Type: {mime_type}\n"
-            response += f"- Source: {'Thumbnail' if use_thumbnail else 'Full Image'}\n"
-            response += f"- Image Path: {image_path}\n\n"
-            response += f"Base64 Data (length: {len(image_data)} chars):\n"
-            response += f"data:{mime_type};base64,{image_data}"
-            
-            return self._success_response(response)
+            # Base64 payloads are never truncated
+            builder = self._builder(uncapped=True)
+            self._add_image_base64_text(builder, item_id, item, image, use_thumbnail)
             
+            return self._success_response(builder.build())
+        
+        except ImageLoadError as e:
+            return self._error_response(str(e))
         except Exception as e:
             return self._error_response(f"Error getting image Base64: {e}")
     
-    async def _get_image_filepath(self, item_id: str, client: EagleClient) -> List[TextContent]:
+    async def _get_image_filepath(self, item_id: str, client: EagleClient, output_format: str = "text") -> List[TextContent]:
         """Get image file path."""
         try:
             # Get item info
@@ -201,7 +345,6 @@ class ImageHandler(BaseHandler):
                 return self._error_response(f"Failed to get item info for ID: {item_id}")
             
             item = item_info.get("data", {})
-            item = clean_response_text(item)
             
             # Get thumbnail path and construct full image path
             thumbnail_result = await client.get("/api/item/thumbnail", {"id": item_id})
@@ -222,88 +365,175 @@ class ImageHandler(BaseHandler):
             file_path = f"{file_path_without_ext}.{original_ext}"
             
             # Check if files exist
-            file_exists = os.path.exists(file_path)
-            thumbnail_exists = os.path.exists(thumbnail_path)
+            file_exists, thumbnail_exists = await asyncio.gather(
+                self.file_io.exists(file_path), self.file_io.exists(thumbnail_path)
+            )
+            
+            if output_format == "json":
+                return self._json_response({
+                    "item_id": item_id,
+                    "name": item.get("name"),
+                    "file_path": file_path,
+                    "file_exists": file_exists,
+                    "thumbnail_path": thumbnail_path,
+                    "thumbnail_exists": thumbnail_exists,
+                    "size": item.get("size", 0),
+                    "width": item.get("width"),
+                    "height": item.get("height")
+                })
             
             # Format response
             name = get_display_name(item, 'Unnamed Image')
-            response = f"Image File Paths for {name}:\n\n"
-            response += f"- Item ID: {item_id}\n"
-            response += f"- Full Image: {file_path}\n"
-            response += f"- File Exists: {'Yes' if file_exists else 'No'}\n"
-            response += f"- Thumbnail: {thumbnail_path}\n"
-            response += f"- Thumbnail Exists: {'Yes' if thumbnail_exists else 'No'}\n"
-            response += f"- File Size: {item.get('size', 0)} bytes\n"
+            builder = self._builder()
+            builder.add(
+                f"Image File Paths for {name}:\n\n",
+                f"- Item ID: {item_id}\n",
+                f"- Full Image: {file_path}\n",
+                f"- File Exists: {'Yes' if file_exists else 'No'}\n",
+                f"- Thumbnail: {thumbnail_path}\n",
+                f"- Thumbnail Exists: {'Yes' if thumbnail_exists else 'No'}\n",
+                f"- File Size: {item.get('size', 0)} bytes\n"
+            )
             if item.get('width') and item.get('height'):
-                response += f"- Dimensions: {item.get('width')}x{item.get('height')}\n"
-            
-            return self._success_response(response)
+                builder.add(f"- Dimensions: {item.get('width')}x{item.get('height')}\n")
             
+            return self._success_response(builder.build())
+        
         except Exception as e:
             return self._error_response(f"Error getting image file path: {e}")
     
-    async def _analyze_image_prompt(self, item_id: str, analysis_prompt: str, use_thumbnail: bool, client: EagleClient) -> List[TextContent]:
+    async def _analyze_image_prompt(self, item_id: str, analysis_prompt: str, use_thumbnail: bool,
+                                    client: EagleClient, output_format: str = "text") -> List[TextContent]:
         """Prepare image for LLM analysis with custom prompt."""
         try:
-            # Get image Base64 data
-            base64_result = await self._get_image_base64(item_id, use_thumbnail, client)
+            # Get item info once and share it with the Base64 step
+            item = await self._fetch_item(item_id, client)
+            image = await self._load_image(item_id, use_thumbnail, client, item)
             
-            if base64_result[0].type == "text" and "Error:" in base64_result[0].text:
-                return base64_result  # Return error as-is
-            
-            # Get item info for context
-            item_info = await client.get("/api/item/info", {"id": item_id})
-            item = item_info.get("data", {}) if item_info.get("status") == "success" else {}
+            if output_format == "json":
+                return self._json_response({
+                    "analysis_prompt": analysis_prompt,
+                    "tags": item.get("tags", []),
+                    "annotation": item.get("annotation"),
+                    "image": self._image_json(item_id, item, image, use_thumbnail)
+                })
             
             # Format analysis prompt with context
             name = get_display_name(item, 'Unnamed Image')
-            response = f"Image Analysis Setup for {name}:\n\n"
-            response += f"Analysis Prompt: {analysis_prompt}\n\n"
-            response += f"Image Context:\n"
-            response += f"- Item ID: {item_id}\n"
-            response += f"- Name: {name}\n"
-            response += f"- Type: {item.get('ext', 'unknown')}\n"
+            builder = self._builder(uncapped=True)
+            builder.add(
+                f"Image Analysis Setup for {name}:\n\n",
+                f"Analysis Prompt: {analysis_prompt}\n\n",
+                "Image Context:\n",
+                f"- Item ID: {item_id}\n",
+                f"- Name: {name}\n",
+                f"- Type: {item.get('ext', 'unknown')}\n"
+            )
             if item.get('tags'):
                 safe_tags = [format_japanese_safe(tag) for tag in item.get('tags', [])]
-                response += f"- Current Tags: {', '.join(safe_tags)}\n"
+                builder.add(f"- Current Tags: {', '.join(safe_tags)}\n")
             if item.get('annotation'):
                 safe_annotation = format_japanese_safe(item.get('annotation', ''))
-                response += f"- Annotation: {safe_annotation}\n"
-            
-            response += f"\n{base64_result[0].text}"
+                builder.add(f"- Annotation: {safe_annotation}\n")
             
-            return self._success_response(response)
+            builder.add("\n")
+            self._add_image_base64_text(builder, item_id, item, image, use_thumbnail)
             
+            return self._success_response(builder.build())
+        
+        except ImageLoadError as e:
+            return self._error_response(str(e))
         except Exception as e:
             return self._error_response(f"Error preparing image analysis: {e}")
     
-    async def _get_thumbnail_base64(self, item_id: str, client: EagleClient) -> List[TextContent]:
+    async def _get_thumbnail_base64(self, item_id: str, client: EagleClient, output_format: str = "text") -> List[TextContent]:
         """Get thumbnail as Base64 for quick preview."""
         try:
-            # Get thumbnail path
-            thumbnail_result = await client.get("/api/item/thumbnail", {"id": item_id})
-            if not thumbnail_result.get("status") == "success":
-                return self._error_response(f"Failed to get thumbnail for ID: {item_id}")
+            # Read and encode thumbnail (or reuse the prefetched encoding)
+            thumbnail_path, thumb_data = await self.thumbnail_base64(item_id, client)
+            mime_type = thumbnail_mime_type(thumbnail_path)
             
-            thumbnail_path = urllib.parse.unquote(thumbnail_result.get("data", ""))
-            if not thumbnail_path or not os.path.exists(thumbnail_path):
-                return self._error_response(f"Thumbnail file not found: {thumbnail_path}")
+            if output_format == "json":
+                return self._json_response({
+                    "item_id": item_id,
+                    "path": thumbnail_path,
+                    "mime_type": mime_type,
+                    "data_length": len(thumb_data),
+                    "data": thumb_data
+                })
             
-            # Read and encode thumbnail
-            with open(thumbnail_path, "rb") as thumb_file:
-                thumb_data = base64.b64encode(thumb_file.read()).decode('utf-8')
+            builder = self._builder(uncapped=True)
+            builder.add(
+                f"Thumbnail Base64 Data for Item {item_id}:\n\n",
+                f"- Thumbnail Path: {thumbnail_path}\n",
+                f"- MIME Type: {mime_type}\n",
+                f"- Data Length: {len(thumb_data)} characters\n\n",
+                f"data:{mime_type};base64,", thumb_data
+            )
             
-            # Get file info
-            file_ext = Path(thumbnail_path).suffix.lower()
-            mime_type = 'image/jpeg' if file_ext in ['.jpg', '.jpeg'] else 'image/png'
+            return self._success_response(builder.build())
+        
+        except ImageLoadError as e:
+            return self._error_response(str(e))
+        except Exception as e:
+            return self._error_response(f"Error getting thumbnail Base64: {e}")
+    
+    async def _get_image_region(self, arguments: Dict[str, Any], client: EagleClient,
+                                output_format: str = "text") -> List[Any]:
+        """Get a (optionally downscaled) region of an item's original image."""
+        from utils import imaging
+        
+        if not imaging.AVAILABLE:
+            return self._error_response("image_get_region requires Pillow: pip install .[imaging]")
+        
+        item_id = arguments["item_id"]
+        try:
+            region_args = (
+                int(arguments["x"]), int(arguments["y"]), int(arguments["width"]), int(arguments["height"]),
+                float(arguments.get("scale", 1.0)), arguments.get("image_format", "png")
+            )
+            item = await self._fetch_item(item_id, client)
+            path = await self._original_path(item_id, item, client)
+            if not path or not await self.file_io.exists(path):
+                raise ImageLoadError(f"Image file not found: {path}")
             
-            response = f"Thumbnail Base64 Data for Item {item_id}:\n\n"
-            response += f"- Thumbnail Path: {thumbnail_path}\n"
-            response += f"- MIME Type: {mime_type}\n"
-            response += f"- Data Length: {len(thumb_data)} characters\n\n"
-            response += f"data:{mime_type};base64,{thumb_data}"
+            version = item.get("modificationTime") or await self.file_io.run(os.path.getmtime, path)
+            key = (item_id, version, *region_args)
+            region = self._region_cache.get(key)
+            metrics.CACHE_EVENTS.inc(cache="image_region", result="miss" if region is None else "hit")
+            if region is None:
+                if self._region_extractor is None:
+                    self._region_extractor = imaging.RegionExtractor()
+                with tracing.span("image.region", **{"file.path": path}) as span:
+                    region = await self._region_extractor.extract(
+                        path, *region_args, IMAGE_REGION_MAX_PIXELS, IMAGE_REGION_SOURCE_MAX_PIXELS
+                    )
+                    span.set_attribute("image.decoded", region["decoded"])
+                self._region_cache.put(key, region)
             
-            return self._success_response(response)
+            x, y, width, height, scale, _ = region_args
+            if output_format == "json":
+                return self._json_response({
+                    "item_id": item_id,
+                    "region": {"x": x, "y": y, "width": width, "height": height, "scale": scale},
+                    **region
+                })
             
+            name = get_display_name(item, 'Unnamed Image')
+            source_width, source_height = region["source_size"]
+            text = (
+                f"Region of {name}:\n"
+                f"- Item ID: {item_id}\n"
+                f"- Source: {source_width}x{source_height} ({item.get('ext', 'unknown')})\n"
+                f"- Region: x={x}, y={y}, {width}x{height} at scale {scale}\n"
+                f"- Output: {region['width']}x{region['height']} {region['mime_type']}\n"
+            )
+            return [
+                TextContent(type="text", text=text),
+                ImageContent(type="image", data=region["data"], mimeType=region["mime_type"])
+            ]
+        
+        except (ImageLoadError, imaging.RegionError) as e:
+            return self._error_response(str(e))
         except Exception as e:
-            return self._error_response(f"Error getting thumbnail Base64: {e}")
\ No newline at end of file
+            return self._error_response(f"Error getting image region: {e}")
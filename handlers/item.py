@@ -1,16 +1,30 @@
 """Item handler for Eagle MCP Server with management operations."""
 
-from typing import Any, Dict, List
+from typing import Dict, List, Optional
 
 from mcp.types import Tool, TextContent
 from eagle_client import EagleClient
-from handlers.base import BaseHandler
-from utils.encoding import create_safe_summary, get_display_name, clean_response_text, format_japanese_safe
+from handlers.base import BaseHandler, BUDGET_PROPERTIES, OUTPUT_FORMAT_PROPERTY, ToolMethod
+from schemas.base import ItemInfo, ItemListResponse
+from services.prefetch import Prefetcher
+from utils.encoding import get_display_name, format_japanese_safe
+
+
+# Summary groups of truncated item listings
+ITEM_GROUPS = {
+    "extensions": lambda item: (item.get("ext").lower(),) if item.get("ext") else (),
+    "tags": lambda item: item.get("tags") or (),
+}
 
 
 class ItemHandler(BaseHandler):
     """Handler for item-related tools."""
     
+    def __init__(self, prefetcher: Optional[Prefetcher] = None):
+        # Warms caches for the top search results; None disables prefetching
+        self.prefetcher = prefetcher
+        super().__init__()
+    
     def get_tools(self) -> List[Tool]:
         """Get item tools."""
         return [
@@ -28,7 +42,9 @@ class ItemHandler(BaseHandler):
                             "type": "integer",
                             "description": "Maximum number of items to return",
                             "default": 10
-                        }
+                        },
+                        **BUDGET_PROPERTIES,
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["keyword"]
                 }
@@ -42,7 +58,8 @@ class ItemHandler(BaseHandler):
                         "item_id": {
                             "type": "string",
                             "description": "The ID of the item"
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["item_id"]
                 }
@@ -67,7 +84,8 @@ class ItemHandler(BaseHandler):
                             "enum": ["replace", "add", "remove"],
                             "description": "How to update tags (replace, add, or remove)",
                             "default": "replace"
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["item_id", "tags"]
                 }
@@ -91,7 +109,8 @@ class ItemHandler(BaseHandler):
                             "minimum": 0,
                             "maximum": 5,
                             "description": "Star rating (0-5)"
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["item_id"]
                 }
@@ -105,79 +124,80 @@ class ItemHandler(BaseHandler):
                         "item_id": {
                             "type": "string",
                             "description": "The ID of the item to delete"
-                        }
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
                     },
                     "required": ["item_id"]
                 }
             )
         ]
     
-    async def handle_call(self, name: str, arguments: Dict[str, Any], client: EagleClient) -> List[TextContent]:
-        """Handle item tool calls."""
-        if name == "item_search":
-            return await self._search_items(arguments.get("keyword"), arguments.get("limit", 10), client)
-        elif name == "item_info":
-            if "item_id" not in arguments:
-                return self._error_response("Missing required parameter: item_id")
-            return await self._get_item_info(arguments["item_id"], client)
-        elif name == "item_update_tags":
-            if "item_id" not in arguments:
-                return self._error_response("Missing required parameter: item_id")
-            if "tags" not in arguments:
-                return self._error_response("Missing required parameter: tags")
-            return await self._update_item_tags(
-                arguments["item_id"],
-                arguments["tags"],
-                arguments.get("mode", "replace"),
-                client
-            )
-        elif name == "item_update_metadata":
-            if "item_id" not in arguments:
-                return self._error_response("Missing required parameter: item_id")
-            return await self._update_item_metadata(
-                arguments["item_id"],
-                arguments.get("annotation"),
-                arguments.get("star"),
-                client
-            )
-        elif name == "item_delete":
-            if "item_id" not in arguments:
-                return self._error_response("Missing required parameter: item_id")
-            return await self._delete_item(arguments["item_id"], client)
-        else:
-            return self._error_response(f"Unknown item tool: {name}")
+    def _tool_methods(self) -> Dict[str, ToolMethod]:
+        """Item tool dispatch table."""
+        return {
+            "item_search": lambda args, client, fmt: self._search_items(
+                args.get("keyword"), args.get("limit", 10), client, fmt
+            ),
+            "item_info": lambda args, client, fmt: self._get_item_info(args["item_id"], client, fmt),
+            "item_update_tags": lambda args, client, fmt: self._update_item_tags(
+                args["item_id"], args["tags"], args.get("mode", "replace"), client, fmt
+            ),
+            "item_update_metadata": lambda args, client, fmt: self._update_item_metadata(
+                args["item_id"], args.get("annotation"), args.get("star"), client, fmt
+            ),
+            "item_delete": lambda args, client, fmt: self._delete_item(args["item_id"], client, fmt),
+        }
     
-    async def _search_items(self, keyword: str, limit: int, client: EagleClient) -> List[TextContent]:
+    async def _search_items(self, keyword: str, limit: int, client: EagleClient,
+                            output_format: str = "text") -> List[TextContent]:
         """Search items by keyword."""
         try:
-            result = await client.get("/api/item/list", {"keyword": keyword, "limit": limit})
+            result = await client.get("/api/item/list", {"keyword": keyword, "limit": limit},
+                                      model=ItemListResponse)
             
             if not result.get("status") == "success":
                 return self._error_response("Failed to search items")
             
-            items = result.get("data", [])
-            items = clean_response_text(items)
-            
-            if not items:
+            page = self._page(result.get("data", []), ITEM_GROUPS)
+            if self.prefetcher is not None:
+                self.prefetcher.schedule(client, [item.get("id") for item in page.entries])
+            
+            if output_format == "json":
+                return self._json_response({
+                    "keyword": keyword,
+                    "count": len(page.entries),
+                    **page.to_dict(),
+                    "items": [
+                        {"id": item.get("id"), "name": item.get("name"), "ext": item.get("ext"), "tags": item.get("tags", [])}
+                        for item in page.entries
+                    ]
+                })
+            
+            if not page.total:
                 return self._success_response(f"No items found matching '{keyword}'")
             
             # Format response with proper Japanese text handling
-            response = f"Found {len(items)} items matching '{keyword}':\n\n"
-            for item in items:
+            builder = self._builder()
+            builder.add(f"Found {page.total} items matching '{keyword}':\n\n")
+            for item in page.entries:
                 name = get_display_name(item, 'Unnamed Item')
-                response += f"- {name} ({item.get('ext', 'unknown')})\n"
-                response += f"  ID: {item.get('id', 'Unknown')}\n"
+                builder.add(
+                    f"- {name} ({item.get('ext', 'unknown')})\n",
+                    f"  ID: {item.get('id', 'Unknown')}\n"
+                )
                 if item.get('tags'):
                     safe_tags = [format_japanese_safe(tag) for tag in item.get('tags', [])]
-                    response += f"  Tags: {', '.join(safe_tags)}\n"
-                response += "\n"
+                    builder.add(f"  Tags: {', '.join(safe_tags)}\n")
+                builder.add("\n")
             
-            return self._success_response(response)
+            self._add_page_footer(builder, page, "items")
             
+            return self._success_response(builder.build())
+        
         except Exception as e:
             return self._error_response(f"Error searching items: {e}")
     
-    async def _get_item_info(self, item_id: str, client: EagleClient) -> List[TextContent]:
+    async def _get_item_info(self, item_id: str, client: EagleClient, output_format: str = "text") -> List[TextContent]:
         """Get detailed item information."""
         try:
             result = await client.get("/api/item/info", {"id": item_id})
@@ -187,31 +207,38 @@ class ItemHandler(BaseHandler):
             
             item = result.get("data", {})
             
+            if output_format == "json":
+                return self._json_response(ItemInfo.from_dict(item).to_dict())
+            
             # Format response
-            response = f"Item Information:\n"
-            response += f"- Name: {item.get('name', 'Unknown')}\n"
-            response += f"- ID: {item.get('id', 'Unknown')}\n"
-            response += f"- Type: {item.get('ext', 'unknown')}\n"
-            response += f"- Size: {item.get('size', 0)} bytes\n"
+            builder = self._builder()
+            builder.add(
+                "Item Information:\n",
+                f"- Name: {item.get('name', 'Unknown')}\n",
+                f"- ID: {item.get('id', 'Unknown')}\n",
+                f"- Type: {item.get('ext', 'unknown')}\n",
+                f"- Size: {item.get('size', 0)} bytes\n"
+            )
             
             if item.get('width') and item.get('height'):
-                response += f"- Dimensions: {item.get('width')}x{item.get('height')}\n"
+                builder.add(f"- Dimensions: {item.get('width')}x{item.get('height')}\n")
             
             if item.get('tags'):
-                response += f"- Tags: {', '.join(item.get('tags', []))}\n"
+                builder.add(f"- Tags: {', '.join(item.get('tags', []))}\n")
             
             if item.get('annotation'):
-                response += f"- Annotation: {item.get('annotation')}\n"
+                builder.add(f"- Annotation: {item.get('annotation')}\n")
             
             if item.get('star'):
-                response += f"- Rating: {item.get('star')} stars\n"
-            
-            return self._success_response(response)
+                builder.add(f"- Rating: {item.get('star')} stars\n")
             
+            return self._success_response(builder.build())
+        
         except Exception as e:
             return self._error_response(f"Error getting item info: {e}")
     
-    async def _update_item_tags(self, item_id: str, tags: List[str], mode: str, client: EagleClient) -> List[TextContent]:
+    async def _update_item_tags(self, item_id: str, tags: List[str], mode: str, client: EagleClient,
+                                output_format: str = "text") -> List[TextContent]:
         """Update item tags."""
         try:
             if mode != "replace":
@@ -243,17 +270,23 @@ class ItemHandler(BaseHandler):
             if not result.get("status") == "success":
                 return self._error_response(f"Failed to update tags for item '{item_id}'")
             
-            response = f"Item tags updated successfully:\n"
-            response += f"- Item ID: {item_id}\n"
-            response += f"- Mode: {mode}\n"
-            response += f"- New Tags: {', '.join(updated_tags)}\n"
+            if output_format == "json":
+                return self._json_response({"id": item_id, "mode": mode, "tags": updated_tags})
             
-            return self._success_response(response)
+            response = (
+                "Item tags updated successfully:\n"
+                f"- Item ID: {item_id}\n"
+                f"- Mode: {mode}\n"
+                f"- New Tags: {', '.join(updated_tags)}\n"
+            )
             
+            return self._success_response(response)
+        
         except Exception as e:
             return self._error_response(f"Error updating item tags: {e}")
     
-    async def _update_item_metadata(self, item_id: str, annotation: str, star: int, client: EagleClient) -> List[TextContent]:
+    async def _update_item_metadata(self, item_id: str, annotation: str, star: int, client: EagleClient,
+                                    output_format: str = "text") -> List[TextContent]:
         """Update item metadata."""
         try:
             data = {"id": item_id}
@@ -271,19 +304,22 @@ class ItemHandler(BaseHandler):
             if not result.get("status") == "success":
                 return self._error_response(f"Failed to update metadata for item '{item_id}'")
             
-            response = f"Item metadata updated successfully:\n"
-            response += f"- Item ID: {item_id}\n"
+            if output_format == "json":
+                return self._json_response(data)
+            
+            builder = self._builder()
+            builder.add("Item metadata updated successfully:\n", f"- Item ID: {item_id}\n")
             if annotation is not None:
-                response += f"- New Annotation: {annotation}\n"
+                builder.add(f"- New Annotation: {annotation}\n")
             if star is not None:
-                response += f"- New Rating: {star} stars\n"
-            
-            return self._success_response(response)
+                builder.add(f"- New Rating: {star} stars\n")
             
+            return self._success_response(builder.build())
+        
         except Exception as e:
             return self._error_response(f"Error updating item metadata: {e}")
     
-    async def _delete_item(self, item_id: str, client: EagleClient) -> List[TextContent]:
+    async def _delete_item(self, item_id: str, client: EagleClient, output_format: str = "text") -> List[TextContent]:
         """Move item to trash (delete)."""
         try:
             data = {"itemIds": [item_id]}
@@ -293,11 +329,16 @@ class ItemHandler(BaseHandler):
             if not result.get("status") == "success":
                 return self._error_response(f"Failed to delete item '{item_id}'")
             
-            response = f"Item moved to trash successfully:\n"
-            response += f"- Item ID: {item_id}\n"
-            response += f"- Status: Moved to trash (can be restored from Eagle's trash)\n"
+            if output_format == "json":
+                return self._json_response({"id": item_id, "status": "trashed"})
             
-            return self._success_response(response)
+            response = (
+                "Item moved to trash successfully:\n"
+                f"- Item ID: {item_id}\n"
+                "- Status: Moved to trash (can be restored from Eagle's trash)\n"
+            )
             
+            return self._success_response(response)
+        
         except Exception as e:
             return self._error_response(f"Error deleting item: {e}")
\ No newline at end of file
@@ -1,15 +1,49 @@
 """Library handler for Eagle MCP Server."""
 
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from mcp.types import Tool, TextContent
 from eagle_client import EagleClient
-from handlers.base import BaseHandler
+from handlers.base import BaseHandler, OUTPUT_FORMAT_PROPERTY, ToolMethod
+from schemas.base import FolderInfo, FolderListResponse, as_typed
+from services.change_feed import ChangeFeed
+from services.item_index import ItemIndex
+from services.library_manager import LibraryManager
+from services.library_stats import UNFILED, compute_library_stats
+
+
+def _format_bytes(size: int) -> str:
+    """Format a byte count with a binary unit (e.g. ``1.5 GiB``)."""
+    value = float(size)
+    for unit in ("B", "KiB", "MiB", "GiB", "TiB"):
+        if value < 1024 or unit == "TiB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def _folder_names(folders: Iterable[FolderInfo]) -> Dict[str, str]:
+    """Map every folder ID in a folder tree to its name."""
+    names = {}
+    stack = list(folders)
+    while stack:
+        folder = stack.pop()
+        names[folder.id] = folder.name
+        stack.extend(folder.children)
+    return names
 
 
 class LibraryHandler(BaseHandler):
     """Handler for library-related tools."""
     
+    def __init__(self, item_index: Optional[ItemIndex] = None,
+                 library_manager: Optional[LibraryManager] = None, change_feed: Optional[ChangeFeed] = None):
+        self.item_index = item_index if item_index is not None else ItemIndex()
+        self.library_manager = library_manager if library_manager is not None else LibraryManager(self.item_index)
+        self.change_feed = change_feed if change_feed is not None else ChangeFeed(self.item_index)
+        # (library path, library version, top_n, stats) of the last library_stats run
+        self._stats: Optional[Tuple[Optional[str], int, int, Dict[str, Any]]] = None
+        super().__init__()
+    
     def get_tools(self) -> List[Tool]:
         """Get library tools."""
         return [
@@ -18,20 +52,94 @@ class LibraryHandler(BaseHandler):
                 description="Get information about the Eagle library",
                 inputSchema={
                     "type": "object",
-                    "properties": {},
+                    "properties": {
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="library_list",
+                description="List the Eagle libraries opened recently and which one is current",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="library_switch",
+                description=(
+                    "Switch Eagle to another library. The server's item index is saved for the "
+                    "current library and restored for the target, and cached responses are dropped"
+                ),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "library_path": {
+                            "type": "string",
+                            "description": "Path of the .library folder (see library_list)"
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": ["library_path"]
+                }
+            ),
+            Tool(
+                name="library_stats",
+                description=(
+                    "Get library statistics: total items and bytes, per-extension and per-folder "
+                    "distributions, dimension histograms, star ratings, untagged/unannotated "
+                    "counts and the largest items"
+                ),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "top_n": {
+                            "type": "integer",
+                            "description": "Number of largest items, extensions and folders to list",
+                            "default": 10
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="library_changes_since",
+                description=(
+                    "Get the item and folder IDs added, updated or removed since a token from an "
+                    "earlier call, plus a new token. Call without a token to get a starting point. "
+                    "If reset is true the token is too old (or the library was switched) and the "
+                    "client should re-read what it needs"
+                ),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "token": {
+                            "type": "string",
+                            "description": "Token returned by a previous library_changes_since call"
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
                     "required": []
                 }
             )
         ]
     
-    async def handle_call(self, name: str, arguments: Dict[str, Any], client: EagleClient) -> List[TextContent]:
-        """Handle library tool calls."""
-        if name == "library_info":
-            return await self._get_library_info(client)
-        else:
-            return self._error_response(f"Unknown library tool: {name}")
+    def _tool_methods(self) -> Dict[str, ToolMethod]:
+        """Library tool dispatch table."""
+        return {
+            "library_info": lambda args, client, fmt: self._get_library_info(client, fmt),
+            "library_list": lambda args, client, fmt: self._list_libraries(client, fmt),
+            "library_switch": lambda args, client, fmt: self._switch_library(args["library_path"], client, fmt),
+            "library_stats": lambda args, client, fmt: self._get_library_stats(args.get("top_n", 10), client, fmt),
+            "library_changes_since": lambda args, client, fmt: self._get_changes(args.get("token"), client, fmt),
+        }
     
-    async def _get_library_info(self, client: EagleClient) -> List[TextContent]:
+    async def _get_library_info(self, client: EagleClient, output_format: str = "text") -> List[TextContent]:
         """Get library information."""
         try:
             result = await client.get("/api/library/info")
@@ -41,18 +149,170 @@ class LibraryHandler(BaseHandler):
             
             library = result.get("data", {}).get("library", {})
             
+            if output_format == "json":
+                return self._json_response({
+                    "name": library.get("name"),
+                    "path": library.get("path"),
+                    "folders": len(library.get("folders", [])),
+                    "modification_time": library.get("modificationTime")
+                })
+            
             # Format response
-            response = f"Library Information:\n"
-            response += f"- Name: {library.get('name', 'Unknown')}\n"
-            response += f"- Path: {library.get('path', 'Unknown')}\n"
+            builder = self._builder()
+            builder.add(
+                "Library Information:\n",
+                f"- Name: {library.get('name', 'Unknown')}\n",
+                f"- Path: {library.get('path', 'Unknown')}\n"
+            )
             
             if library.get('folders'):
-                response += f"- Folders: {len(library.get('folders', []))}\n"
+                builder.add(f"- Folders: {len(library.get('folders', []))}\n")
             
             if library.get('modificationTime'):
-                response += f"- Last Modified: {library.get('modificationTime')}\n"
+                builder.add(f"- Last Modified: {library.get('modificationTime')}\n")
+            
+            return self._success_response(builder.build())
+        
+        except Exception as e:
+            return self._error_response(f"Error getting library info: {e}")
+    
+    async def _list_libraries(self, client: EagleClient, output_format: str = "text") -> List[TextContent]:
+        """List recently opened libraries."""
+        try:
+            result = await self.library_manager.list_libraries(client)
+            
+            if output_format == "json":
+                return self._json_response(result)
+            
+            libraries = result["libraries"]
+            if not libraries:
+                return self._success_response("No libraries in Eagle's library history")
+            
+            builder = self._builder()
+            builder.add(f"Found {len(libraries)} libraries:\n\n")
+            for library in libraries:
+                marker = " (current)" if library["current"] else ""
+                builder.add(f"- {library['name']}{marker}\n", f"  Path: {library['path']}\n")
+            return self._success_response(builder.build())
+        
+        except Exception as e:
+            return self._error_response(f"Error listing libraries: {e}")
+    
+    async def _switch_library(self, library_path: str, client: EagleClient,
+                              output_format: str = "text") -> List[TextContent]:
+        """Switch to another library, swapping item index snapshots."""
+        try:
+            result = await self.library_manager.switch(client, library_path)
+            
+            if output_format == "json":
+                return self._json_response({key: value for key, value in result.items() if key != "response"})
+            
+            builder = self._builder()
+            builder.add(
+                "Library switched successfully:\n",
+                f"- From: {result['previous'] or 'Unknown'}\n",
+                f"- To: {library_path}\n"
+            )
+            if result["snapshot_loaded"]:
+                builder.add(f"- Item index: restored from snapshot ({result['items']} items)\n")
+            else:
+                builder.add("- Item index: will be built on first use\n")
+            return self._success_response(builder.build())
+        
+        except Exception as e:
+            return self._error_response(f"Error switching library: {e}")
+    
+    async def _get_library_stats(self, top_n: int, client: EagleClient,
+                                 output_format: str = "text") -> List[TextContent]:
+        """Get library statistics, recomputed only when the library changes."""
+        try:
+            version = await self.item_index.refresh(client)
+            key = (self.item_index.library_path, version, top_n)
+            cached = self._stats
+            if version is not None and cached is not None and cached[:3] == key:
+                stats = cached[3]
+            else:
+                stats = compute_library_stats(self.item_index, top_n)
+                folders = as_typed(await client.get("/api/folder/list", model=FolderListResponse),
+                                   FolderListResponse)
+                names = _folder_names(folders.get("data", [])) if folders.get("status") == "success" else {}
+                for entry in stats["by_folder"]:
+                    entry["name"] = "(unfiled)" if entry["key"] == UNFILED else names.get(entry["key"], "")
+                stats["library_version"] = version
+                self._stats = (*key, stats)
+            
+            if output_format == "json":
+                return self._json_response(stats)
+            
+            total = stats["total_items"]
+            builder = self._builder()
+            builder.add(
+                "Library Statistics:\n",
+                f"- Items: {total}\n",
+                f"- Total size: {_format_bytes(stats['total_bytes'])} ({stats['total_bytes']} bytes)\n",
+                f"- Untagged: {stats['untagged']}\n",
+                f"- Unannotated: {stats['unannotated']}\n"
+            )
+            
+            builder.add(f"\nBy extension ({len(stats['by_extension'])} types):\n")
+            for entry in stats["by_extension"][:top_n]:
+                builder.add(f"- {entry['key'] or '(none)'}: {entry['count']} items, {_format_bytes(entry['bytes'])}\n")
+            
+            builder.add(f"\nBy folder ({len(stats['by_folder'])} folders):\n")
+            for entry in stats["by_folder"][:top_n]:
+                builder.add(f"- {entry['name'] or entry['key']}: {entry['count']} items, {_format_bytes(entry['bytes'])}\n")
+            
+            for axis in ("width", "height"):
+                builder.add(f"\n{axis.capitalize()} (px):\n")
+                for label, count in stats[f"{axis}_histogram"].items():
+                    builder.add(f"- {label}: {count}\n")
+            if stats["no_dimensions"]:
+                builder.add(f"- Unknown dimensions: {stats['no_dimensions']}\n")
+            
+            builder.add("\nStar ratings:\n")
+            for star, count in stats["star_distribution"].items():
+                builder.add(f"- {star}: {count}\n")
+            
+            if stats["largest"]:
+                builder.add("\nLargest items:\n")
+                for i, entry in enumerate(stats["largest"], 1):
+                    builder.add(f"  {i}. {entry['name']} ({_format_bytes(entry['size'])}, ID: {entry['id']})\n")
+            
+            return self._success_response(builder.build())
+        
+        except Exception as e:
+            return self._error_response(f"Error getting library stats: {e}")
+    
+    async def _get_changes(self, token: Optional[str], client: EagleClient,
+                           output_format: str = "text") -> List[TextContent]:
+        """Get the net library changes since ``token``."""
+        try:
+            # Checks now, so callers don't wait for the background poll, and
+            # keeps checking in the background for the caller's next token
+            self.change_feed.activate()
+            await self.change_feed.poll(client)
+            changes = self.change_feed.changes_since(token)
+            
+            if output_format == "json":
+                return self._json_response(changes)
             
-            return self._success_response(response)
+            builder = self._builder()
+            if token is None:
+                builder.add("Current change token: ", changes["token"], "\n")
+                return self._success_response(builder.build())
+            if changes["reset"]:
+                builder.add("Token expired or library switched; re-read the library.\n",
+                            f"New token: {changes['token']}\n")
+                return self._success_response(builder.build())
             
+            counts = [(kind, change, ids) for kind in ("items", "folders")
+                      for change, ids in changes[kind].items() if ids]
+            if not counts:
+                builder.add("No changes\n")
+            for kind, change, ids in counts:
+                builder.add(f"{kind.capitalize()} {change} ({len(ids)}): {', '.join(ids)}\n")
+            builder.add(f"New token: {changes['token']}\n")
+            return self._success_response(builder.build())
+        
         except Exception as e:
-            return self._error_response(f"Error getting library info: {e}")
\ No newline at end of file
+            return self._error_response(f"Error getting library changes: {e}")
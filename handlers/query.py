@@ -0,0 +1,290 @@
+"""Query handler for Eagle MCP Server (range queries and local smart folders)."""
+
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from mcp.types import Tool, TextContent
+from config import DEFAULT_ITEM_LIMIT, MAX_ITEM_LIMIT
+from eagle_client import EagleClient
+from handlers.base import BaseHandler, BUDGET_PROPERTIES, OUTPUT_FORMAT_PROPERTY, ToolMethod
+from handlers.item import ITEM_GROUPS
+from schemas.base import FolderListResponse, ItemInfo, as_typed
+from services.item_index import SORTED_FIELDS, ItemIndex
+from services.saved_queries import (
+    FILTERS_SCHEMA,
+    QueryEngine,
+    QueryError,
+    QueryPlan,
+    SavedQueryStore,
+    compile_query,
+    top_k,
+)
+from utils.encoding import get_display_name
+
+
+class QueryHandler(BaseHandler):
+    """Handler for item queries and saved queries evaluated against the in-memory item index."""
+    
+    def __init__(self, item_index: Optional[ItemIndex] = None, store: Optional[SavedQueryStore] = None):
+        self.item_index = item_index if item_index is not None else ItemIndex()
+        self.store = store if store is not None else SavedQueryStore()
+        self.engine = QueryEngine(self.item_index)
+        super().__init__()
+    
+    def get_tools(self) -> List[Tool]:
+        """Get query tools."""
+        return [
+            Tool(
+                name="item_query",
+                description=(
+                    "Find items by size, width, height, rating and modification date ranges (plus tags, "
+                    "extension, folder and text) and return the top items by one of those fields, e.g. "
+                    "the largest PNGs over 4000px wide modified this month. Answered from the server's "
+                    "sorted indexes without paging through Eagle"
+                ),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "filters": FILTERS_SCHEMA,
+                        "order_by": {
+                            "type": "string",
+                            "enum": list(SORTED_FIELDS),
+                            "description": "Field to order by",
+                            "default": "modificationTime"
+                        },
+                        "descending": {
+                            "type": "boolean",
+                            "description": "Largest/newest first",
+                            "default": True
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of items to return",
+                            "default": DEFAULT_ITEM_LIMIT,
+                            "minimum": 1,
+                            "maximum": MAX_ITEM_LIMIT
+                        },
+                        **BUDGET_PROPERTIES,
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="query_run",
+                description=(
+                    "Find items by tags, extension, folder (with subfolders), size, dimensions, "
+                    "rating, modification date and text, either with a saved query or ad-hoc filters. "
+                    "Results are newest first"
+                ),
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "Name of a saved query (see query_list)"
+                        },
+                        "filters": FILTERS_SCHEMA,
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of items to return",
+                            "default": DEFAULT_ITEM_LIMIT,
+                            "minimum": 1,
+                            "maximum": MAX_ITEM_LIMIT
+                        },
+                        **BUDGET_PROPERTIES,
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="query_save",
+                description="Save a named query (a local smart folder) for reuse with query_run",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "Query name; an existing query with this name is replaced"
+                        },
+                        "filters": FILTERS_SCHEMA,
+                        "description": {
+                            "type": "string",
+                            "description": "What the query is for"
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": ["name", "filters"]
+                }
+            ),
+            Tool(
+                name="query_list",
+                description="List saved queries and their filters",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": []
+                }
+            ),
+            Tool(
+                name="query_delete",
+                description="Delete a saved query",
+                inputSchema={
+                    "type": "object",
+                    "properties": {
+                        "name": {
+                            "type": "string",
+                            "description": "Name of the saved query"
+                        },
+                        "format": OUTPUT_FORMAT_PROPERTY
+                    },
+                    "required": ["name"]
+                }
+            )
+        ]
+    
+    def _tool_methods(self) -> Dict[str, ToolMethod]:
+        """Query tool dispatch table."""
+        return {
+            "item_query": lambda args, client, fmt: self._query_items(
+                args.get("filters"), args.get("order_by", "modificationTime"), args.get("descending", True),
+                args.get("limit", DEFAULT_ITEM_LIMIT), client, fmt
+            ),
+            "query_run": lambda args, client, fmt: self._run_query(
+                args.get("name"), args.get("filters"), args.get("limit", DEFAULT_ITEM_LIMIT), client, fmt
+            ),
+            "query_save": lambda args, client, fmt: self._save_query(
+                args["name"], args["filters"], args.get("description", ""), fmt
+            ),
+            "query_list": lambda args, client, fmt: self._list_queries(fmt),
+            "query_delete": lambda args, client, fmt: self._delete_query(args["name"], fmt),
+        }
+    
+    async def _evaluate(self, filters: Dict[str, Any], client: EagleClient) -> Tuple[QueryPlan, Optional[Set[str]]]:
+        """Compile ``filters`` and return the plan and matching IDs (None if there are no filters)."""
+        folders = []
+        if filters.get("folder_id"):
+            result = as_typed(await client.get("/api/folder/list", model=FolderListResponse), FolderListResponse)
+            if result.get("status") == "success":
+                folders = result.get("data", [])
+        plan = compile_query(filters, folders)
+        await self.item_index.refresh(client)
+        if not plan.index_filters and not plan.predicates and not plan.text:
+            return plan, None
+        return plan, self.engine.evaluate(plan)
+    
+    def _items_response(self, label: str, header: Dict[str, Any], plan: QueryPlan, total: int,
+                        items: List[ItemInfo], output_format: str) -> List[TextContent]:
+        """Render query results (cut to the call's output budget) as JSON or a text listing."""
+        page = self._page(items, ITEM_GROUPS)
+        if output_format == "json":
+            data = {
+                **header,
+                "plan": plan.describe(),
+                "total": total,
+                "count": len(page.entries),
+                "items": [item.to_dict() for item in page.entries]
+            }
+            if page.summary is not None:
+                data["page"] = page.to_dict()
+            return self._json_response(data)
+        
+        if not items:
+            return self._success_response(f"No items match {label}")
+        builder = self._builder()
+        shown = len(page.entries)
+        builder.add(f"{total} items match {label}", f" (showing {shown}):\n\n" if shown < total else ":\n\n")
+        for item in page.entries:
+            builder.add(f"- {get_display_name(item, 'Unnamed Item')} ({item.ext or 'unknown'})\n", f"  ID: {item.id}\n")
+            details = [f"{item.size} bytes"]
+            if item.width and item.height:
+                details.append(f"{item.width}x{item.height}")
+            if item.star:
+                details.append(f"{item.star} stars")
+            builder.add(f"  {', '.join(details)}\n")
+            if item.tags:
+                builder.add(f"  Tags: {', '.join(item.tags)}\n")
+            builder.add("\n")
+        self._add_page_footer(builder, page, "items")
+        return self._success_response(builder.build())
+    
+    async def _run_query(self, name: Optional[str], filters: Optional[Dict[str, Any]], limit: int,
+                         client: EagleClient, output_format: str = "text") -> List[TextContent]:
+        """Evaluate a saved or ad-hoc query against the item index."""
+        try:
+            if name:
+                filters = self.store.get(name)["filters"]
+            elif filters is None:
+                return self._error_response("Provide either name (a saved query) or filters")
+            limit = max(1, min(int(limit), MAX_ITEM_LIMIT))
+            
+            plan, ids = await self._evaluate(filters, client)
+            items = top_k(self.item_index, ids, "modificationTime", True, limit)
+            total = len(self.item_index) if ids is None else len(ids)
+            label = f"'{name}'" if name else "query"
+            return self._items_response(label, {"name": name, "filters": filters}, plan, total, items, output_format)
+        
+        except QueryError as e:
+            return self._error_response(str(e))
+        except Exception as e:
+            return self._error_response(f"Error running query: {e}")
+    
+    async def _query_items(self, filters: Optional[Dict[str, Any]], order_by: str, descending: bool, limit: int,
+                           client: EagleClient, output_format: str = "text") -> List[TextContent]:
+        """Filter the item index by ranges and return the top items by ``order_by``."""
+        try:
+            filters = filters or {}
+            limit = max(1, min(int(limit), MAX_ITEM_LIMIT))
+            plan, ids = await self._evaluate(filters, client)
+            items = top_k(self.item_index, ids, order_by, descending, limit)
+            total = len(self.item_index) if ids is None else len(ids)
+            header = {"filters": filters, "order_by": order_by, "descending": descending}
+            return self._items_response("query", header, plan, total, items, output_format)
+        
+        except QueryError as e:
+            return self._error_response(str(e))
+        except Exception as e:
+            return self._error_response(f"Error querying items: {e}")
+    
+    async def _save_query(self, name: str, filters: Dict[str, Any], description: str,
+                          output_format: str = "text") -> List[TextContent]:
+        """Validate and persist a named query."""
+        try:
+            query = self.store.put(name, filters, description)
+            if output_format == "json":
+                return self._json_response({"name": name, **query})
+            return self._success_response(f"Saved query '{name}' ({len(filters)} filters)")
+        except QueryError as e:
+            return self._error_response(str(e))
+        except Exception as e:
+            return self._error_response(f"Error saving query: {e}")
+    
+    async def _list_queries(self, output_format: str = "text") -> List[TextContent]:
+        """List saved queries."""
+        queries = self.store.list()
+        if output_format == "json":
+            return self._json_response({
+                "count": len(queries),
+                "queries": [{"name": name, **query} for name, query in sorted(queries.items())]
+            })
+        if not queries:
+            return self._success_response("No saved queries")
+        builder = self._builder()
+        builder.add(f"Saved queries ({len(queries)}):\n\n")
+        for name, query in sorted(queries.items()):
+            builder.add(f"- {name}", f": {query['description']}\n" if query.get("description") else "\n")
+            for key, value in query["filters"].items():
+                builder.add(f"  {key}: {value}\n")
+        return self._success_response(builder.build())
+    
+    async def _delete_query(self, name: str, output_format: str = "text") -> List[TextContent]:
+        """Delete a saved query."""
+        try:
+            self.store.delete(name)
+        except QueryError as e:
+            return self._error_response(str(e))
+        if output_format == "json":
+            return self._json_response({"name": name, "deleted": True})
+        return self._success_response(f"Deleted saved query '{name}'")
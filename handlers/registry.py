@@ -0,0 +1,51 @@
+"""Tool registry for Eagle MCP Server."""
+
+from types import MappingProxyType
+from typing import Iterable, Mapping, Optional, Tuple
+
+from mcp.types import Tool
+from handlers.base import BaseHandler
+
+
+class ToolRegistry:
+    """Tool list and name -> handler dispatch map, built once.
+    
+    ``tools/list`` returns the prebuilt tuple and ``tools/call`` is a single
+    dictionary lookup. A registry is never modified; when the exposed tool
+    set changes (e.g. a configuration reload) a new one is built and swapped
+    in, so in-flight calls keep a consistent view.
+    """
+    
+    def __init__(self, handlers: Iterable[BaseHandler]):
+        tools = []
+        dispatch = {}
+        by_name = {}
+        for handler in handlers:
+            for tool in handler.tools:
+                if tool.name in dispatch:
+                    raise ValueError(f"Duplicate tool name: {tool.name}")
+                dispatch[tool.name] = handler
+                by_name[tool.name] = tool
+                tools.append(tool)
+        self._tools: Tuple[Tool, ...] = tuple(tools)
+        self._dispatch: Mapping[str, BaseHandler] = MappingProxyType(dispatch)
+        self._by_name: Mapping[str, Tool] = MappingProxyType(by_name)
+    
+    @property
+    def tools(self) -> Tuple[Tool, ...]:
+        """All registered tools, in registration order."""
+        return self._tools
+    
+    def get_handler(self, name: str) -> Optional[BaseHandler]:
+        """Return the handler for a tool name, or None if it isn't registered."""
+        return self._dispatch.get(name)
+    
+    def get_tool(self, name: str) -> Optional[Tool]:
+        """Return the tool definition for a name, or None if it isn't registered."""
+        return self._by_name.get(name)
+    
+    def __contains__(self, name: str) -> bool:
+        return name in self._dispatch
+    
+    def __len__(self) -> int:
+        return len(self._tools)
@@ -0,0 +1,143 @@
+"""MCP resources for Eagle MCP Server: items, folders, thumbnails and the change feed."""
+
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Tuple
+
+from mcp.types import BlobResourceContents, ReadResourceResult, Resource, ResourceTemplate, TextResourceContents
+from eagle_client import EagleClient, EagleAPIError
+from handlers.image import ImageHandler, thumbnail_mime_type
+from schemas.base import FolderInfo, FolderListResponse, as_typed
+from services.change_feed import LIBRARY_CHANGES_URI, ChangeFeed
+from utils import json_codec, metrics
+
+ITEM_URI = "eagle://item/{id}"
+FOLDER_URI = "eagle://folder/{id}"
+THUMBNAIL_URI = "eagle://thumbnail/{id}"
+
+RESOURCE_TEMPLATES = [
+    ResourceTemplate(
+        uriTemplate=ITEM_URI,
+        name="item",
+        description="Item metadata (tags, folders, dimensions, annotation) as returned by Eagle",
+        mimeType="application/json"
+    ),
+    ResourceTemplate(
+        uriTemplate=FOLDER_URI,
+        name="folder",
+        description="Folder metadata with its parent and child folder IDs",
+        mimeType="application/json"
+    ),
+    ResourceTemplate(
+        uriTemplate=THUMBNAIL_URI,
+        name="thumbnail",
+        description="Item thumbnail image (binary)",
+        mimeType="image/png"
+    ),
+]
+
+
+def _find_folder(folders: List[FolderInfo], folder_id: str) -> Tuple[Optional[FolderInfo], Optional[str]]:
+    """Find a folder in a folder tree and return it with its parent ID."""
+    stack = [(folder, None) for folder in folders]
+    while stack:
+        folder, parent = stack.pop()
+        if folder.id == folder_id:
+            return folder, parent
+        stack.extend((child, folder.id) for child in folder.children)
+    return None, None
+
+
+class ResourceHandler:
+    """Serves ``eagle://`` resources from the same caches the tools use.
+    
+    Every content carries ``_meta.version`` (the item's or folder's
+    modification time). A read whose request ``_meta.ifNoneMatch`` equals
+    the current version gets the version back without the content, so
+    clients can keep unchanged thumbnails without downloading them again.
+    """
+    
+    def __init__(self, image_handler: ImageHandler, change_feed: ChangeFeed):
+        self.image_handler = image_handler
+        self.change_feed = change_feed
+    
+    def list_resources(self) -> List[Resource]:
+        """Fixed resources; items, folders and thumbnails are reached through templates."""
+        return [Resource(
+            uri=LIBRARY_CHANGES_URI,
+            name="library-changes",
+            description="Latest library change; subscribe to be notified of every change",
+            mimeType="application/json"
+        )]
+    
+    def list_templates(self) -> List[ResourceTemplate]:
+        return list(RESOURCE_TEMPLATES)
+    
+    async def read(self, uri: str, client: EagleClient, if_none_match: Optional[str] = None) -> ReadResourceResult:
+        """Read a resource, or only its version if it equals ``if_none_match``."""
+        scheme, _, rest = uri.partition("://")
+        kind, _, resource_id = rest.partition("/")
+        if scheme != "eagle" or (uri != LIBRARY_CHANGES_URI and (not resource_id or "/" in resource_id)):
+            raise ValueError(f"Unknown resource: {uri}")
+        
+        if uri == LIBRARY_CHANGES_URI:
+            latest = self.change_feed.latest
+            data = {"token": self.change_feed.token, "latest": asdict(latest) if latest else None}
+            return self._text(uri, data, self.change_feed.token, if_none_match)
+        if kind == "item":
+            item = await self._item(resource_id, client)
+            return self._text(uri, item, item.get("modificationTime"), if_none_match)
+        if kind == "folder":
+            folder = await self._folder(resource_id, client)
+            return self._text(uri, folder, folder.get("modificationTime"), if_none_match)
+        if kind == "thumbnail":
+            item = await self._item(resource_id, client)
+            version = self._version(item.get("modificationTime"))
+            if version is not None and version == if_none_match:
+                metrics.RESOURCE_READS.inc(kind=kind, result="not_modified")
+                return self._not_modified(uri, version, "image/png")
+            path, data = await self.image_handler.thumbnail_base64(resource_id, client)
+            metrics.RESOURCE_READS.inc(kind=kind, result="ok")
+            # Cached Base64 goes out as is, without a decode/encode round trip
+            return ReadResourceResult(contents=[BlobResourceContents(
+                uri=uri, blob=data, mimeType=thumbnail_mime_type(path), _meta={"version": version}
+            )])
+        raise ValueError(f"Unknown resource: {uri}")
+    
+    async def _item(self, item_id: str, client: EagleClient) -> Dict[str, Any]:
+        result = await client.get("/api/item/info", {"id": item_id})
+        if result.get("status") != "success" or not result.get("data"):
+            raise EagleAPIError(f"Item not found: {item_id}")
+        return result["data"]
+    
+    async def _folder(self, folder_id: str, client: EagleClient) -> Dict[str, Any]:
+        result = as_typed(await client.get("/api/folder/list", model=FolderListResponse), FolderListResponse)
+        folder, parent = None, None
+        if result.get("status") == "success":
+            folder, parent = _find_folder(result.get("data", []), folder_id)
+        if folder is None:
+            raise EagleAPIError(f"Folder not found: {folder_id}")
+        data = folder.to_dict()
+        data["children"] = [child.id for child in folder.children]
+        data["parent"] = parent
+        return data
+    
+    @staticmethod
+    def _version(value: Any) -> Optional[str]:
+        return None if value is None else str(value)
+    
+    def _text(self, uri: str, data: Dict[str, Any], version: Any, if_none_match: Optional[str]) -> ReadResourceResult:
+        kind = uri.partition("://")[2].partition("/")[0]
+        version = self._version(version)
+        if version is not None and version == if_none_match:
+            metrics.RESOURCE_READS.inc(kind=kind, result="not_modified")
+            return self._not_modified(uri, version, "application/json")
+        metrics.RESOURCE_READS.inc(kind=kind, result="ok")
+        return ReadResourceResult(contents=[TextResourceContents(
+            uri=uri, text=json_codec.dumps(data), mimeType="application/json", _meta={"version": version}
+        )])
+    
+    @staticmethod
+    def _not_modified(uri: str, version: str, mime_type: str) -> ReadResourceResult:
+        return ReadResourceResult(contents=[TextResourceContents(
+            uri=uri, text="", mimeType=mime_type, _meta={"version": version, "notModified": True}
+        )])
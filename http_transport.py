@@ -0,0 +1,123 @@
+"""Network transports (Streamable HTTP and SSE) for Eagle MCP Server.
+
+With stdio every MCP client spawns its own server process. These transports
+let a single long-lived process, with its warm caches and pooled Eagle
+connections, serve many clients at once. Each client still gets its own MCP
+session; only server-wide state (the Eagle client and caches) is shared.
+"""
+
+import contextlib
+import logging
+from typing import TYPE_CHECKING, AsyncIterator
+
+import uvicorn
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Mount, Route
+from starlette.types import Receive, Scope, Send
+
+from config import LOG_LEVEL, MCP_HTTP_HOST, MCP_HTTP_PATH, MCP_HTTP_PORT, MCP_METRICS_PORT
+from utils import metrics
+
+if TYPE_CHECKING:
+    from main import EagleMCPServer
+
+logger = logging.getLogger(__name__)
+
+TRANSPORTS = ("stdio", "streamable-http", "sse")
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    """Serve all metrics in Prometheus text exposition format."""
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+class _StreamableHTTPEndpoint:
+    """ASGI endpoint forwarding requests to the session manager."""
+    
+    def __init__(self, session_manager: StreamableHTTPSessionManager):
+        self.session_manager = session_manager
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await self.session_manager.handle_request(scope, receive, send)
+
+
+class _SSEEndpoint:
+    """ASGI endpoint running one MCP session per SSE connection."""
+    
+    def __init__(self, eagle_server: "EagleMCPServer", transport: SseServerTransport):
+        self.eagle_server = eagle_server
+        self.transport = transport
+    
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        async with self.transport.connect_sse(scope, receive, send) as (read_stream, write_stream):
+            await self.eagle_server.server.run(
+                read_stream,
+                write_stream,
+                self.eagle_server.initialization_options()
+            )
+
+
+def create_http_app(eagle_server: "EagleMCPServer", transport: str) -> Starlette:
+    """Build the Starlette application for the given network transport."""
+    path = "/" + MCP_HTTP_PATH.strip("/")
+    
+    if transport == "streamable-http":
+        # Stateful mode: every client gets its own session id and stream
+        session_manager = StreamableHTTPSessionManager(app=eagle_server.server, stateless=False)
+        
+        @contextlib.asynccontextmanager
+        async def lifespan(app: Starlette) -> AsyncIterator[None]:
+            async with session_manager.run():
+                yield
+        
+        routes = [
+            Route(path, endpoint=_StreamableHTTPEndpoint(session_manager)),
+            Route("/metrics", endpoint=metrics_endpoint),
+        ]
+        return Starlette(routes=routes, lifespan=lifespan)
+    
+    if transport == "sse":
+        sse = SseServerTransport(f"{path}/messages/")
+        routes = [
+            Route(f"{path}/sse", endpoint=_SSEEndpoint(eagle_server, sse)),
+            Mount(f"{path}/messages/", app=sse.handle_post_message),
+            Route("/metrics", endpoint=metrics_endpoint),
+        ]
+        return Starlette(routes=routes)
+    
+    raise ValueError(f"Unsupported MCP transport: {transport} (expected one of {', '.join(TRANSPORTS)})")
+
+
+async def run_http_server(eagle_server: "EagleMCPServer", transport: str) -> None:
+    """Serve MCP over HTTP until the process is stopped."""
+    app = create_http_app(eagle_server, transport)
+    server_config = uvicorn.Config(
+        app,
+        host=MCP_HTTP_HOST,
+        port=MCP_HTTP_PORT,
+        log_level=LOG_LEVEL.lower(),
+        # Propagate to the root logger's queue handler instead of writing directly
+        log_config=None
+    )
+    logger.info("MCP server listening on http://%s:%s (%s)", MCP_HTTP_HOST, MCP_HTTP_PORT, transport)
+    await uvicorn.Server(server_config).serve()
+
+
+async def run_metrics_server() -> None:
+    """Serve only ``/metrics`` on ``MCP_METRICS_PORT`` (used with the stdio transport)."""
+    app = Starlette(routes=[Route("/metrics", endpoint=metrics_endpoint)])
+    server_config = uvicorn.Config(
+        app,
+        host=MCP_HTTP_HOST,
+        port=MCP_METRICS_PORT,
+        log_level=LOG_LEVEL.lower(),
+        log_config=None
+    )
+    logger.info("Metrics available at http://%s:%s/metrics", MCP_HTTP_HOST, MCP_METRICS_PORT)
+    await uvicorn.Server(server_config).serve()
@@ -2,32 +2,49 @@
 
 import asyncio
 import logging
+import time
+import weakref
 from typing import Any, Dict, List, Optional, Sequence
 
 from mcp.server import Server
+from mcp.server.session import ServerSession
 from mcp.server.lowlevel import NotificationOptions
 from mcp.server.models import InitializationOptions
 from mcp.server.stdio import stdio_server
 from mcp.types import (
     CallToolRequest,
     ListToolsRequest,
+    ReadResourceRequest,
+    Resource,
+    ResourceTemplate,
+    ServerResult,
     Tool,
     TextContent,
     ImageContent,
     EmbeddedResource,
 )
 
-from config import LOG_LEVEL, LOG_FORMAT, MCP_SERVER_NAME, MCP_SERVER_VERSION, MCP_SERVER_DESCRIPTION, EXPOSE_DIRECT_API_TOOLS
+from config import config, env_file, MCP_SERVER_NAME, MCP_SERVER_VERSION, MCP_SERVER_DESCRIPTION, MCP_TRANSPORT, MCP_METRICS_PORT, CONFIG_RELOAD_INTERVAL, CHANGE_POLL_INTERVAL
 from eagle_client import EagleClient, EagleAPIError
 from handlers.folder import FolderHandler
 from handlers.item import ItemHandler
 from handlers.library import LibraryHandler
+from handlers.query import QueryHandler
 from handlers.image import ImageHandler
 from handlers.direct_api import DirectApiHandler
+from handlers.diagnostics import DiagnosticsHandler
+from handlers.base import ErrorTextContent
+from handlers.batch import BatchHandler
+from handlers.registry import ToolRegistry
+from handlers.resources import ResourceHandler
+from services.change_feed import LIBRARY_CHANGES_URI, ChangeEvent, ChangeFeed
+from services.item_index import ItemIndex
+from services.library_manager import LibraryManager
+from services.prefetch import Prefetcher
+from utils import metrics, tracing
+from utils.circuit_breaker import CircuitBreaker
 from utils.encoding import ensure_utf8_output
 
-# Configure logging
-logging.basicConfig(level=getattr(logging, LOG_LEVEL), format=LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
 
@@ -37,18 +54,51 @@ class EagleMCPServer:
     def __init__(self):
         self.server = Server(MCP_SERVER_NAME)
         self.eagle_client = EagleClient()
+        # Shared in-memory index of the library's items, built on first use
+        self.item_index = ItemIndex()
+        self.library_manager = LibraryManager(self.item_index)
+        # Detects library changes for library_changes_since and resource notifications
+        self.change_feed = ChangeFeed(self.item_index)
         
         # Initialize handlers
         self.folder_handler = FolderHandler()
-        self.item_handler = ItemHandler()
-        self.library_handler = LibraryHandler()
         self.image_handler = ImageHandler()
-        self.direct_api_handler = DirectApiHandler()
+        # Follow-up item_info/thumbnail calls on search results become cache hits
+        self.prefetcher = Prefetcher(self.image_handler)
+        self.item_handler = ItemHandler(self.prefetcher)
+        self.library_handler = LibraryHandler(self.item_index, self.library_manager, self.change_feed)
+        self.query_handler = QueryHandler(self.item_index)
+        self.direct_api_handler = DirectApiHandler(self.library_manager)
+        self.diagnostics_handler = DiagnosticsHandler()
+        # Dispatches through whichever registry is current
+        self.batch_handler = BatchHandler(lambda: self.registry)
+        # eagle:// resources, served from the same caches as the tools
+        self.resource_handler = ResourceHandler(self.image_handler, self.change_feed)
+        
+        # Tools are built once; the registry is only rebuilt when configuration changes
+        self.registry = self._build_registry()
+        # Sessions that have talked to us, for tools/list_changed notifications
+        self._sessions: "weakref.WeakSet[ServerSession]" = weakref.WeakSet()
+        # Resource URI -> sessions subscribed to its updates
+        self._subscriptions: Dict[str, "weakref.WeakSet[ServerSession]"] = {}
         
         # Register handlers
         self._register_handlers()
+        self._register_resources()
+        self.change_feed.add_listener(self._publish_changes)
+        metrics.REGISTRY.add_collector(self._collect_metrics)
         
-        logger.info(f"Initialized {MCP_SERVER_NAME} v{MCP_SERVER_VERSION}")
+        logger.info("Initialized %s v%s", MCP_SERVER_NAME, MCP_SERVER_VERSION)
+    
+    def _build_registry(self) -> ToolRegistry:
+        """Build the tool registry for the current configuration."""
+        handlers = [self.folder_handler, self.item_handler, self.library_handler, self.query_handler,
+                    self.image_handler]
+        # Add Direct API tools only if configured to expose them
+        if config.expose_direct_api_tools:
+            handlers.append(self.direct_api_handler)
+        handlers.extend((self.batch_handler, self.diagnostics_handler))
+        return ToolRegistry(handlers)
     
     def _register_handlers(self):
         """Register all tool handlers."""
@@ -56,120 +106,224 @@ class EagleMCPServer:
         @self.server.list_tools()
         async def list_tools() -> List[Tool]:
             """List available tools."""
-            tools = []
-
-            def add_tools_from_handler(handler):
-                for tool in handler.get_tools():
-                    if hasattr(tool, 'name'):
-                        tools.append(tool)
-                    else:
-                        logger.error(f"Invalid tool without name attribute: {tool}")
-            
-            # Add tools from abstraction handlers
-            add_tools_from_handler(self.folder_handler)
-            add_tools_from_handler(self.item_handler)
-            add_tools_from_handler(self.library_handler)
-            add_tools_from_handler(self.image_handler)
-            
-            # Add Direct API tools only if configured to expose them
-            if EXPOSE_DIRECT_API_TOOLS:
-                add_tools_from_handler(self.direct_api_handler)
-                logger.info("Direct API tools exposed (EXPOSE_DIRECT_API_TOOLS=true)")
-            
-            # Add health check tool
-            health_tool = Tool(
-                name="health_check",
-                description="Check Eagle API connection status",
-                inputSchema={
-                    "type": "object",
-                    "properties": {},
-                    "required": []
-                }
-            )
-            tools.append(health_tool)
-            
-            logger.info(f"Registered {len(tools)} tools")
-            
-            # Debug: Log each tool in detail
-            for i, tool in enumerate(tools):
-                logger.info(f"Tool {i}: name={tool.name}, type={type(tool)}")
-                logger.info(f"  - description: {tool.description}")
-                logger.info(f"  - inputSchema: {tool.inputSchema}")
-            
-            logger.info(f"Returning {len(tools)} tools as List[Tool]")
-            
-            return tools
+            self._remember_session()
+            return list(self.registry.tools)
         
         @self.server.call_tool()
         async def call_tool(name: str, arguments: Dict[str, Any]) -> List[TextContent]:
             """Handle tool calls."""
-            logger.info(f"Tool called: {name} with args: {arguments}")
+            logger.debug("Tool called: %s with args: %s", name, arguments)
+            self._remember_session()
             
-            try:
+            metrics.TOOL_IN_FLIGHT.inc(tool=name)
+            start = time.monotonic()
+            result = None
+            with tracing.span(f"tool {name}", **{"mcp.tool": name}) as span:
+                try:
+                    result = await self._call_tool(name, arguments or {})
+                    errors = [content.text for content in result if isinstance(content, ErrorTextContent)]
+                    if errors:
+                        span.set_error(errors[0][:200])
+                    return result
+                finally:
+                    metrics.TOOL_IN_FLIGHT.dec(tool=name)
+                    self._record_tool_metrics(name, result, time.monotonic() - start)
+    
+    def _register_resources(self):
+        """Register resource handlers and update subscriptions."""
+        
+        @self.server.list_resources()
+        async def list_resources() -> List[Resource]:
+            """List available resources."""
+            self._remember_session()
+            return self.resource_handler.list_resources()
+        
+        @self.server.list_resource_templates()
+        async def list_resource_templates() -> List[ResourceTemplate]:
+            """List resource templates."""
+            return self.resource_handler.list_templates()
+        
+        async def read_resource(request: ReadResourceRequest) -> ServerResult:
+            """Read a resource, honouring ``_meta.ifNoneMatch``."""
+            params = request.params
+            if_none_match = getattr(params.meta, "ifNoneMatch", None) if params.meta else None
+            with tracing.span("resource read", **{"mcp.resource": str(params.uri)}):
                 async with self.eagle_client as client:
-                    # Health check
-                    if name == "health_check":
-                        is_healthy = await client.health_check()
-                        return [TextContent(
-                            type="text",
-                            text=f"Eagle API is {'healthy' if is_healthy else 'unhealthy'}"
-                        )]
-                    
-                    # Route to appropriate handler
-                    if name.startswith("api_"):
-                        # Check if Direct API tools are exposed
-                        if not EXPOSE_DIRECT_API_TOOLS:
-                            raise ValueError(f"Direct API tools are not exposed. Set EXPOSE_DIRECT_API_TOOLS=true to enable.")
-                        return await self.direct_api_handler.handle_call(name, arguments, client)
-                    elif name.startswith("folder_"):
-                        return await self.folder_handler.handle_call(name, arguments, client)
-                    elif name.startswith("item_"):
-                        return await self.item_handler.handle_call(name, arguments, client)
-                    elif name.startswith("library_"):
-                        return await self.library_handler.handle_call(name, arguments, client)
-                    elif name.startswith("image_") or name.startswith("thumbnail_"):
-                        return await self.image_handler.handle_call(name, arguments, client)
-                    else:
-                        raise ValueError(f"Unknown tool: {name}")
-                        
-            except EagleAPIError as e:
-                logger.error(f"Eagle API error in {name}: {e}")
-                return [TextContent(
-                    type="text",
-                    text=f"Eagle API error: {e}"
-                )]
+                    return ServerResult(await self.resource_handler.read(str(params.uri), client, if_none_match))
+        
+        # Registered directly rather than through @read_resource(), which only takes
+        # str/bytes and would decode and re-encode cached Base64 thumbnails
+        self.server.request_handlers[ReadResourceRequest] = read_resource
+        
+        @self.server.subscribe_resource()
+        async def subscribe_resource(uri) -> None:
+            """Start sending updates of a resource to the current session."""
+            session = self.server.request_context.session
+            self._subscriptions.setdefault(str(uri), weakref.WeakSet()).add(session)
+            self.change_feed.activate()
+        
+        @self.server.unsubscribe_resource()
+        async def unsubscribe_resource(uri) -> None:
+            """Stop sending updates of a resource to the current session."""
+            sessions = self._subscriptions.get(str(uri))
+            if sessions is not None:
+                sessions.discard(self.server.request_context.session)
+                if not sessions:
+                    del self._subscriptions[str(uri)]
+    
+    async def _publish_changes(self, event: ChangeEvent) -> None:
+        """Send resources/updated notifications for a library change to subscribed sessions."""
+        uris = [LIBRARY_CHANGES_URI]
+        uris.extend(f"eagle://item/{item_id}" for item_id in (
+            *event.items_added, *event.items_updated, *event.items_removed))
+        uris.extend(f"eagle://folder/{folder_id}" for folder_id in (
+            *event.folders_added, *event.folders_updated, *event.folders_removed))
+        for uri in uris:
+            for session in list(self._subscriptions.get(uri, ())):
+                try:
+                    await session.send_resource_updated(uri)
+                except Exception as e:
+                    logger.debug("Could not notify session of resource update: %s", e)
+                    self._subscriptions[uri].discard(session)
+    
+    async def _call_tool(self, name: str, arguments: Dict[str, Any]) -> List[TextContent]:
+        """Dispatch a tool call to its handler."""
+        try:
+            handler = self.registry.get_handler(name)
+            if handler is None:
+                if name.startswith("api_") and not config.expose_direct_api_tools:
+                    raise ValueError("Direct API tools are not exposed. Set EXPOSE_DIRECT_API_TOOLS=true to enable.")
+                raise ValueError(f"Unknown tool: {name}")
+            
+            async with self.eagle_client as client:
+                return await handler.handle_call(name, arguments, client)
+        
+        except EagleAPIError as e:
+            logger.error("Eagle API error in %s: %s", name, e)
+            return [ErrorTextContent(
+                type="text",
+                text=f"Eagle API error: {e}"
+            )]
+        except Exception as e:
+            logger.error("Unexpected error in %s: %s", name, e)
+            return [ErrorTextContent(
+                type="text",
+                text=f"Unexpected error: {e}"
+            )]
+    
+    def _remember_session(self) -> None:
+        """Track the session making the current request."""
+        try:
+            self._sessions.add(self.server.request_context.session)
+        except LookupError:
+            pass
+    
+    async def reload_tools(self) -> bool:
+        """Re-read tool-related settings and notify clients if the tool list changed."""
+        if not config.reload_tool_settings():
+            return False
+        self.registry = self._build_registry()
+        logger.info("Tool list changed (%d tools), notifying %d session(s)", len(self.registry), len(self._sessions))
+        for session in list(self._sessions):
+            try:
+                await session.send_tool_list_changed()
             except Exception as e:
-                logger.error(f"Unexpected error in {name}: {e}")
-                return [TextContent(
-                    type="text",
-                    text=f"Unexpected error: {e}"
-                )]
+                logger.debug("Could not notify session of tool list change: %s", e)
+                self._sessions.discard(session)
+        return True
+    
+    async def _watch_config(self, interval: float) -> None:
+        """Poll .env.local and reload tools when it changes."""
+        last_mtime = None
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                mtime = env_file.stat().st_mtime
+            except OSError:
+                mtime = None
+            if mtime != last_mtime:
+                last_mtime = mtime
+                await self.reload_tools()
+    
+    def _record_tool_metrics(self, name: str, result: Optional[List[Any]], elapsed: float) -> None:
+        """Record latency, payload size and outcome of one tool call."""
+        failed = result is None or any(isinstance(content, ErrorTextContent) for content in result)
+        metrics.TOOL_CALLS.inc(tool=name, status="error" if failed else "ok")
+        metrics.TOOL_LATENCY.observe(elapsed, tool=name)
+        if result:
+            # Character counts; Base64 image data is one byte per character
+            size = sum(len(getattr(content, "text", None) or getattr(content, "data", None) or "")
+                       for content in result)
+            metrics.TOOL_RESPONSE_BYTES.observe(size, tool=name)
+    
+    def _collect_metrics(self) -> None:
+        """Refresh Eagle client gauges before metrics are rendered."""
+        for limiter in (self.eagle_client.read_limiter, self.eagle_client.write_limiter):
+            metrics.EAGLE_CONCURRENCY_LIMIT.set(limiter.limit, budget=limiter.name)
+            metrics.EAGLE_IN_FLIGHT.set(limiter.in_flight, budget=limiter.name)
+            metrics.EAGLE_QUEUE_DEPTH.set(limiter.queue_depth, budget=limiter.name)
+        state = self.eagle_client.circuit_breaker.state
+        for candidate in (CircuitBreaker.CLOSED, CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN):
+            metrics.EAGLE_CIRCUIT_STATE.set(1 if candidate == state else 0, state=candidate)
+    
+    def initialization_options(self) -> InitializationOptions:
+        """Build the MCP initialization options shared by every transport."""
+        capabilities = self.server.get_capabilities(
+            notification_options=NotificationOptions(tools_changed=True),
+            experimental_capabilities={}
+        )
+        # The SDK doesn't advertise subscriptions even with a subscribe handler registered
+        capabilities.resources.subscribe = True
+        return InitializationOptions(
+            server_name=MCP_SERVER_NAME,
+            server_version=MCP_SERVER_VERSION,
+            capabilities=capabilities
+        )
     
     async def run(self):
         """Run the MCP server."""
-        logger.info("Starting Eagle MCP Server")
+        logger.info("Starting Eagle MCP Server (%s transport)", MCP_TRANSPORT)
         
-        # Test Eagle connection
+        # Hold the client open for the server's lifetime so every tool call
+        # (and every client, on network transports) reuses pooled connections
         async with self.eagle_client as client:
-            if await client.health_check():
-                logger.info("Eagle API connection verified")
-            else:
-                logger.warning("Eagle API connection failed - server will still start")
-        
-        # Start stdio server
+            # Check Eagle in the background so `initialize` is answered immediately;
+            # a slow or missing Eagle must not delay the client's first request
+            background = [asyncio.create_task(self._startup_health_check(client))]
+            if CONFIG_RELOAD_INTERVAL > 0:
+                background.append(asyncio.create_task(self._watch_config(CONFIG_RELOAD_INTERVAL)))
+            if CHANGE_POLL_INTERVAL > 0:
+                background.append(asyncio.create_task(self.change_feed.run(client)))
+            try:
+                if MCP_TRANSPORT == "stdio":
+                    if MCP_METRICS_PORT:
+                        from http_transport import run_metrics_server
+                        background.append(asyncio.create_task(run_metrics_server()))
+                    await self._run_stdio()
+                else:
+                    from http_transport import run_http_server
+                    await run_http_server(self, MCP_TRANSPORT)
+            finally:
+                for task in background:
+                    task.cancel()
+                # Region worker processes and file I/O threads
+                self.image_handler.shutdown()
+    
+    async def _startup_health_check(self, client: EagleClient) -> None:
+        """Log whether Eagle is reachable at startup."""
+        if await client.health_check():
+            logger.info("Eagle API connection verified")
+        else:
+            logger.warning("Eagle API connection failed - server will still start")
+    
+    async def _run_stdio(self):
+        """Serve a single client over stdio."""
         async with stdio_server() as (read_stream, write_stream):
             logger.info("MCP server started successfully")
             await self.server.run(
                 read_stream,
                 write_stream,
-                InitializationOptions(
-                    server_name=MCP_SERVER_NAME,
-                    server_version=MCP_SERVER_VERSION,
-                    capabilities=self.server.get_capabilities(
-                        notification_options=NotificationOptions(),
-                        experimental_capabilities={}
-                    )
-                )
+                self.initialization_options()
             )
 
 
@@ -177,6 +331,9 @@ async def main():
     """Main entry point."""
     # Ensure proper UTF-8 output on Windows
     ensure_utf8_output()
+    # Deferred: logging.handlers is only needed once the server actually runs
+    from utils.logging_config import setup_logging
+    setup_logging()
     
     server = EagleMCPServer()
     await server.run()
@@ -1,51 +1,164 @@
-"""Base schemas for Eagle MCP Server."""
+"""Base schemas for Eagle MCP Server.
 
-from typing import Any, Dict, Optional
-from pydantic import BaseModel, Field
+These are lightweight slotted dataclasses rather than validation models:
+large libraries return hundreds of thousands of items, and only the fields
+declared here are kept (with msgspec installed, only these fields are even
+decoded; see ``utils.json_codec.decode_as``).
+"""
 
+from dataclasses import dataclass, field, fields
+from typing import Any, Dict, List, Optional, Type, TypeVar
 
-class EagleResponse(BaseModel):
-    """Base response from Eagle API."""
-    status: str
-    data: Optional[Dict[str, Any]] = None
-    
-    @property
-    def is_success(self) -> bool:
-        """Check if response is successful."""
-        return self.status == "success"
+T = TypeVar("T")
+
+
+class _Struct:
+    """Mixin giving structs dict-style ``get`` access for formatting helpers."""
+
+    __slots__ = ()
 
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return the attribute ``key``, or ``default`` if missing or None."""
+        value = getattr(self, key, None)
+        return default if value is None else value
 
-class FolderInfo(BaseModel):
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the declared fields as a plain dictionary."""
+        result = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, list):
+                value = [v.to_dict() if isinstance(v, _Struct) else v for v in value]
+            result[f.name] = value
+        return result
+
+
+@dataclass(slots=True)
+class FolderInfo(_Struct):
     """Folder information from Eagle API."""
     id: str
-    name: str
+    name: str = ""
     description: Optional[str] = None
-    children: Optional[list] = None
+    children: List["FolderInfo"] = field(default_factory=list)
     modificationTime: Optional[int] = None
-    tags: Optional[list] = None
+    dateCreated: Optional[int] = None
+    dateModified: Optional[int] = None
+    tags: List[str] = field(default_factory=list)
     iconColor: Optional[str] = None
-    icon: Optional[str] = None
-    newFolderName: Optional[str] = None
-    password: Optional[str] = None
-    passwordTips: Optional[str] = None
     parent: Optional[str] = None
-    size: Optional[int] = None
-    isExpand: Optional[bool] = None
-    extendTags: Optional[list] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FolderInfo":
+        """Build from a decoded Eagle folder object, ignoring unknown keys."""
+        return cls(
+            id=data.get("id", ""),
+            name=data.get("name") or "",
+            description=data.get("description"),
+            children=[cls.from_dict(child) for child in data.get("children") or [] if isinstance(child, dict)],
+            modificationTime=data.get("modificationTime"),
+            dateCreated=data.get("dateCreated"),
+            dateModified=data.get("dateModified"),
+            tags=data.get("tags") or [],
+            iconColor=data.get("iconColor"),
+            parent=data.get("parent"),
+        )
 
 
-class ItemInfo(BaseModel):
+@dataclass(slots=True)
+class ItemInfo(_Struct):
     """Item information from Eagle API."""
     id: str
-    name: str
-    size: int
-    ext: str
-    tags: list = Field(default_factory=list)
-    folders: list = Field(default_factory=list)
+    name: str = ""
+    size: int = 0
+    ext: str = ""
+    tags: List[str] = field(default_factory=list)
+    folders: List[str] = field(default_factory=list)
     modificationTime: Optional[int] = None
     height: Optional[int] = None
     width: Optional[int] = None
     star: Optional[int] = None
     annotation: Optional[str] = None
     url: Optional[str] = None
-    lastModified: Optional[int] = None
\ No newline at end of file
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ItemInfo":
+        """Build from a decoded Eagle item object, ignoring unknown keys."""
+        return cls(
+            id=data.get("id", ""),
+            name=data.get("name") or "",
+            size=data.get("size") or 0,
+            ext=data.get("ext") or "",
+            tags=data.get("tags") or [],
+            folders=data.get("folders") or [],
+            modificationTime=data.get("modificationTime"),
+            height=data.get("height"),
+            width=data.get("width"),
+            star=data.get("star"),
+            annotation=data.get("annotation"),
+            url=data.get("url"),
+        )
+
+
+@dataclass(slots=True)
+class EagleResponse(_Struct):
+    """Base response from Eagle API."""
+    status: str
+    data: Optional[Any] = None
+
+    @property
+    def is_success(self) -> bool:
+        """Check if response is successful."""
+        return self.status == "success"
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "EagleResponse":
+        """Build from a decoded Eagle response envelope."""
+        return cls(status=data.get("status", ""), data=data.get("data"))
+
+
+def _entries(envelope: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Objects in an envelope's ``data`` (an error envelope's message string has none)."""
+    data = envelope.get("data")
+    if envelope.get("status") != "success" or not isinstance(data, list):
+        return []
+    return [entry for entry in data if isinstance(entry, dict)]
+
+
+@dataclass(slots=True)
+class ItemListResponse(_Struct):
+    """Typed ``/api/item/list`` response."""
+    status: str
+    data: List[ItemInfo] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ItemListResponse":
+        """Build from a decoded Eagle response envelope."""
+        return cls(
+            status=data.get("status", ""),
+            data=[ItemInfo.from_dict(item) for item in _entries(data)],
+        )
+
+
+@dataclass(slots=True)
+class FolderListResponse(_Struct):
+    """Typed ``/api/folder/list`` response."""
+    status: str
+    data: List[FolderInfo] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FolderListResponse":
+        """Build from a decoded Eagle response envelope."""
+        return cls(
+            status=data.get("status", ""),
+            data=[FolderInfo.from_dict(folder) for folder in _entries(data)],
+        )
+
+
+def as_typed(result: Any, model: Type[T]) -> T:
+    """``result`` as ``model``: typed responses pass through, plain envelopes are converted.
+    
+    ``EagleClient.get`` only decodes into ``model`` when that is cheap (see
+    ``utils.json_codec.TYPED_DECODING``); callers that need attribute access
+    convert here.
+    """
+    return result if isinstance(result, model) else model.from_dict(result)
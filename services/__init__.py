@@ -0,0 +1 @@
+"""Stateful services shared by tool handlers (indexes, caches, statistics)."""
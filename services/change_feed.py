@@ -0,0 +1,271 @@
+"""Library change feed: detects item and folder changes and publishes them.
+
+Changes are found the same way the item index stays fresh: the library's
+modification time (one cheap ``/api/library/info`` call) is polled, and when
+it moves the index is rebuilt and its changed item IDs are classified into
+added, updated and removed. Folders are diffed from ``/api/folder/list`` at
+the same moment. When ``watchfiles`` is installed and the library directory
+is reachable, file-system events wake the poll loop early (inotify on Linux,
+FSEvents/ReadDirectoryChangesW elsewhere); otherwise it sleeps for
+``interval`` seconds between polls. Polling only starts once someone is
+interested (``activate``: a resource subscription or a first
+``library_changes_since`` call), since each library change rebuilds the
+item index from a full ``/api/item/list`` scan.
+
+Each change is an event with a sequence number. ``token`` values handed to
+clients are ``<epoch>.<sequence>``; a token from another server process, or
+older than the retained history, yields a ``reset`` telling the client to
+resynchronise from scratch.
+"""
+
+import asyncio
+import logging
+import os
+import secrets
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, FrozenSet, List, Optional, Set, Tuple
+
+from config import CHANGE_FEED_HISTORY, CHANGE_POLL_INTERVAL
+from eagle_client import EagleClient
+from schemas.base import FolderInfo, FolderListResponse, as_typed
+from services.item_index import ItemIndex
+from utils import tracing
+
+try:
+    from watchfiles import awatch
+except ImportError:  # pragma: no cover - optional dependency
+    awatch = None
+
+logger = logging.getLogger(__name__)
+
+# Resource whose subscribers hear about every change
+LIBRARY_CHANGES_URI = "eagle://library/changes"
+
+# Folder ID -> (name, parent ID, description, tags), for diffing
+FolderState = Dict[str, Tuple[str, Optional[str], Optional[str], Tuple[str, ...]]]
+
+
+def folder_state(folders: List[FolderInfo]) -> FolderState:
+    """Flatten a folder tree into the fields whose change is reported."""
+    state = {}
+    stack = [(folder, None) for folder in folders]
+    while stack:
+        folder, parent = stack.pop()
+        state[folder.id] = (folder.name, parent, folder.description, tuple(folder.tags))
+        stack.extend((child, folder.id) for child in folder.children)
+    return state
+
+
+def _diff(before: Set[str], after: Set[str], changed: Set[str]) -> Tuple[List[str], List[str], List[str]]:
+    """Split ``changed`` into sorted added, updated and removed lists."""
+    return (
+        sorted(changed & after - before),
+        sorted(changed & after & before),
+        sorted(changed & before - after),
+    )
+
+
+@dataclass
+class ChangeEvent:
+    """One detected change of the library."""
+    sequence: int
+    timestamp: float
+    # A library switch or an untracked rebuild: clients must start over
+    reset: bool = False
+    items_added: List[str] = field(default_factory=list)
+    items_updated: List[str] = field(default_factory=list)
+    items_removed: List[str] = field(default_factory=list)
+    folders_added: List[str] = field(default_factory=list)
+    folders_updated: List[str] = field(default_factory=list)
+    folders_removed: List[str] = field(default_factory=list)
+
+
+Listener = Callable[[ChangeEvent], Awaitable[None]]
+
+
+class ChangeFeed:
+    """Detects library changes and remembers the recent ones for ``changes_since``."""
+    
+    def __init__(self, item_index: ItemIndex, interval: float = CHANGE_POLL_INTERVAL,
+                 history: int = CHANGE_FEED_HISTORY):
+        self.item_index = item_index
+        self.interval = interval
+        # Tokens from another process (or before a restart) are recognised as stale
+        self.epoch = secrets.token_hex(4)
+        self.sequence = 0
+        self._events: Deque[ChangeEvent] = deque(maxlen=max(1, history))
+        self._listeners: List[Listener] = []
+        # State the next poll is diffed against (None = not seen yet)
+        self._generation: Optional[int] = None
+        self._library_path: Optional[str] = None
+        self._item_ids: FrozenSet[str] = frozenset()
+        self._folders: Optional[FolderState] = None
+        self._lock = asyncio.Lock()
+        # Set once a client asks for changes; the background loop waits for it
+        self._active = asyncio.Event()
+    
+    @property
+    def token(self) -> str:
+        """Token identifying the current position in the feed."""
+        return f"{self.epoch}.{self.sequence}"
+    
+    @property
+    def latest(self) -> Optional[ChangeEvent]:
+        """The most recent change event, if any."""
+        return self._events[-1] if self._events else None
+    
+    def add_listener(self, listener: Listener) -> None:
+        """Call ``listener`` with every new event (errors are logged and ignored)."""
+        self._listeners.append(listener)
+    
+    async def poll(self, client: EagleClient) -> Optional[ChangeEvent]:
+        """Check the library once and return the change event, if anything changed."""
+        async with self._lock:
+            with tracing.span("change_feed.poll") as span:
+                await self.item_index.refresh(client)
+                index = self.item_index
+                folders = None
+                if self._generation is None or index.generation != self._generation:
+                    result = as_typed(await client.get("/api/folder/list", model=FolderListResponse),
+                                      FolderListResponse)
+                    if result.get("status") == "success":
+                        folders = folder_state(result.get("data", []))
+                event = self._detect(folders)
+                span.set_attribute("change_feed.changed", event is not None)
+        if event is not None:
+            await self._publish(event)
+        return event
+    
+    def _detect(self, folders: Optional[FolderState]) -> Optional[ChangeEvent]:
+        """Diff the index (and the folder tree, if fetched) against the last poll."""
+        index = self.item_index
+        item_ids = self._item_ids
+        if index.generation != self._generation:
+            item_ids = frozenset(item.id for item in index)
+        first = self._generation is None
+        if first or index.generation == self._generation and folders in (None, self._folders):
+            self._remember(item_ids, folders)
+            return None
+        
+        event = ChangeEvent(sequence=self.sequence + 1, timestamp=time.time())
+        changed = index.changed_since(self._generation) if index.library_path == self._library_path else None
+        if changed is None:
+            event.reset = True
+        else:
+            event.items_added, event.items_updated, event.items_removed = _diff(
+                set(self._item_ids), set(item_ids), changed
+            )
+        if folders is not None and self._folders is not None and not event.reset:
+            before, after = self._folders, folders
+            changed_folders = {folder_id for folder_id in before.keys() | after.keys()
+                               if before.get(folder_id) != after.get(folder_id)}
+            event.folders_added, event.folders_updated, event.folders_removed = _diff(
+                set(before), set(after), changed_folders
+            )
+        self._remember(item_ids, folders)
+        
+        if not event.reset and not any((event.items_added, event.items_updated, event.items_removed,
+                                        event.folders_added, event.folders_updated, event.folders_removed)):
+            # The library's modification time moved without visible changes
+            return None
+        self.sequence = event.sequence
+        self._events.append(event)
+        return event
+    
+    def _remember(self, item_ids: FrozenSet[str], folders: Optional[FolderState]) -> None:
+        self._generation = self.item_index.generation
+        self._library_path = self.item_index.library_path
+        self._item_ids = item_ids
+        if folders is not None:
+            self._folders = folders
+    
+    async def _publish(self, event: ChangeEvent) -> None:
+        for listener in self._listeners:
+            try:
+                await listener(event)
+            except Exception as e:
+                logger.warning("Change listener failed: %s", e)
+    
+    def changes_since(self, token: Optional[str]) -> Dict[str, Any]:
+        """Net changes after ``token`` (None = just the current token).
+        
+        An item added and then removed within the window is left out; one
+        removed and re-added is reported as updated.
+        """
+        current = {"token": self.token, "reset": False, "items": {}, "folders": {}}
+        if token is None:
+            return current
+        
+        epoch, _, sequence = token.partition(".")
+        try:
+            sequence = int(sequence)
+        except ValueError:
+            sequence = -1
+        oldest = self._events[0].sequence if self._events else self.sequence + 1
+        if epoch != self.epoch or not 0 <= sequence <= self.sequence or sequence + 1 < oldest:
+            return {**current, "reset": True}
+        
+        events = [event for event in self._events if event.sequence > sequence]
+        if any(event.reset for event in events):
+            return {**current, "reset": True}
+        for kind in ("items", "folders"):
+            # ID -> (existed at the token, exists now)
+            states: Dict[str, List[bool]] = {}
+            for event in events:
+                for name, existed, exists in (("added", False, True), ("updated", True, True),
+                                              ("removed", True, False)):
+                    for entity_id in getattr(event, f"{kind}_{name}"):
+                        states.setdefault(entity_id, [existed, exists])[1] = exists
+            current[kind] = {
+                "added": sorted(i for i, (before, after) in states.items() if after and not before),
+                "updated": sorted(i for i, (before, after) in states.items() if after and before),
+                "removed": sorted(i for i, (before, after) in states.items() if before and not after),
+            }
+        return current
+    
+    @property
+    def active(self) -> bool:
+        """Whether background polling has been requested."""
+        return self._active.is_set()
+    
+    def activate(self) -> None:
+        """Start background polling (idempotent)."""
+        self._active.set()
+    
+    async def run(self, client: EagleClient) -> None:
+        """Poll, once activated, until cancelled (the server's background task)."""
+        await self._active.wait()
+        async for _ in self._ticks():
+            try:
+                await self.poll(client)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.debug("Change poll failed: %s", e)
+    
+    async def _ticks(self) -> AsyncIterator[None]:
+        """Yield whenever the library should be checked."""
+        while True:
+            path = self.item_index.library_path
+            if awatch is not None and path and os.path.isdir(path):
+                # Wakes on file-system events, and at least every ``interval`` seconds
+                async for _ in awatch(path, debounce=500, rust_timeout=int(self.interval * 1000),
+                                      yield_on_timeout=True):
+                    yield
+                    if self.item_index.library_path != path:
+                        break
+            else:
+                await asyncio.sleep(self.interval)
+                yield
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return the feed position and how changes are detected."""
+        path = self.item_index.library_path
+        return {
+            "token": self.token,
+            "active": self.active,
+            "events": len(self._events),
+            "watching": awatch is not None and bool(path) and os.path.isdir(path),
+        }
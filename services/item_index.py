@@ -0,0 +1,271 @@
+"""In-memory index of every item in the current Eagle library."""
+
+import asyncio
+import logging
+from array import array
+from bisect import bisect_left, bisect_right
+import os
+import time
+from collections import deque
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from config import ITEM_INDEX_PAGE_SIZE
+from eagle_client import EagleClient
+from schemas.base import ItemInfo, ItemListResponse, as_typed
+from utils import json_codec, tracing
+from utils.concurrency import Priority
+from utils.text import search_key
+
+logger = logging.getLogger(__name__)
+
+# Item fields with posting lists (value -> IDs of the items having it)
+POSTING_FIELDS = ("tags", "ext", "folders")
+# Numeric item fields with sorted indexes
+SORTED_FIELDS = ("size", "width", "height", "star", "modificationTime")
+# Rebuilds whose changed item IDs are remembered for incremental consumers
+CHANGE_HISTORY = 16
+
+
+async def get_library_state(client: EagleClient) -> Tuple[Optional[str], Optional[int]]:
+    """Return the current library's path and modification time."""
+    result = await client.get("/api/library/info")
+    if result.get("status") != "success":
+        return None, None
+    data = result.get("data") or {}
+    library = data.get("library") or {}
+    return library.get("path"), data.get("modificationTime") or library.get("modificationTime")
+
+
+def posting_values(item: ItemInfo, field: str) -> Iterable[str]:
+    """Values of ``field`` under which ``item`` is posted (extensions are lower-cased)."""
+    if field == "ext":
+        return (item.ext.lower(),)
+    return getattr(item, field)
+
+
+def item_search_key(item: ItemInfo) -> str:
+    """Text searched by ``text`` filters: name, annotation and tags, folded."""
+    return search_key(item.name, item.annotation or "", *item.tags)
+
+
+class SortedIndex:
+    """Item IDs ordered by one numeric field, searchable by bisection.
+    
+    Values live in a compact ``array`` parallel to the ID list; items
+    without a value for the field are left out.
+    """
+    
+    __slots__ = ("keys", "ids")
+    
+    def __init__(self, pairs: List[Tuple[int, str]]):
+        pairs.sort()
+        self.keys = array("q", [value for value, _ in pairs])
+        self.ids = [item_id for _, item_id in pairs]
+    
+    def bounds(self, low: Optional[float] = None, high: Optional[float] = None) -> Tuple[int, int]:
+        """Positions ``[start, end)`` of the values within ``low <= value <= high``."""
+        start = 0 if low is None else bisect_left(self.keys, low)
+        end = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return start, max(start, end)
+    
+    def count(self, low: Optional[float] = None, high: Optional[float] = None) -> int:
+        """Number of items within the range, without materialising them."""
+        start, end = self.bounds(low, high)
+        return end - start
+    
+    def range(self, low: Optional[float] = None, high: Optional[float] = None) -> List[str]:
+        """IDs of the items within the range, in ascending value order."""
+        start, end = self.bounds(low, high)
+        return self.ids[start:end]
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class ItemIndex:
+    """All items of the current library, keyed by ID.
+    
+    Built by paging through ``/api/item/list`` at bulk priority (so it never
+    starves interactive tool calls) and rebuilt only when the library's
+    modification time changes. Consumers iterate the index instead of
+    fetching the whole library themselves.
+    """
+    
+    def __init__(self, page_size: int = ITEM_INDEX_PAGE_SIZE):
+        self.page_size = page_size
+        self._items: Dict[str, ItemInfo] = {}
+        self.library_path: Optional[str] = None
+        # Library modification time the index was built at (None = never built)
+        self.version: Optional[int] = None
+        self.built_at: Optional[float] = None
+        # Bumped whenever the contents change; consumers cache against it
+        self.generation = 0
+        # (generation, IDs added, changed or removed by the rebuild that produced it)
+        self._changes: Deque[Tuple[int, Set[str]]] = deque(maxlen=CHANGE_HISTORY)
+        self._postings: Dict[str, Dict[str, Set[str]]] = {}
+        self._sorted: Dict[str, SortedIndex] = {}
+        self._search_keys: Optional[Dict[str, str]] = None
+        # Held while rebuilding or switching libraries
+        self.lock = asyncio.Lock()
+    
+    async def iter_pages(self, client: EagleClient) -> AsyncIterator[List[ItemInfo]]:
+        """Yield the library's items one ``/api/item/list`` page at a time."""
+        page = 0
+        while True:
+            # Eagle treats ``offset`` as a page number, not an item offset
+            result = as_typed(await client.get(
+                "/api/item/list", {"limit": self.page_size, "offset": page},
+                priority=Priority.BULK, model=ItemListResponse
+            ), ItemListResponse)
+            if result.get("status") != "success":
+                raise RuntimeError(f"Failed to list items (page {page})")
+            items = result.get("data", [])
+            if items:
+                yield items
+            if len(items) < self.page_size:
+                return
+            page += 1
+    
+    async def refresh(self, client: EagleClient, force: bool = False) -> Optional[int]:
+        """Rebuild the index if the library changed and return its version.
+        
+        A library without a modification time is rebuilt on every call.
+        """
+        async with self.lock:
+            library_path, version = await get_library_state(client)
+            if (force or version is None or version != self.version or self.built_at is None
+                    or library_path != self.library_path):
+                await self._rebuild(client, library_path, version)
+            return self.version
+    
+    async def _rebuild(self, client: EagleClient, library_path: Optional[str], version: Optional[int]) -> None:
+        with tracing.span("item_index.rebuild") as span:
+            start = time.monotonic()
+            items: Dict[str, ItemInfo] = {}
+            async for page in self.iter_pages(client):
+                for item in page:
+                    items[item.id] = item
+            previous = self._items
+            same_library = library_path == self.library_path and self.built_at is not None
+            self._replace(items)
+            if same_library:
+                changed = {item_id for item_id, item in items.items() if previous.get(item_id) != item}
+                changed.update(item_id for item_id in previous if item_id not in items)
+                self._changes.append((self.generation, changed))
+                span.set_attribute("item_index.changed", len(changed))
+            self.library_path = library_path
+            self.version = version
+            self.built_at = time.time()
+            span.set_attribute("item_index.items", len(items))
+            logger.info("Item index built: %d items in %.2fs", len(items), time.monotonic() - start)
+    
+    def save_snapshot(self, path: Path) -> None:
+        """Write the index to ``path`` (atomically, via a temporary file)."""
+        snapshot = {
+            "library_path": self.library_path,
+            "version": self.version,
+            "built_at": self.built_at,
+            "items": [item.to_dict() for item in self._items.values()],
+        }
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json_codec.dumps(snapshot), encoding="utf-8")
+        os.replace(tmp, path)
+    
+    @staticmethod
+    def read_snapshot(path: Path) -> Optional[Dict[str, Any]]:
+        """Read a snapshot written by ``save_snapshot``, or None if missing or unreadable."""
+        try:
+            snapshot = json_codec.loads(path.read_bytes())
+            snapshot["items"] = {item["id"]: ItemInfo.from_dict(item) for item in snapshot["items"]}
+            return snapshot
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("Ignoring unreadable index snapshot %s: %s", path, e)
+            return None
+    
+    def install(self, library_path: Optional[str], snapshot: Optional[Dict[str, Any]] = None) -> None:
+        """Replace the contents with a snapshot, or empty the index if there is none.
+        
+        An emptied index is rebuilt on the next ``refresh``; a snapshot is
+        kept as long as its version matches the library's modification time.
+        """
+        if snapshot is None:
+            self._replace({})
+            self.version, self.built_at = None, None
+        else:
+            self._replace(snapshot["items"])
+            self.version = snapshot.get("version")
+            self.built_at = snapshot.get("built_at")
+        # Changes across libraries aren't tracked; consumers start over
+        self._changes.clear()
+        self.library_path = library_path
+    
+    def _replace(self, items: Dict[str, ItemInfo]) -> None:
+        self._items = items
+        self._postings = {}
+        self._sorted = {}
+        self._search_keys = None
+        self.generation += 1
+    
+    def changed_since(self, generation: int) -> Optional[Set[str]]:
+        """IDs of items added, changed or removed after ``generation``.
+        
+        Returns None when that is no longer known (too many rebuilds ago, or
+        the index was replaced wholesale), in which case consumers must
+        recompute from scratch.
+        """
+        if generation == self.generation:
+            return set()
+        changes = [ids for gen, ids in self._changes if gen > generation]
+        if not changes or len(changes) != self.generation - generation:
+            return None
+        return set().union(*changes)
+    
+    def postings(self, field: str) -> Dict[str, Set[str]]:
+        """Map each value of ``field`` (one of ``POSTING_FIELDS``) to the IDs having it.
+        
+        Built on first use after each change of the index.
+        """
+        postings = self._postings.get(field)
+        if postings is None:
+            postings = {}
+            for item in self._items.values():
+                for value in posting_values(item, field):
+                    postings.setdefault(value, set()).add(item.id)
+            self._postings[field] = postings
+        return postings
+    
+    def sorted_index(self, field: str) -> SortedIndex:
+        """Items ordered by ``field`` (one of ``SORTED_FIELDS``), built on first use."""
+        index = self._sorted.get(field)
+        if index is None:
+            with tracing.span("item_index.sort", **{"item_index.field": field}):
+                index = self._sorted[field] = SortedIndex([
+                    (int(value), item.id) for item in self._items.values()
+                    if (value := getattr(item, field)) is not None
+                ])
+        return index
+    
+    def search_keys(self) -> Dict[str, str]:
+        """Map each item ID to its folded name, annotation and tags (see ``item_search_key``).
+        
+        Built on first use after each change of the index; folding is memoised
+        per string, so a rebuild only folds names and tags it hasn't seen.
+        """
+        if self._search_keys is None:
+            with tracing.span("item_index.search_keys"):
+                self._search_keys = {item.id: item_search_key(item) for item in self._items.values()}
+        return self._search_keys
+    
+    def get(self, item_id: str) -> Optional[ItemInfo]:
+        """Return an indexed item by ID."""
+        return self._items.get(item_id)
+    
+    def __iter__(self) -> Iterator[ItemInfo]:
+        return iter(self._items.values())
+    
+    def __len__(self) -> int:
+        return len(self._items)
@@ -0,0 +1,87 @@
+"""Multi-library handling: library history and index-preserving switches."""
+
+import asyncio
+import hashlib
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import config
+from eagle_client import EagleAPIError, EagleClient
+from services.item_index import ItemIndex, get_library_state
+from utils import tracing
+
+logger = logging.getLogger(__name__)
+
+
+class LibraryManager:
+    """Switches Eagle libraries without losing the work spent indexing them.
+    
+    Before a switch the current library's item index is written to
+    ``snapshot_dir``; afterwards the target library's snapshot (if any) is
+    loaded, so switching back and forth between large libraries doesn't
+    re-page every item. A loaded snapshot is still checked against the
+    library's modification time on the next refresh.
+    """
+    
+    def __init__(self, item_index: ItemIndex, snapshot_dir: Optional[Path] = None):
+        self.item_index = item_index
+        self.snapshot_dir = snapshot_dir if snapshot_dir is not None else config.cache_dir / "indexes"
+    
+    def snapshot_path(self, library_path: str) -> Path:
+        """Snapshot file for a library (named by a hash of its path)."""
+        digest = hashlib.sha1(library_path.encode("utf-8")).hexdigest()[:16]
+        return self.snapshot_dir / f"{digest}.json"
+    
+    async def list_libraries(self, client: EagleClient) -> Dict[str, Any]:
+        """Return the current library and Eagle's library history."""
+        result = await client.get("/api/library/history")
+        if result.get("status") != "success":
+            raise EagleAPIError("Failed to get library history")
+        current, _ = await get_library_state(client)
+        libraries = []
+        for path in result.get("data") or []:
+            libraries.append({
+                "path": path,
+                "name": Path(path).stem,
+                "current": path == current,
+                "snapshot": self.snapshot_path(path).exists(),
+            })
+        return {"current": current, "libraries": libraries}
+    
+    async def switch(self, client: EagleClient, library_path: str) -> Dict[str, Any]:
+        """Switch Eagle to ``library_path``, swapping item index snapshots.
+        
+        The index lock is held throughout, so no refresh can index a
+        half-switched library. Cache invalidation and installing the new
+        index happen together without yielding to the event loop.
+        """
+        index = self.item_index
+        with tracing.span("library.switch") as span:
+            async with index.lock:
+                previous = index.library_path
+                if previous is None:
+                    previous, _ = await get_library_state(client)
+                if index.built_at is not None and index.library_path:
+                    await asyncio.to_thread(index.save_snapshot, self.snapshot_path(index.library_path))
+                
+                response = await client.post("/api/library/switch", {"libraryPath": library_path})
+                if response.get("status") != "success":
+                    raise EagleAPIError(f"Failed to switch to library '{library_path}'")
+                
+                snapshot = await asyncio.to_thread(ItemIndex.read_snapshot, self.snapshot_path(library_path))
+                if snapshot is not None and snapshot.get("library_path") != library_path:
+                    snapshot = None
+                client.invalidate_caches()
+                index.install(library_path, snapshot)
+            
+            span.set_attribute("library.snapshot_loaded", snapshot is not None)
+            logger.info("Switched library %s -> %s (snapshot: %s)", previous, library_path,
+                        "loaded" if snapshot is not None else "none")
+            return {
+                "previous": previous,
+                "current": library_path,
+                "snapshot_loaded": snapshot is not None,
+                "items": len(index),
+                "response": response,
+            }
@@ -0,0 +1,100 @@
+"""Library statistics computed in a single pass over the items."""
+
+import heapq
+from bisect import bisect_right
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from schemas.base import ItemInfo
+
+# Upper edges (exclusive) of the pixel-size histogram buckets; the last
+# bucket is open-ended
+DIMENSION_EDGES = (256, 512, 1024, 2048, 4096, 8192)
+DIMENSION_LABELS = ("<256", "256-511", "512-1023", "1024-2047", "2048-4095", "4096-8191", ">=8192")
+
+UNFILED = ""
+
+
+def _dimension_bucket(value: Optional[int]) -> Optional[str]:
+    if not value:
+        return None
+    return DIMENSION_LABELS[bisect_right(DIMENSION_EDGES, value)]
+
+
+def compute_library_stats(items: Iterable[ItemInfo], top_n: int = 10) -> Dict[str, Any]:
+    """Aggregate counts, sizes and distributions over ``items`` in one pass.
+    
+    Items filed in several folders are counted in each of them; items in no
+    folder are counted under ``""``. The ``top_n`` largest items are kept in
+    a bounded heap so memory stays constant regardless of library size.
+    """
+    total_items = 0
+    total_bytes = 0
+    ext_counts: Counter = Counter()
+    ext_bytes: Counter = Counter()
+    folder_counts: Counter = Counter()
+    folder_bytes: Counter = Counter()
+    widths: Counter = Counter()
+    heights: Counter = Counter()
+    stars: Counter = Counter()
+    untagged = 0
+    unannotated = 0
+    no_dimensions = 0
+    largest: List[Tuple[int, str, str]] = []
+    
+    for item in items:
+        size = item.size or 0
+        total_items += 1
+        total_bytes += size
+        
+        ext = (item.ext or "").lower()
+        ext_counts[ext] += 1
+        ext_bytes[ext] += size
+        
+        for folder_id in item.folders or (UNFILED,):
+            folder_counts[folder_id] += 1
+            folder_bytes[folder_id] += size
+        
+        width_bucket = _dimension_bucket(item.width)
+        height_bucket = _dimension_bucket(item.height)
+        if width_bucket is None or height_bucket is None:
+            no_dimensions += 1
+        else:
+            widths[width_bucket] += 1
+            heights[height_bucket] += 1
+        
+        stars[item.star or 0] += 1
+        if not item.tags:
+            untagged += 1
+        if not item.annotation:
+            unannotated += 1
+        
+        if top_n > 0:
+            entry = (size, item.id, item.name)
+            if len(largest) < top_n:
+                heapq.heappush(largest, entry)
+            elif entry > largest[0]:
+                heapq.heapreplace(largest, entry)
+    
+    def distribution(counts: Counter, sizes: Counter) -> List[Dict[str, Any]]:
+        return [
+            {"key": key, "count": count, "bytes": sizes[key]}
+            for key, count in sorted(counts.items(), key=lambda kv: (-sizes[kv[0]], -kv[1], kv[0]))
+        ]
+    
+    return {
+        "total_items": total_items,
+        "total_bytes": total_bytes,
+        "by_extension": distribution(ext_counts, ext_bytes),
+        "by_folder": distribution(folder_counts, folder_bytes),
+        "width_histogram": {label: widths[label] for label in DIMENSION_LABELS},
+        "height_histogram": {label: heights[label] for label in DIMENSION_LABELS},
+        "no_dimensions": no_dimensions,
+        "star_distribution": {str(star): stars[star] for star in range(6)},
+        "untagged": untagged,
+        "unannotated": unannotated,
+        "largest": [
+            {"id": item_id, "name": name, "size": size}
+            for size, item_id, name in sorted(largest, reverse=True)
+        ],
+    }
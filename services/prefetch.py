@@ -0,0 +1,74 @@
+"""Opportunistic prefetching of item details after searches."""
+
+import asyncio
+import contextvars
+import logging
+from typing import Any, Dict, Iterable, Optional, Set
+
+from config import PREFETCH_CONCURRENCY, PREFETCH_TOP_K
+from eagle_client import EagleClient
+from utils import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class Prefetcher:
+    """Warms caches for the top results of a search in the background.
+    
+    Agents usually follow ``item_search`` with ``item_info`` or
+    ``thumbnail_get_base64`` on a few of the results. For the first
+    ``top_k`` results the item info and thumbnail path are fetched into the
+    client's warm cache (at bulk priority, so interactive calls go first)
+    and the thumbnail is encoded into ``thumbnail_warmer``'s cache. Failures
+    are logged and otherwise ignored.
+    """
+    
+    def __init__(self, thumbnail_warmer: Optional[Any] = None, top_k: int = PREFETCH_TOP_K,
+                 concurrency: int = PREFETCH_CONCURRENCY):
+        # Anything with ``async warm_thumbnail(item_id, client)``, i.e. the ImageHandler
+        self.thumbnail_warmer = thumbnail_warmer
+        self.top_k = top_k
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        # Strong references, so running tasks aren't garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {"scheduled": 0, "warmed": 0, "failed": 0}
+    
+    def schedule(self, client: EagleClient, item_ids: Iterable[str]) -> Optional[asyncio.Task]:
+        """Start prefetching the first ``top_k`` of ``item_ids`` and return the task."""
+        item_ids = [item_id for item_id in item_ids if item_id][:max(0, self.top_k)]
+        if not item_ids:
+            return None
+        self._stats["scheduled"] += len(item_ids)
+        # A fresh context: prefetch requests aren't part of the search's trace
+        task = asyncio.get_running_loop().create_task(self._run(client, item_ids), context=contextvars.Context())
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+    
+    async def _run(self, client: EagleClient, item_ids: list) -> None:
+        # Hold the client open: the tool call that scheduled us may already be done
+        async with client:
+            await asyncio.gather(*(self._warm(client, item_id) for item_id in item_ids))
+    
+    async def _warm(self, client: EagleClient, item_id: str) -> None:
+        async with self._semaphore:
+            try:
+                await client.warm("/api/item/info", {"id": item_id})
+                if self.thumbnail_warmer is not None:
+                    await self.thumbnail_warmer.warm_thumbnail(item_id, client)
+            except Exception as e:
+                self._stats["failed"] += 1
+                metrics.PREFETCH_ITEMS.inc(result="failed")
+                logger.debug("Prefetch of item %s failed: %s", item_id, e)
+            else:
+                self._stats["warmed"] += 1
+                metrics.PREFETCH_ITEMS.inc(result="warmed")
+    
+    async def wait(self) -> None:
+        """Wait for running prefetches (used by tests and benchmarks)."""
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Return prefetch counters and the number of running prefetch tasks."""
+        return {**self._stats, "running": len(self._tasks)}
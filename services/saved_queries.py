@@ -0,0 +1,377 @@
+"""Saved queries (local smart folders) evaluated against the item index.
+
+A query is a dict of filters:
+
+- ``tags``: tags an item must all have
+- ``ext``: extensions, any of which matches (string or list)
+- ``folder_id``: a folder, including its subfolders unless
+  ``include_subfolders`` is false
+- ``size_min``/``size_max``, ``width_min``/``width_max``,
+  ``height_min``/``height_max``, ``star_min``/``star_max``: inclusive ranges
+- ``modified_after``/``modified_before``: ISO 8601 dates or epoch milliseconds
+- ``text``: substring of the name, annotation or a tag, compared after
+  NFKC, case and katakana/hiragana folding
+
+Filters are compiled into a plan. The most selective filter backed by an
+index (a tag, extension or folder posting list, or a range over a sorted
+numeric index) drives the scan; every other filter is then checked on those
+candidates, posting-list probes first and the text search last.
+Results are cached per plan and, when the index is rebuilt, patched by
+re-checking only the items that changed.
+"""
+
+import heapq
+import logging
+import os
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from config import config
+from schemas.base import FolderInfo, ItemInfo
+from services.item_index import SORTED_FIELDS, ItemIndex, item_search_key, posting_values
+from utils import json_codec, tracing
+from utils.text import fold
+from utils.cache import ResponseCache
+
+logger = logging.getLogger(__name__)
+
+# Range filters: (minimum key, maximum key, item attribute)
+RANGE_FILTERS = (
+    ("size_min", "size_max", "size"),
+    ("width_min", "width_max", "width"),
+    ("height_min", "height_max", "height"),
+    ("star_min", "star_max", "star"),
+)
+FILTER_KEYS = frozenset(
+    {"tags", "ext", "folder_id", "include_subfolders", "modified_after", "modified_before", "text"}
+    | {key for minimum, maximum, _ in RANGE_FILTERS for key in (minimum, maximum)}
+)
+
+# JSON schema of a filter object, shared by the query tools
+FILTERS_SCHEMA = {
+    "type": "object",
+    "description": "Query filters; all given filters must match",
+    "properties": {
+        "tags": {"type": "array", "items": {"type": "string"}, "description": "Tags the item must all have"},
+        "ext": {
+            "anyOf": [{"type": "string"}, {"type": "array", "items": {"type": "string"}}],
+            "description": "File extension(s), e.g. \"png\" or [\"jpg\", \"png\"]"
+        },
+        "folder_id": {"type": "string", "description": "Folder the item must be in"},
+        "include_subfolders": {
+            "type": "boolean", "default": True, "description": "Also match items in subfolders of folder_id"
+        },
+        **{
+            key: {"type": "number", "description": f"{'Minimum' if key.endswith('_min') else 'Maximum'} {attribute}"}
+            for minimum, maximum, attribute in RANGE_FILTERS for key in (minimum, maximum)
+        },
+        "modified_after": {
+            "type": ["string", "integer"], "description": "ISO 8601 date/time or epoch milliseconds"
+        },
+        "modified_before": {
+            "type": ["string", "integer"], "description": "ISO 8601 date/time or epoch milliseconds"
+        },
+        "text": {"type": "string", "description": "Text in the name, annotation or tags"},
+    },
+    "additionalProperties": False,
+}
+
+
+class QueryError(ValueError):
+    """Raised for invalid filters or unknown saved queries."""
+
+
+def _timestamp_ms(value: Any, key: str) -> int:
+    """Epoch milliseconds from an ISO 8601 string (local time if naive) or a number."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return int(value)
+    try:
+        return int(datetime.fromisoformat(str(value)).astimezone().timestamp() * 1000)
+    except ValueError:
+        raise QueryError(f"{key} must be an ISO 8601 date or epoch milliseconds, got {value!r}") from None
+
+
+def _number(value: Any, key: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise QueryError(f"{key} must be a number, got {value!r}")
+    return value
+
+
+def _strings(value: Any, key: str, single: bool = False) -> List[str]:
+    """Validate a list of strings (or, if ``single``, also one string)."""
+    if single and isinstance(value, str):
+        return [value]
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        expected = "a string or a list of strings" if single else "a list of strings"
+        raise QueryError(f"{key} must be {expected}, got {value!r}")
+    return value
+
+
+def _subtree(folders: Iterable[FolderInfo], folder_id: str) -> Set[str]:
+    """IDs of ``folder_id`` and all of its descendants."""
+    stack = list(folders)
+    while stack:
+        folder = stack.pop()
+        if folder.id == folder_id:
+            found, below = set(), [folder]
+            while below:
+                current = below.pop()
+                found.add(current.id)
+                below.extend(current.children)
+            return found
+        stack.extend(folder.children)
+    return {folder_id}
+
+
+class QueryPlan:
+    """Compiled form of a filter dict.
+    
+    ``index_filters`` are (field, values) pairs answered from the item
+    index's posting lists: for each, an item must have one of ``values``.
+    ``predicates`` are checked on every candidate, in order; ``ranges``
+    lists those that are (attribute, low, high) ranges over sorted indexes.
+    ``text`` is a folded needle looked up in the index's search keys, last.
+    """
+    
+    def __init__(self, key: tuple, index_filters: List[Tuple[str, Set[str]]],
+                 predicates: List[Tuple[str, Callable[[ItemInfo], bool]]],
+                 ranges: List[Tuple[str, Optional[float], Optional[float]]] = (),
+                 text: Optional[str] = None):
+        self.key = key
+        self.index_filters = index_filters
+        self.predicates = predicates
+        self.ranges = list(ranges)
+        self.text = text
+        # Which index drove the last execution (for describe())
+        self.driver: Optional[str] = None
+    
+    def matches(self, item: ItemInfo) -> bool:
+        """Check one item against every filter."""
+        for field, values in self.index_filters:
+            if values.isdisjoint(posting_values(item, field)):
+                return False
+        return (all(predicate(item) for _, predicate in self.predicates)
+                and (not self.text or self.text in item_search_key(item)))
+    
+    def execute(self, index: ItemIndex) -> Set[str]:
+        """Return the IDs of matching items."""
+        candidate_sets = []
+        for field, values in self.index_filters:
+            postings = index.postings(field)
+            sets = [postings.get(value, set()) for value in values]
+            candidate_sets.append((f"{field} postings", sets[0] if len(sets) == 1 else set().union(*sets)))
+        candidate_sets.sort(key=lambda entry: len(entry[1]))
+        # Range sizes come from bisection, so comparing them costs nothing
+        ranges = sorted((index.sorted_index(attribute).count(low, high), attribute, low, high)
+                        for attribute, low, high in self.ranges)
+        
+        # Most selective first: iterate the smallest source, probe the others
+        if ranges and (not candidate_sets or ranges[0][0] < len(candidate_sets[0][1])):
+            _, attribute, low, high = ranges[0]
+            self.driver = f"{attribute} range"
+            driver = index.sorted_index(attribute).range(low, high)
+            others = [ids for _, ids in candidate_sets]
+        elif candidate_sets:
+            self.driver = candidate_sets[0][0]
+            driver = candidate_sets[0][1]
+            others = [ids for _, ids in candidate_sets[1:]]
+        else:
+            self.driver = "full scan"
+            driver, others = None, []
+        if driver is None:
+            candidates = iter(index)
+        else:
+            candidates = (index.get(item_id) for item_id in driver if all(item_id in other for other in others))
+        predicates = [predicate for _, predicate in self.predicates]
+        if self.text:
+            # Search keys are folded once per index build, not per query
+            search_keys, needle = index.search_keys(), self.text
+            predicates.append(lambda item: needle in search_keys[item.id])
+        return {item.id for item in candidates
+                if item is not None and all(predicate(item) for predicate in predicates)}
+    
+    def describe(self) -> List[str]:
+        """Human-readable plan steps, in execution order."""
+        steps = [f"index {field} in {sorted(values)}" for field, values in self.index_filters]
+        steps += [f"filter {name}" for name, _ in self.predicates]
+        if self.text:
+            steps.append(f"filter text contains {self.text!r}")
+        return ([f"driven by {self.driver}"] if self.driver else []) + (steps or ["all items"])
+
+
+def compile_query(filters: Dict[str, Any], folders: Iterable[FolderInfo] = ()) -> QueryPlan:
+    """Validate ``filters`` and compile them into a ``QueryPlan``.
+    
+    ``folders`` is the library's folder tree, used to expand ``folder_id``
+    to its subfolders.
+    """
+    unknown = set(filters) - FILTER_KEYS
+    if unknown:
+        raise QueryError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+    
+    index_filters: List[Tuple[str, Set[str]]] = []
+    for tag in _strings(filters.get("tags") or [], "tags"):
+        index_filters.append(("tags", {tag}))
+    if filters.get("ext"):
+        exts = _strings(filters["ext"], "ext", single=True)
+        index_filters.append(("ext", {ext.lower().lstrip(".") for ext in exts}))
+    if filters.get("folder_id"):
+        folder_id = filters["folder_id"]
+        if not isinstance(folder_id, str):
+            raise QueryError(f"folder_id must be a string, got {folder_id!r}")
+        subtree = _subtree(folders, folder_id) if filters.get("include_subfolders", True) else {folder_id}
+        index_filters.append(("folders", subtree))
+    
+    ranges: List[Tuple[str, Optional[float], Optional[float]]] = []
+    for minimum_key, maximum_key, attribute in RANGE_FILTERS:
+        low = _number(filters[minimum_key], minimum_key) if filters.get(minimum_key) is not None else None
+        high = _number(filters[maximum_key], maximum_key) if filters.get(maximum_key) is not None else None
+        if low is not None or high is not None:
+            ranges.append((attribute, low, high))
+    after = _timestamp_ms(filters["modified_after"], "modified_after") if filters.get("modified_after") is not None else None
+    before = _timestamp_ms(filters["modified_before"], "modified_before") if filters.get("modified_before") is not None else None
+    if after is not None or before is not None:
+        ranges.append(("modificationTime", after, before))
+    
+    # Cheapest checks first; the text search runs last
+    predicates: List[Tuple[str, Callable[[ItemInfo], bool]]] = [
+        (f"{'' if low is None else low} <= {attribute} <= {'' if high is None else high}",
+         _range_predicate(attribute, low, high))
+        for attribute, low, high in ranges
+    ]
+    text = fold(str(filters["text"])) if filters.get("text") else None
+    
+    key = (
+        tuple(sorted((field, tuple(sorted(values))) for field, values in index_filters)),
+        tuple(name for name, _ in predicates),
+        text,
+    )
+    return QueryPlan(key, index_filters, predicates, ranges, text)
+
+
+def _range_predicate(attribute: str, low: Optional[float], high: Optional[float]) -> Callable[[ItemInfo], bool]:
+    """Inclusive range check; items without a value never match."""
+    def predicate(item: ItemInfo) -> bool:
+        value = getattr(item, attribute)
+        return value is not None and (low is None or value >= low) and (high is None or value <= high)
+    return predicate
+
+
+def top_k(index: ItemIndex, ids: Optional[Set[str]], field: str, descending: bool, limit: int) -> List[ItemInfo]:
+    """The ``limit`` items of ``ids`` (None = all) with the largest or smallest ``field``.
+    
+    Selects with a bounded heap, O(n log limit). Over the whole library the
+    sorted index is sliced instead. Items without a value come last; ties are
+    broken by ID.
+    """
+    if field not in SORTED_FIELDS:
+        raise QueryError(f"Cannot order by '{field}' (use one of {', '.join(SORTED_FIELDS)})")
+    if ids is None:
+        sorted_ids = index.sorted_index(field).ids
+        chosen = sorted_ids[-limit:][::-1] if descending else sorted_ids[:limit]
+        items = [index.get(item_id) for item_id in chosen]
+        if len(items) < limit:
+            missing = (item for item in index if getattr(item, field) is None)
+            items.extend(heapq.nsmallest(limit - len(items), missing, key=lambda item: item.id))
+        return items
+    
+    absent = float("-inf") if descending else float("inf")
+    
+    def key(item: ItemInfo) -> tuple:
+        value = getattr(item, field)
+        return (absent if value is None else value, item.id)
+    
+    select = heapq.nlargest if descending else heapq.nsmallest
+    return select(limit, (index.get(item_id) for item_id in ids), key=key)
+
+
+class SavedQueryStore:
+    """Named queries persisted as JSON in the user data directory."""
+    
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path if path is not None else config.user_data_dir / "saved_queries.json"
+        self._queries: Optional[Dict[str, Dict[str, Any]]] = None
+    
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._queries is None:
+            try:
+                self._queries = json_codec.loads(self.path.read_bytes()).get("queries", {})
+            except FileNotFoundError:
+                self._queries = {}
+            except Exception as e:
+                logger.warning("Ignoring unreadable saved queries %s: %s", self.path, e)
+                self._queries = {}
+        return self._queries
+    
+    def _save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json_codec.dumps({"queries": self._queries}, indent=True), encoding="utf-8")
+        os.replace(tmp, self.path)
+    
+    def list(self) -> Dict[str, Dict[str, Any]]:
+        """All saved queries by name."""
+        return dict(self._load())
+    
+    def get(self, name: str) -> Dict[str, Any]:
+        query = self._load().get(name)
+        if query is None:
+            raise QueryError(f"No saved query named '{name}'")
+        return query
+    
+    def put(self, name: str, filters: Dict[str, Any], description: str = "") -> Dict[str, Any]:
+        """Create or replace a query (filters are validated first)."""
+        compile_query(filters)
+        query = {"filters": filters, "description": description, "updated_at": int(time.time() * 1000)}
+        self._load()[name] = query
+        self._save()
+        return query
+    
+    def delete(self, name: str) -> None:
+        self.get(name)
+        del self._load()[name]
+        self._save()
+
+
+class QueryEngine:
+    """Evaluates filters against an ``ItemIndex``, caching results per plan.
+    
+    A cached result records the index generation it was computed at. After
+    a rebuild only the items the index reports as changed are re-checked;
+    if that is unknown (e.g. after a library switch) the plan runs again.
+    """
+    
+    def __init__(self, item_index: ItemIndex, cache_size: int = 64):
+        self.item_index = item_index
+        self._results = ResponseCache(cache_size)
+    
+    def evaluate(self, plan: QueryPlan) -> Set[str]:
+        """Return the IDs of the items matching ``plan`` (callers must not modify the set)."""
+        index = self.item_index
+        with tracing.span("query.evaluate") as span:
+            cached = self._results.get(plan.key)
+            if cached is not None and cached[0] == index.library_path:
+                _, generation, ids = cached
+                changed = index.changed_since(generation)
+                if changed is not None:
+                    span.set_attribute("query.cache", "hit" if not changed else "patched")
+                    if changed:
+                        ids = set(ids)
+                        for item_id in changed:
+                            item = index.get(item_id)
+                            if item is not None and plan.matches(item):
+                                ids.add(item_id)
+                            else:
+                                ids.discard(item_id)
+                        self._results.put(plan.key, (index.library_path, index.generation, ids))
+                    return ids
+            span.set_attribute("query.cache", "miss")
+            ids = plan.execute(index)
+            self._results.put(plan.key, (index.library_path, index.generation, ids))
+            span.set_attribute("query.matches", len(ids))
+            return ids
+    
+    def get_stats(self) -> Dict[str, Any]:
+        return self._results.get_stats()
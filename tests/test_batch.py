@@ -0,0 +1,70 @@
+"""Test batch_execute end to end against the Eagle API simulator."""
+
+import json
+
+import httpx
+import pytest
+from mcp.types import CallToolRequest, CallToolRequestParams, TextContent
+
+from benchmarks.eagle_simulator import EagleSimulator, SyntheticLibrary
+from eagle_client import EagleClient
+from handlers.base import ErrorTextContent
+from main import EagleMCPServer
+
+
+async def batch(server, calls, **arguments):
+    handler = server.server.request_handlers[CallToolRequest]
+    params = CallToolRequestParams(name="batch_execute", arguments={"calls": calls, **arguments})
+    result = await handler(CallToolRequest(method="tools/call", params=params))
+    return result.root.content
+
+
+@pytest.mark.asyncio
+async def test_batch_with_references(tmp_path):
+    """Test that referencing steps wait for their sources and failures skip dependents."""
+    simulator = EagleSimulator(SyntheticLibrary(items=30, folder_depth=1, folder_breadth=2, root=tmp_path))
+    server = EagleMCPServer()
+    server.eagle_client = EagleClient("http://eagle-simulator", transport=httpx.ASGITransport(simulator.app))
+    
+    content = await batch(server, [
+        {"id": "search", "tool": "item_search", "arguments": {"keyword": "_", "limit": 3}},
+        {"tool": "item_info", "arguments": {"item_id": {"$ref": "search", "path": "items.0.id"}, "format": "json"}},
+        {"tool": "thumbnail_get_base64", "arguments": {"item_id": {"$ref": "search", "path": "items.1.id"}}},
+        {"tool": "folder_list", "arguments": {"format": "json"}},
+        {"id": "missing", "tool": "item_info", "arguments": {"item_id": "nope"}},
+        {"tool": "item_info", "arguments": {"item_id": {"$ref": "missing", "path": "id"}}},
+    ], format="json")
+    data = json.loads(content[0].text)
+    assert (data["ok"], data["error"], data["skipped"]) == (4, 1, 1)
+    search, info, thumbnail = data["results"][:3]
+    assert search["status"] == "ok" and search["content"][0]["count"] == 3
+    # The search was run in JSON (it's referenced) and fed the dependent steps
+    assert info["content"][0]["id"] == search["content"][0]["items"][0]["id"]
+    assert search["content"][0]["items"][1]["id"] in thumbnail["content"][0]
+    assert data["results"][5] == {"id": "5", "tool": "item_info", "status": "skipped",
+                                  "error": "Step 'missing' failed", "content": []}
+    
+    # Arguments are checked against the tool's schema, as for direct calls
+    content = await batch(server, [
+        {"tool": "item_query", "arguments": {"filters": {"tags": "風景"}}},
+        {"id": "search", "tool": "item_search", "arguments": {"keyword": "_", "limit": 1, "format": "json"}},
+        {"tool": "item_info", "arguments": {"item_id": {"$ref": "search", "path": "count"}}},
+    ], format="json")
+    data = json.loads(content[0].text)
+    assert [r["status"] for r in data["results"]] == ["error", "ok", "error"]
+    assert data["results"][0]["error"].startswith("Input validation error: '風景' is not of type 'array'")
+    assert data["results"][2]["error"] == "Input validation error: 1 is not of type 'string'"
+    
+    content = await batch(server, [{"tool": "health_check"}, {"tool": "library_info"}])
+    assert [type(part) for part in content] == [TextContent]
+    assert content[0].text.startswith("Batch: 2 ok, 0 failed, 0 skipped")
+    assert "### [1] library_info (ok" in content[0].text
+    
+    for calls, message in (
+        ([{"tool": "batch_execute", "arguments": {"calls": []}}], "can't be nested"),
+        ([{"tool": "item_info", "arguments": {"item_id": {"$ref": "later"}}}, {"id": "later", "tool": "folder_list"}],
+         "unknown or later step(s) later"),
+        ([{"tool": "no_such_tool"}], "unknown tool"),
+    ):
+        content = await batch(server, calls)
+        assert isinstance(content[0], ErrorTextContent) and message in content[0].text
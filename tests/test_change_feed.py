@@ -0,0 +1,84 @@
+"""Test the library change feed."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from benchmarks.eagle_simulator import EagleSimulator, SyntheticLibrary
+from eagle_client import EagleClient
+from handlers.library import LibraryHandler
+from services.change_feed import ChangeFeed
+from services.item_index import ItemIndex
+
+
+@pytest.mark.asyncio
+async def test_changes_since_token(tmp_path):
+    """Test that item and folder changes are classified, merged and published."""
+    simulator = EagleSimulator(SyntheticLibrary(items=20, folder_depth=1, folder_breadth=2, root=tmp_path))
+    library = simulator.library
+    feed = ChangeFeed(ItemIndex(page_size=8))
+    events = []
+    
+    async def listener(event):
+        events.append(event)
+    
+    feed.add_listener(listener)
+    handler = LibraryHandler(feed.item_index, change_feed=feed)
+    client = EagleClient("http://eagle-simulator", transport=httpx.ASGITransport(simulator.app))
+    
+    async with client:
+        result = await handler.handle_call("library_changes_since", {"format": "json"}, client)
+        start = json.loads(result[0].text)["token"]
+        assert await feed.poll(client) is None
+        
+        first, second, third = sorted(library.items)[:3]
+        await client.post("/api/item/update", {"id": first, "tags": ["変更"]})
+        await client.post("/api/item/moveToTrash", {"itemIds": [second]})
+        folder = await client.post("/api/folder/create", {"folderName": "新規"})
+        event = await feed.poll(client)
+        assert (event.items_updated, event.items_removed) == ([first], [second])
+        assert event.folders_added == [folder["data"]["id"]]
+        middle = feed.token
+        
+        # An item added and then removed again nets out
+        added = library._make_item([])
+        library.items[added["id"]] = added
+        library.touch()
+        await feed.poll(client)
+        await client.post("/api/item/update", {"id": third, "star": 5})
+        await client.post("/api/item/moveToTrash", {"itemIds": [added["id"]]})
+        await feed.poll(client)
+        assert len(events) == 3
+        
+        result = await handler.handle_call("library_changes_since", {"token": start, "format": "json"}, client)
+        changes = json.loads(result[0].text)
+        assert changes["reset"] is False
+        assert changes["items"] == {"added": [], "updated": sorted([first, third]), "removed": [second]}
+        assert changes["folders"]["added"] == [folder["data"]["id"]]
+        assert feed.changes_since(middle)["items"] == {"added": [], "updated": [third], "removed": []}
+        
+        result = await handler.handle_call("library_changes_since", {"token": changes["token"]}, client)
+        assert result[0].text.startswith("No changes")
+        assert feed.changes_since("0.0")["reset"] is True
+
+
+@pytest.mark.asyncio
+async def test_polling_waits_for_interest(tmp_path):
+    """Test that the background loop doesn't scan the library until activated."""
+    simulator = EagleSimulator(SyntheticLibrary(items=5, folder_depth=1, folder_breadth=1, root=tmp_path))
+    feed = ChangeFeed(ItemIndex(), interval=0.01)
+    client = EagleClient("http://eagle-simulator", transport=httpx.ASGITransport(simulator.app))
+    
+    async with client:
+        task = asyncio.create_task(feed.run(client))
+        await asyncio.sleep(0.05)
+        assert not simulator.requests["/api/item/list"] and not feed.active
+        
+        await LibraryHandler(feed.item_index, change_feed=feed).handle_call("library_changes_since", {}, client)
+        assert feed.active
+        polls = simulator.requests["/api/library/info"]
+        await asyncio.sleep(0.05)
+        assert simulator.requests["/api/library/info"] > polls
+        task.cancel()
@@ -0,0 +1,57 @@
+"""Test adaptive concurrency limiter."""
+
+import asyncio
+
+import pytest
+from utils.concurrency import AdaptiveLimiter, Priority
+
+
+@pytest.mark.asyncio
+async def test_limiter_bounds_in_flight_requests():
+    """Test that no more than the limit run at once."""
+    limiter = AdaptiveLimiter("test", max_limit=2, latency_target=10.0)
+    peak = 0
+
+    async def worker():
+        nonlocal peak
+        async with limiter.slot():
+            peak = max(peak, limiter.in_flight)
+            await asyncio.sleep(0.01)
+
+    await asyncio.gather(*(worker() for _ in range(6)))
+    assert peak == 2
+    assert limiter.in_flight == 0
+    assert limiter.get_stats()["max_queue_depth"] == 4
+
+
+@pytest.mark.asyncio
+async def test_limiter_admits_interactive_before_bulk():
+    """Test that queued interactive requests overtake queued bulk requests."""
+    limiter = AdaptiveLimiter("test", max_limit=1, latency_target=10.0)
+    order = []
+
+    async def worker(label, priority):
+        async with limiter.slot(priority):
+            order.append(label)
+
+    await limiter.acquire()
+    tasks = [asyncio.create_task(worker("bulk", Priority.BULK))]
+    await asyncio.sleep(0)
+    tasks.append(asyncio.create_task(worker("interactive", Priority.INTERACTIVE)))
+    await asyncio.sleep(0)
+    limiter.release(0.0)
+    await asyncio.gather(*tasks)
+    assert order == ["interactive", "bulk"]
+
+
+def test_limiter_aimd_adjustment():
+    """Test multiplicative decrease on errors and additive recovery."""
+    limiter = AdaptiveLimiter("test", max_limit=8, latency_target=1.0, decrease_cooldown=0.0)
+    limiter._in_flight = 1
+    limiter.release(0.1, error=True)
+    assert limiter.limit == 4
+
+    for _ in range(40):
+        limiter._in_flight = 1
+        limiter.release(0.1)
+    assert limiter.limit == 8
@@ -1,8 +1,12 @@
 """Test Eagle API client."""
 
+import asyncio
+import json
+
+import httpx
 import pytest
 from unittest.mock import AsyncMock, patch, MagicMock
-from eagle_client import EagleClient, EagleAPIError
+from eagle_client import EagleClient, EagleUnavailableError
 
 
 @pytest.mark.asyncio
@@ -14,7 +18,7 @@ async def test_eagle_client_health_check():
         
         # Mock successful response
         mock_response = MagicMock()
-        mock_response.json.return_value = {"status": "success"}
+        mock_response.content = json.dumps({"status": "success"}).encode()
         mock_response.raise_for_status = MagicMock()
         mock_instance.get.return_value = mock_response
         
@@ -23,6 +27,29 @@ async def test_eagle_client_health_check():
             assert result is True
 
 
+@pytest.mark.asyncio
+async def test_eagle_client_health_check_ignores_caches():
+    """Test that health_check reports Eagle down even with a stale response cached."""
+    with patch('httpx.AsyncClient') as mock_client, patch('eagle_client.EAGLE_API_MAX_RETRIES', 0):
+        mock_instance = AsyncMock()
+        mock_client.return_value = mock_instance
+        
+        mock_response = MagicMock()
+        mock_response.content = json.dumps({"status": "success"}).encode()
+        mock_response.raise_for_status = MagicMock()
+        mock_instance.get.return_value = mock_response
+        
+        async with EagleClient() as client:
+            client.circuit_breaker.failure_threshold = 1
+            assert (await client.get("/api/application/info"))["status"] == "success"
+            
+            mock_instance.get.side_effect = httpx.ConnectError("refused")
+            assert await client.health_check() is False
+            assert (await client.get("/api/application/info"))["status"] == "success"
+            assert client.circuit_breaker.state == "open"
+            assert await client.health_check() is False
+
+
 @pytest.mark.asyncio
 async def test_eagle_client_get_success():
     """Test successful GET request."""
@@ -32,10 +59,106 @@ async def test_eagle_client_get_success():
         
         # Mock successful response
         mock_response = MagicMock()
-        mock_response.json.return_value = {"status": "success", "data": []}
+        mock_response.content = json.dumps({"status": "success", "data": []}).encode()
         mock_response.raise_for_status = MagicMock()
         mock_instance.get.return_value = mock_response
         
         async with EagleClient() as client:
             result = await client.get("/api/test")
-            assert result["status"] == "success"
\ No newline at end of file
+            assert result["status"] == "success"
+
+@pytest.mark.asyncio
+async def test_eagle_client_retries_transient_get_failure():
+    """Test that a failed GET is retried before succeeding."""
+    with patch('httpx.AsyncClient') as mock_client, patch('eagle_client.EAGLE_API_RETRY_BACKOFF', 0):
+        mock_instance = AsyncMock()
+        mock_client.return_value = mock_instance
+        
+        mock_response = MagicMock()
+        mock_response.content = json.dumps({"status": "success", "data": []}).encode()
+        mock_response.raise_for_status = MagicMock()
+        mock_instance.get.side_effect = [httpx.ConnectError("refused"), mock_response]
+        
+        async with EagleClient() as client:
+            result = await client.get("/api/test")
+            assert result["status"] == "success"
+            assert client.get_stats()["retries"] == 1
+
+
+@pytest.mark.asyncio
+async def test_eagle_client_circuit_open_serves_stale():
+    """Test that an open circuit fast-fails and falls back to stale data."""
+    with patch('httpx.AsyncClient') as mock_client, patch('eagle_client.EAGLE_API_MAX_RETRIES', 0):
+        mock_instance = AsyncMock()
+        mock_client.return_value = mock_instance
+        
+        mock_response = MagicMock()
+        mock_response.content = json.dumps({"status": "success", "data": ["cached"]}).encode()
+        mock_response.raise_for_status = MagicMock()
+        mock_instance.get.return_value = mock_response
+        
+        async with EagleClient() as client:
+            client.circuit_breaker.failure_threshold = 1
+            await client.get("/api/folder/list")
+            
+            mock_instance.get.side_effect = httpx.ConnectError("refused")
+            result = await client.get("/api/folder/list")
+            assert result["data"] == ["cached"]
+            assert client.circuit_breaker.state == "open"
+            
+            calls = mock_instance.get.call_count
+            with pytest.raises(EagleUnavailableError):
+                await client.get("/api/item/info", {"id": "abc"})
+            assert mock_instance.get.call_count == calls
+
+
+@pytest.mark.asyncio
+async def test_eagle_client_coalesces_identical_gets():
+    """Test that concurrent identical GETs share one HTTP request."""
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_instance = AsyncMock()
+        mock_client.return_value = mock_instance
+        
+        mock_response = MagicMock()
+        mock_response.content = json.dumps({"status": "success", "data": []}).encode()
+        mock_response.raise_for_status = MagicMock()
+        
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return mock_response
+        mock_instance.get.side_effect = slow_get
+        
+        async with EagleClient() as client:
+            results = await asyncio.gather(*(client.get("/api/folder/list") for _ in range(5)))
+            assert all(r["status"] == "success" for r in results)
+            assert mock_instance.get.call_count == 1
+            assert client.get_stats()["coalesced"] == 4
+
+
+@pytest.mark.asyncio
+async def test_eagle_client_invalidate_caches_detaches_in_flight_gets():
+    """Test that GETs after invalidation don't join or cache pre-invalidation requests."""
+    with patch('httpx.AsyncClient') as mock_client:
+        mock_instance = AsyncMock()
+        mock_client.return_value = mock_instance
+        
+        mock_response = MagicMock()
+        mock_response.content = json.dumps({"status": "success", "data": []}).encode()
+        mock_response.raise_for_status = MagicMock()
+        
+        async def slow_get(*args, **kwargs):
+            await asyncio.sleep(0.01)
+            return mock_response
+        mock_instance.get.side_effect = slow_get
+        
+        async with EagleClient() as client:
+            first = asyncio.ensure_future(client.get("/api/folder/list"))
+            await asyncio.sleep(0)
+            client.invalidate_caches()
+            second = asyncio.ensure_future(client.get("/api/folder/list"))
+            await asyncio.gather(first, second)
+            assert mock_instance.get.call_count == 2
+            assert client.get_stats()["coalesced"] == 0
+            # Only the post-invalidation response is kept
+            assert len(client.stale_cache) == 1
+            assert client.get_stats()["in_flight_gets"] == 0
@@ -0,0 +1,40 @@
+"""Test the file I/O thread pool."""
+
+import asyncio
+import base64
+
+import pytest
+from utils.file_io import FileIO
+
+
+@pytest.mark.asyncio
+async def test_read_base64_in_chunks(tmp_path):
+    """Test that chunked reads encode to the same Base64 as a single read."""
+    path = tmp_path / "画像.png"
+    data = bytes(range(256)) * 41
+    path.write_bytes(data)
+    file_io = FileIO(max_workers=2, chunk_size=100)
+    try:
+        assert file_io.chunk_size == 99
+        assert await file_io.read_base64(str(path)) == base64.b64encode(data).decode("ascii")
+        assert await file_io.read_bytes(str(path)) == data
+        assert await file_io.exists(str(path))
+        assert not await file_io.exists(str(tmp_path / "missing.png"))
+    finally:
+        file_io.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_small_calls_interleave_with_large_read(tmp_path):
+    """Test that a small call isn't queued behind a whole large read, even with one worker."""
+    large = tmp_path / "large.bin"
+    large.write_bytes(b"x" * 3000)
+    file_io = FileIO(max_workers=1, chunk_size=30)
+    try:
+        read = asyncio.ensure_future(file_io.read_base64(str(large)))
+        await asyncio.sleep(0)
+        assert await file_io.exists(str(large))
+        assert not read.done()
+        assert len(await read) == 4000
+    finally:
+        file_io.shutdown()
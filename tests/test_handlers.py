@@ -0,0 +1,86 @@
+"""Test shared handler infrastructure."""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock
+from handlers.base import OutputBudget, ResponseBuilder
+from handlers.folder import FolderHandler
+from schemas.base import FolderInfo, FolderListResponse
+
+
+def test_response_builder_joins_chunks():
+    """Test that chunks and lines are joined in order."""
+    builder = ResponseBuilder()
+    builder.add("a", "b").line("c")
+    assert builder.build() == "abc\n"
+    assert not builder.truncated
+
+
+def test_response_builder_truncates_at_cap():
+    """Test that chunks past the cap are dropped with a marker."""
+    builder = ResponseBuilder(max_chars=10)
+    for _ in range(5):
+        builder.line("12345")
+    text = builder.build()
+    assert text.startswith("12345\n")
+    assert "[truncated: 24 more characters omitted]" in text
+
+
+@pytest.mark.asyncio
+async def test_folder_list_json_format():
+    """Test structured JSON output mode."""
+    client = AsyncMock()
+    client.get.return_value = FolderListResponse(
+        status="success", data=[FolderInfo(id="F1", name="写真")]
+    )
+    result = await FolderHandler().handle_call("folder_list", {"format": "json"}, client)
+    assert json.loads(result[0].text) == {"count": 1, "folders": [{"id": "F1", "name": "写真"}]}
+
+
+@pytest.mark.asyncio
+async def test_output_budget_pages_and_summarises():
+    """Test per-call item budgets, summaries of truncated listings and continuation cursors."""
+    client = AsyncMock()
+    client.get.return_value = FolderListResponse(status="success", data=[
+        FolderInfo(id=f"F{i}", name=f"素材{i}", tags=["共有"] if i % 2 else [],
+                   children=[FolderInfo(id=f"C{i}")] if i == 0 else [])
+        for i in range(5)
+    ])
+    handler = FolderHandler()
+    
+    result = await handler.handle_call("folder_list", {"format": "json", "max_items": 2}, client)
+    data = json.loads(result[0].text)
+    assert [folder["id"] for folder in data["folders"]] == ["F0", "F1"]
+    assert data["summary"] == {
+        "total": 5,
+        "with_subfolders": [{"key": "no", "count": 4}, {"key": "yes", "count": 1}],
+        "tags": [{"key": "共有", "count": 2}],
+    }
+    
+    result = await handler.handle_call("folder_search", {"keyword": "素材", "max_items": 2, "cursor": data["next_cursor"]},
+                                       client)
+    assert "different query" in result[0].text
+    
+    result = await handler.handle_call("folder_list", {"max_items": 2, "cursor": data["next_cursor"]}, client)
+    text = result[0].text
+    assert "素材2" in text and "素材3" in text and "素材1" not in text
+    assert "Showing 3-4 of 5 folders" in text and "Top tags: 共有 (2)" in text
+    cursor = text.rsplit('cursor="', 1)[1].split('"')[0]
+    
+    result = await handler.handle_call("folder_list", {"format": "json", "max_items": 2, "cursor": cursor}, client)
+    data = json.loads(result[0].text)
+    assert [folder["id"] for folder in data["folders"]] == ["F4"]
+    assert data["next_cursor"] is None and data["offset"] == 4
+
+
+def test_cursor_fingerprint_ignores_argument_order():
+    """Test that a cursor stays valid when the same arguments arrive in another order."""
+    issued = OutputBudget.for_call("item_query", {"filters": {"ext": "png", "tags": ["空"]}, "limit": 5})
+    cursor = issued.cursor_for(5)
+    reordered = OutputBudget.for_call("item_query", {"cursor": cursor, "limit": 5,
+                                                     "filters": {"tags": ["空"], "ext": "png"}})
+    assert reordered.offset() == 5
+    changed = OutputBudget.for_call("item_query", {"cursor": cursor, "limit": 5, "filters": {"ext": "png"}})
+    with pytest.raises(ValueError, match="different query"):
+        changed.offset()
@@ -0,0 +1,67 @@
+"""Test the network transports in process."""
+
+import json
+
+import httpx
+import pytest
+
+from http_transport import create_http_app
+from main import EagleMCPServer
+
+HEADERS = {"Accept": "application/json, text/event-stream", "Content-Type": "application/json"}
+
+
+def _messages(response: httpx.Response):
+    """JSON-RPC messages of a response sent as JSON or as an SSE stream."""
+    if response.headers["content-type"].startswith("application/json"):
+        return [response.json()]
+    return [json.loads(line[len("data:"):]) for line in response.text.splitlines() if line.startswith("data:")]
+
+
+async def _initialize(client: httpx.AsyncClient) -> str:
+    """Open a session and return its ID."""
+    response = await client.post("/mcp", headers=HEADERS, json={
+        "jsonrpc": "2.0", "id": 1, "method": "initialize",
+        "params": {"protocolVersion": "2025-03-26", "capabilities": {},
+                   "clientInfo": {"name": "test", "version": "1.0"}},
+    })
+    assert response.status_code == 200
+    assert _messages(response)[0]["result"]["serverInfo"]["name"]
+    session_id = response.headers["mcp-session-id"]
+    response = await client.post("/mcp", headers={**HEADERS, "mcp-session-id": session_id},
+                                 json={"jsonrpc": "2.0", "method": "notifications/initialized"})
+    assert response.status_code == 202
+    return session_id
+
+
+@pytest.mark.asyncio
+async def test_streamable_http_sessions():
+    """Test initialize and tools/list over /mcp, with one session per client."""
+    server = EagleMCPServer()
+    app = create_http_app(server, "streamable-http")
+    transport = httpx.ASGITransport(app)
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await _initialize(client)
+            second = await _initialize(client)
+            assert first != second
+
+            response = await client.post("/mcp", headers={**HEADERS, "mcp-session-id": first},
+                                         json={"jsonrpc": "2.0", "id": 2, "method": "tools/list"})
+            tools = [tool["name"] for tool in _messages(response)[0]["result"]["tools"]]
+            assert len(tools) == len(server.registry) and "item_search" in tools
+
+            response = await client.post("/mcp", headers={**HEADERS, "mcp-session-id": "unknown"},
+                                         json={"jsonrpc": "2.0", "id": 3, "method": "tools/list"})
+            assert response.status_code == 404
+
+            response = await client.get("/metrics")
+            assert response.status_code == 200
+
+
+def test_sse_routes_and_unknown_transport():
+    """Test the SSE app's routes and that unknown transports are rejected."""
+    app = create_http_app(EagleMCPServer(), "sse")
+    assert [route.path for route in app.routes] == ["/mcp/sse", "/mcp/messages", "/metrics"]
+    with pytest.raises(ValueError, match="Unsupported MCP transport"):
+        create_http_app(EagleMCPServer(), "websocket")
@@ -0,0 +1,134 @@
+"""Test image region extraction."""
+
+import base64
+import io
+import struct
+
+import pytest
+from unittest.mock import AsyncMock
+from mcp.types import ImageContent
+
+Image = pytest.importorskip("PIL.Image")
+
+from handlers.image import ImageHandler
+from utils import imaging
+from utils.imaging import RegionError, extract_region
+
+
+def write_tiled_tiff(path, img, tile=64):
+    """Write ``img`` as a minimal uncompressed, tiled RGB TIFF."""
+    width, height = img.size
+    tiles = []
+    for top in range(0, height, tile):
+        for left in range(0, width, tile):
+            block = Image.new("RGB", (tile, tile))
+            block.paste(img.crop((left, top, min(width, left + tile), min(height, top + tile))))
+            tiles.append(block.tobytes())
+    count = len(tiles)
+    ifd_size = 2 + 11 * 12 + 4
+    offsets_at = 8 + ifd_size + 6
+    data_at = offsets_at + 8 * count
+    
+    def entry(tag, type_, n, value):
+        if type_ == 3 and n == 1:
+            return struct.pack("<HHIHH", tag, type_, n, value, 0)
+        return struct.pack("<HHII", tag, type_, n, value)
+    
+    ifd = struct.pack("<H", 11) + b"".join([
+        entry(256, 4, 1, width), entry(257, 4, 1, height), entry(258, 3, 3, 8 + ifd_size),
+        entry(259, 3, 1, 1), entry(262, 3, 1, 2), entry(277, 3, 1, 3), entry(284, 3, 1, 1),
+        entry(322, 3, 1, tile), entry(323, 3, 1, tile),
+        entry(324, 4, count, offsets_at), entry(325, 4, count, offsets_at + 4 * count),
+    ]) + struct.pack("<I", 0)
+    with open(path, "wb") as f:
+        f.write(b"II*\x00" + struct.pack("<I", 8) + ifd + struct.pack("<3H", 8, 8, 8))
+        f.write(struct.pack(f"<{count}I", *(data_at + i * len(tiles[0]) for i in range(count))))
+        f.write(struct.pack(f"<{count}I", *(len(t) for t in tiles)))
+        for t in tiles:
+            f.write(t)
+
+
+def decode(region):
+    return Image.open(io.BytesIO(base64.b64decode(region["data"])))
+
+
+@pytest.fixture
+def gradient():
+    return Image.radial_gradient("L").resize((500, 300)).convert("RGB")
+
+
+def test_extract_region_decodes_only_needed_tiles_and_rows(tmp_path, gradient):
+    """Test lazy decoding of tiled TIFFs and raw rows, with exact pixels."""
+    expected = gradient.crop((100, 70, 150, 110)).tobytes()
+    
+    write_tiled_tiff(tmp_path / "tiled.tif", gradient)
+    region = extract_region(str(tmp_path / "tiled.tif"), 100, 70, 50, 40)
+    assert region["decoded"] == "2/40 tiles"
+    assert decode(region).tobytes() == expected
+    
+    gradient.save(tmp_path / "plain.tif")
+    region = extract_region(str(tmp_path / "plain.tif"), 100, 70, 50, 40)
+    assert region["decoded"] == "rows 70-110"
+    assert decode(region).tobytes() == expected
+    assert region["source_size"] == [500, 300]
+
+
+def test_extract_region_scales_and_validates(tmp_path, gradient):
+    """Test JPEG draft decoding, downscaling, clipping and limits."""
+    gradient.save(tmp_path / "scan.jpg")
+    region = extract_region(str(tmp_path / "scan.jpg"), 0, 0, 400, 200, scale=0.25, output_format="jpeg")
+    assert region["decoded"] == "draft 1/4"
+    assert (region["width"], region["height"]) == (100, 50)
+    assert region["mime_type"] == "image/jpeg"
+    
+    # Clipped to the image
+    region = extract_region(str(tmp_path / "scan.jpg"), 450, 250, 100, 100)
+    assert decode(region).size == (50, 50)
+    
+    with pytest.raises(RegionError):
+        extract_region(str(tmp_path / "scan.jpg"), 600, 0, 10, 10)
+    with pytest.raises(RegionError):
+        extract_region(str(tmp_path / "scan.jpg"), 0, 0, 400, 200, max_pixels=1000)
+
+
+def test_worker_replaces_pillow_pixel_limit(tmp_path, gradient, monkeypatch):
+    """Test that workers lift Pillow's bomb guard and the source limit applies instead."""
+    gradient.save(tmp_path / "scan.png")
+    monkeypatch.setattr(Image, "MAX_IMAGE_PIXELS", 1000)
+    with pytest.raises(Image.DecompressionBombError):
+        extract_region(str(tmp_path / "scan.png"), 0, 0, 10, 10)
+    
+    imaging._init_worker()
+    assert extract_region(str(tmp_path / "scan.png"), 0, 0, 10, 10)["source_size"] == [500, 300]
+    with pytest.raises(RegionError, match="exceeds 1000 pixels"):
+        extract_region(str(tmp_path / "scan.png"), 0, 0, 10, 10, max_source_pixels=1000)
+
+
+@pytest.mark.asyncio
+async def test_image_get_region_tool_caches_per_item_mtime(tmp_path, gradient):
+    """Test the tool response and that repeated regions are served from the cache."""
+    gradient.save(tmp_path / "scan.png")
+    client = AsyncMock()
+    
+    async def get(endpoint, params=None, **kwargs):
+        if endpoint == "/api/item/info":
+            return {"status": "success", "data": {"id": "I1", "name": "スキャン", "ext": "png", "modificationTime": 1}}
+        return {"status": "success", "data": str(tmp_path / "scan_thumbnail.png")}
+    client.get.side_effect = get
+    
+    handler = ImageHandler()
+    args = {"item_id": "I1", "x": 10, "y": 20, "width": 30, "height": 40}
+    try:
+        result = await handler.handle_call("image_get_region", args, client)
+        assert "Output: 30x40 image/png" in result[0].text
+        assert isinstance(result[1], ImageContent)
+        assert decode({"data": result[1].data}).tobytes() == gradient.crop((10, 20, 40, 60)).tobytes()
+        
+        await handler.handle_call("image_get_region", args, client)
+        assert handler._region_cache.get_stats()["hits"] == 1
+        
+        result = await handler.handle_call("image_get_region", {**args, "scale": "half"}, client)
+        assert "could not convert string to float" in result[0].text
+    finally:
+        handler.shutdown()
+    assert handler._region_extractor._executor is None and handler.file_io._executor is None
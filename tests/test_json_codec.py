@@ -0,0 +1,99 @@
+"""Test JSON codec and typed response structs."""
+
+import json
+
+import httpx
+import pytest
+
+from eagle_client import EagleClient
+from handlers.folder import FolderHandler
+from handlers.item import ItemHandler
+from schemas.base import FolderListResponse, ItemInfo, ItemListResponse
+from services.item_index import ItemIndex
+from utils import json_codec
+
+
+def test_loads_and_dumps_round_trip_japanese():
+    """Test that non-ASCII text survives encoding and decoding."""
+    data = {"status": "success", "data": [{"name": "風景写真"}]}
+    encoded = json_codec.dumps(data)
+    assert "風景写真" in encoded
+    assert json_codec.loads(encoded.encode("utf-8")) == data
+
+
+def test_decode_as_item_list_keeps_declared_fields_only():
+    """Test typed decoding of an item list response."""
+    raw = json.dumps({
+        "status": "success",
+        "data": [{"id": "A1", "name": "猫", "ext": "png", "size": 10, "tags": ["animal"],
+                  "palettes": [{"color": [1, 2, 3]}]}],
+    }).encode("utf-8")
+    result = json_codec.decode_as(raw, ItemListResponse)
+    assert result.get("status") == "success"
+    item = result.data[0]
+    assert isinstance(item, ItemInfo)
+    assert (item.id, item.name, item.ext, item.tags) == ("A1", "猫", "png", ["animal"])
+    assert not hasattr(item, "palettes")
+    assert item.get("width", "n/a") == "n/a"
+
+
+def test_decode_as_folder_list_nested_children():
+    """Test typed decoding of nested folders."""
+    raw = json.dumps({
+        "status": "success",
+        "data": [{"id": "F1", "name": "親", "children": [{"id": "F2", "name": "子"}]}],
+    }).encode("utf-8")
+    result = json_codec.decode_as(raw, FolderListResponse)
+    assert result.data[0].children[0].name == "子"
+
+
+@pytest.fixture(params=["msgspec", "fallback"])
+def backend(request, monkeypatch):
+    """Run a test with msgspec typed decoding and with the from_dict fallback."""
+    if request.param == "msgspec":
+        pytest.importorskip("msgspec")
+    else:
+        monkeypatch.setattr(json_codec, "msgspec", None)
+    return request.param
+
+
+def test_decode_as_error_envelope_and_null_fields(backend):
+    """Test that error envelopes and null lists decode instead of raising."""
+    raw = json.dumps({"status": "error", "data": "Library not found"}).encode("utf-8")
+    for model in (ItemListResponse, FolderListResponse):
+        result = json_codec.decode_as(raw, model)
+        assert (result.get("status"), result.data) == ("error", [])
+    
+    raw = json.dumps({
+        "status": "success",
+        "data": [{"id": "A1", "name": None, "tags": None, "folders": None}],
+    }).encode("utf-8")
+    item = json_codec.decode_as(raw, ItemListResponse).data[0]
+    assert (item.id, item.name, item.tags, item.folders) == ("A1", "", [], [])
+    
+    raw = json.dumps({
+        "status": "success",
+        "data": [{"id": "F1", "children": None, "tags": None, "dateCreated": 1700000000000}],
+    }).encode("utf-8")
+    folder = json_codec.decode_as(raw, FolderListResponse).data[0]
+    assert (folder.children, folder.tags) == ([], [])
+    assert (folder.get("dateCreated"), folder.get("dateModified")) == (1700000000000, None)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("typed", [True, False])
+async def test_error_envelope_reaches_handlers(typed, monkeypatch):
+    """Test that tools report Eagle's error envelope instead of an unexpected error."""
+    monkeypatch.setattr(json_codec, "TYPED_DECODING", typed)
+    
+    def respond(request):
+        return httpx.Response(200, json={"status": "error", "data": "Library is being switched"})
+    
+    client = EagleClient("http://eagle", transport=httpx.MockTransport(respond))
+    async with client:
+        result = await ItemHandler().handle_call("item_search", {"keyword": "猫"}, client)
+        assert result[0].text == "Failed to search items"
+        result = await FolderHandler().handle_call("folder_list", {}, client)
+        assert result[0].text == "Failed to get folder list"
+        with pytest.raises(RuntimeError, match="Failed to list items"):
+            await ItemIndex().refresh(client)
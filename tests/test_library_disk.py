@@ -0,0 +1,28 @@
+"""Test reading an Eagle library from disk."""
+
+from benchmarks.make_library import modify_items, write_library
+from benchmarks.library_disk import LibraryDisk
+
+
+def test_scan_refresh_and_paths(tmp_path):
+    """Test full scan, incremental refresh and path resolution on a generated library."""
+    path = write_library(tmp_path, items=40, folder_depth=2, folder_breadth=2)
+    assert path.name == "benchmark.library"
+    assert (path / "tags.json").exists()
+    
+    library = LibraryDisk(str(path))
+    assert library.scan() == 40
+    item = next(iter(library))
+    assert library.original_path(item).read_bytes().startswith(b"\x89PNG")
+    assert library.thumbnail_path(item).exists()
+    assert all(library.thumbnail_path(item).exists() for item in library)
+    
+    modified = modify_items(path, 3, seed=1)
+    assert library.refresh() == (3, 0)
+    assert all("更新済み" in library.get(item_id).tags for item_id in modified)
+    assert library.refresh() == (0, 0)
+    
+    # Items no longer listed in mtime.json are dropped
+    (path / "mtime.json").write_text('{"all": 0}', encoding="utf-8")
+    assert library.refresh() == (0, 40)
+    assert len(library) == 0
@@ -0,0 +1,96 @@
+"""Test the item index and library statistics."""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock
+from handlers.library import LibraryHandler
+from schemas.base import FolderInfo, FolderListResponse, ItemInfo, ItemListResponse
+from services.item_index import ItemIndex
+from services.library_stats import compute_library_stats
+
+ITEMS = [
+    ItemInfo(id="A", name="風景", size=500, ext="JPG", tags=["sky"], folders=["F1"], width=4000, height=3000, star=5),
+    ItemInfo(id="B", name="icon", size=10, ext="png", folders=["F1", "F2"], width=64, height=64, annotation="logo"),
+    ItemInfo(id="C", name="clip", size=9000, ext="mp4"),
+    ItemInfo(id="D", name="sketch", size=200, ext="png", tags=["draft"], folders=["F2"], width=1200, height=800, star=3),
+    ItemInfo(id="E", name="scan", size=700, ext="jpg", folders=["F1"], width=9000, height=12000),
+]
+
+
+def make_client(version: int = 1):
+    """Fake Eagle client serving ITEMS in pages."""
+    client = AsyncMock()
+    state = {"version": version}
+    
+    async def get(endpoint, params=None, priority=None, model=None):
+        if endpoint == "/api/library/info":
+            return {"status": "success", "data": {"modificationTime": state["version"]}}
+        if endpoint == "/api/folder/list":
+            return FolderListResponse(status="success", data=[
+                FolderInfo(id="F1", name="写真", children=[FolderInfo(id="F2", name="素材")])
+            ])
+        start = params["offset"] * params["limit"]
+        return ItemListResponse(status="success", data=ITEMS[start:start + params["limit"]])
+    
+    client.get.side_effect = get
+    return client, state
+
+
+def list_calls(client) -> int:
+    return sum(1 for call in client.get.call_args_list if call.args[0] == "/api/item/list")
+
+
+def test_compute_library_stats():
+    """Test totals, distributions, histograms and largest items in one pass."""
+    stats = compute_library_stats(ITEMS, top_n=2)
+    assert stats["total_items"] == 5
+    assert stats["total_bytes"] == 10410
+    assert stats["by_extension"][0] == {"key": "mp4", "count": 1, "bytes": 9000}
+    assert {"key": "jpg", "count": 2, "bytes": 1200} in stats["by_extension"]
+    folders = {entry["key"]: entry for entry in stats["by_folder"]}
+    assert folders["F1"]["count"] == 3 and folders["F2"]["count"] == 2 and folders[""]["count"] == 1
+    assert stats["width_histogram"][">=8192"] == 1
+    assert stats["height_histogram"]["2048-4095"] == 1
+    assert stats["no_dimensions"] == 1
+    assert stats["star_distribution"] == {"0": 3, "1": 0, "2": 0, "3": 1, "4": 0, "5": 1}
+    assert stats["untagged"] == 3
+    assert stats["unannotated"] == 4
+    assert [entry["id"] for entry in stats["largest"]] == ["C", "E"]
+
+
+@pytest.mark.asyncio
+async def test_item_index_pages_and_refreshes_on_mtime_change():
+    """Test that the index pages through the library and rebuilds only on change."""
+    client, state = make_client()
+    index = ItemIndex(page_size=2)
+    assert await index.refresh(client) == 1
+    assert len(index) == 5 and index.get("E").name == "scan"
+    assert list_calls(client) == 3
+    
+    await index.refresh(client)
+    assert list_calls(client) == 3
+    
+    state["version"] = 2
+    assert await index.refresh(client) == 2
+    assert list_calls(client) == 6
+
+
+@pytest.mark.asyncio
+async def test_library_stats_tool_caches_until_library_changes():
+    """Test that library_stats reuses its result until the library mtime changes."""
+    client, state = make_client()
+    handler = LibraryHandler(ItemIndex(page_size=10))
+    
+    result = await handler.handle_call("library_stats", {"format": "json"}, client)
+    stats = json.loads(result[0].text)
+    assert stats["total_items"] == 5
+    assert {entry["key"]: entry["name"] for entry in stats["by_folder"]}["F2"] == "素材"
+    
+    text = (await handler.handle_call("library_stats", {}, client))[0].text
+    assert "- Items: 5" in text and "Largest items:" in text
+    assert list_calls(client) == 1
+    
+    state["version"] = 2
+    await handler.handle_call("library_stats", {}, client)
+    assert list_calls(client) == 2
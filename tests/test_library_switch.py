@@ -0,0 +1,92 @@
+"""Test multi-library switching with item index snapshots."""
+
+import json
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from handlers.library import LibraryHandler
+from schemas.base import ItemInfo, ItemListResponse
+from services.item_index import ItemIndex
+from services.library_manager import LibraryManager
+
+LIBRARIES = {
+    "/libs/写真.library": {"version": 10, "items": [ItemInfo(id="A1", name="猫"), ItemInfo(id="A2", name="犬")]},
+    "/libs/work.library": {"version": 20, "items": [ItemInfo(id="B1", name="logo")]},
+}
+
+
+def make_client():
+    """Fake Eagle client with two libraries and a switchable current library."""
+    client = AsyncMock()
+    client.invalidate_caches = MagicMock()
+    state = {"current": "/libs/写真.library"}
+    
+    async def get(endpoint, params=None, priority=None, model=None):
+        library = LIBRARIES[state["current"]]
+        if endpoint == "/api/library/info":
+            return {"status": "success", "data": {
+                "modificationTime": library["version"], "library": {"path": state["current"]}
+            }}
+        if endpoint == "/api/library/history":
+            return {"status": "success", "data": list(LIBRARIES)}
+        if endpoint == "/api/folder/list":
+            return {"status": "success", "data": []}
+        return ItemListResponse(status="success", data=library["items"] if params["offset"] == 0 else [])
+    
+    async def post(endpoint, data=None, priority=None):
+        state["current"] = data["libraryPath"]
+        return {"status": "success"}
+    
+    client.get.side_effect = get
+    client.post.side_effect = post
+    return client
+
+
+def list_calls(client) -> int:
+    return sum(1 for call in client.get.call_args_list if call.args[0] == "/api/item/list")
+
+
+@pytest.mark.asyncio
+async def test_switch_snapshots_and_restores_item_index(tmp_path):
+    """Test that switching away saves the index and switching back restores it."""
+    client = make_client()
+    index = ItemIndex(page_size=100)
+    manager = LibraryManager(index, snapshot_dir=tmp_path)
+    
+    await index.refresh(client)
+    assert len(index) == 2 and list_calls(client) == 1
+    
+    result = await manager.switch(client, "/libs/work.library")
+    assert result["previous"] == "/libs/写真.library"
+    assert result["snapshot_loaded"] is False and len(index) == 0
+    assert manager.snapshot_path("/libs/写真.library").exists()
+    client.invalidate_caches.assert_called_once()
+    
+    await index.refresh(client)
+    assert index.get("B1").name == "logo" and list_calls(client) == 2
+    
+    result = await manager.switch(client, "/libs/写真.library")
+    assert result["snapshot_loaded"] is True
+    assert index.get("A1").name == "猫"
+    # The restored snapshot matches the library's mtime, so no re-listing
+    await index.refresh(client)
+    assert list_calls(client) == 2
+
+
+@pytest.mark.asyncio
+async def test_library_list_and_switch_tools(tmp_path):
+    """Test library_list and library_switch tool output."""
+    client = make_client()
+    index = ItemIndex(page_size=100)
+    handler = LibraryHandler(index, LibraryManager(index, snapshot_dir=tmp_path))
+    
+    result = await handler.handle_call("library_list", {"format": "json"}, client)
+    listing = json.loads(result[0].text)
+    assert listing["current"] == "/libs/写真.library"
+    assert [library["name"] for library in listing["libraries"]] == ["写真", "work"]
+    
+    result = await handler.handle_call("library_switch", {"library_path": "/libs/work.library"}, client)
+    assert "- To: /libs/work.library" in result[0].text
+    
+    stats = json.loads((await handler.handle_call("library_stats", {"format": "json"}, client))[0].text)
+    assert stats["total_items"] == 1
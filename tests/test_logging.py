@@ -0,0 +1,44 @@
+"""Test logging redaction and queued handlers."""
+
+import json
+import logging
+import queue
+
+from utils.logging_config import JsonLineFormatter, RedactingQueueHandler, redact
+
+
+def test_redact_base64_and_truncate():
+    """Test that Base64 runs are replaced and long messages are capped."""
+    payload = "iVBORw0KGgo" * 100
+    message = redact(f"data:image/png;base64,{payload} done", max_chars=0)
+    assert payload not in message
+    assert message == f"data:image/png;base64,<base64: {len(payload)} chars> done"
+
+    message = redact("x " * 100, max_chars=20)
+    assert message.startswith("x " * 10)
+    assert message.endswith("[180 more characters]")
+
+
+def test_queue_handler_renders_lazily_formatted_message():
+    """Test that %-style arguments are rendered and redacted before queuing."""
+    log_queue = queue.Queue()
+    handler = RedactingQueueHandler(log_queue, max_chars=100)
+    logger = logging.getLogger("tests.logging")
+    logger.addHandler(handler)
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    try:
+        args = {"item_id": "ABC"}
+        logger.debug("Tool called: %s with args: %s", "item_info", args)
+        args["item_id"] = "changed"
+    finally:
+        logger.removeHandler(handler)
+
+    record = log_queue.get_nowait()
+    assert record.getMessage() == "Tool called: item_info with args: {'item_id': 'ABC'}"
+    assert record.args is None
+
+    entry = json.loads(JsonLineFormatter().format(record))
+    assert entry["level"] == "DEBUG"
+    assert entry["logger"] == "tests.logging"
+    assert entry["message"] == record.getMessage()
@@ -0,0 +1,48 @@
+"""Test metrics collection and exposition."""
+
+import pytest
+from utils.metrics import MetricsRegistry
+
+
+def test_counter_and_gauge_render():
+    """Test Prometheus text output for labelled counters and gauges."""
+    registry = MetricsRegistry()
+    calls = registry.counter("tool_calls_total", "Tool calls", ("tool", "status"))
+    in_flight = registry.gauge("tool_in_flight", "In flight", ("tool",))
+    calls.inc(tool="item_info", status="ok")
+    calls.inc(tool="item_info", status="ok")
+    in_flight.inc(tool="item_info")
+    in_flight.dec(tool="item_info")
+
+    text = registry.render()
+    assert "# TYPE tool_calls_total counter" in text
+    assert 'tool_calls_total{tool="item_info",status="ok"} 2' in text
+    assert 'tool_in_flight{tool="item_info"} 0' in text
+
+
+def test_histogram_buckets_and_quantiles():
+    """Test cumulative buckets, sum/count and quantile estimates."""
+    registry = MetricsRegistry()
+    latency = registry.histogram("latency_seconds", "Latency", ("tool",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.05, 0.5, 2.0):
+        latency.observe(value, tool="t")
+
+    text = registry.render()
+    assert 'latency_seconds_bucket{tool="t",le="0.1"} 2' in text
+    assert 'latency_seconds_bucket{tool="t",le="1"} 3' in text
+    assert 'latency_seconds_bucket{tool="t",le="+Inf"} 4' in text
+    assert 'latency_seconds_count{tool="t"} 4' in text
+    assert latency.quantile(0.5, tool="t") == 0.1
+    assert latency.quantile(0.95, tool="t") == float("inf")
+
+    snapshot = registry.snapshot()["latency_seconds"][0]
+    assert snapshot["count"] == 4
+    assert snapshot["sum"] == pytest.approx(2.6)
+
+
+def test_collectors_run_before_render():
+    """Test that collectors refresh gauges on every scrape."""
+    registry = MetricsRegistry()
+    gauge = registry.gauge("queue_depth", "Queue depth")
+    registry.add_collector(lambda: gauge.set(7))
+    assert "queue_depth 7" in registry.render()
@@ -0,0 +1,41 @@
+"""Test background prefetching of search results."""
+
+import httpx
+import pytest
+
+from benchmarks.eagle_simulator import EagleSimulator, SyntheticLibrary
+from eagle_client import EagleClient
+from handlers.image import ImageHandler
+from handlers.item import ItemHandler
+from services.prefetch import Prefetcher
+
+
+@pytest.mark.asyncio
+async def test_search_warms_item_info_and_thumbnails(tmp_path):
+    """Test that follow-up calls on the top search results are served from caches."""
+    simulator = EagleSimulator(SyntheticLibrary(items=30, folder_depth=1, folder_breadth=2, root=tmp_path))
+    image_handler = ImageHandler()
+    prefetcher = Prefetcher(image_handler, top_k=3)
+    item_handler = ItemHandler(prefetcher)
+    client = EagleClient("http://eagle-simulator", transport=httpx.ASGITransport(simulator.app))
+    
+    async with client:
+        result = await item_handler.handle_call("item_search", {"keyword": "_", "limit": 10, "format": "json"}, client)
+        assert '"count":10' in result[0].text.replace(" ", "")
+        await prefetcher.wait()
+        assert prefetcher.get_stats() == {"scheduled": 3, "warmed": 3, "failed": 0, "running": 0}
+        
+        top = simulator.library.list_items({"keyword": "_", "limit": "10"})[:3]
+        requests = dict(simulator.requests)
+        for item in top:
+            await item_handler.handle_call("item_info", {"item_id": item["id"]}, client)
+            await image_handler.handle_call("thumbnail_get_base64", {"item_id": item["id"]}, client)
+        # Every follow-up was served without asking Eagle again
+        assert dict(simulator.requests) == requests
+        assert client.warm_cache.get_stats()["hits"] == 6
+        assert image_handler._thumbnail_cache.get_stats()["hits"] == 3
+        
+        # A write drops prefetched responses
+        await item_handler.handle_call("item_update_tags", {"item_id": top[0]["id"], "tags": ["新規"]}, client)
+        result = await item_handler.handle_call("item_info", {"item_id": top[0]["id"]}, client)
+        assert "新規" in result[0].text
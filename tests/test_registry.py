@@ -0,0 +1,71 @@
+"""Test tool registry and dispatch."""
+
+import pytest
+from unittest.mock import AsyncMock
+from config import config
+from handlers.base import ErrorTextContent
+from handlers.direct_api import DirectApiHandler
+from handlers.folder import FolderHandler
+from handlers.item import ItemHandler
+from handlers.registry import ToolRegistry
+from main import EagleMCPServer
+
+
+def test_registry_dispatches_by_name():
+    """Test that every tool maps to the handler that declared it."""
+    folder, item = FolderHandler(), ItemHandler()
+    registry = ToolRegistry([folder, item])
+    assert len(registry) == len(folder.tools) + len(item.tools)
+    assert registry.get_handler("folder_list") is folder
+    assert registry.get_handler("item_info") is item
+    assert registry.get_handler("unknown") is None
+
+    with pytest.raises(ValueError):
+        ToolRegistry([folder, folder])
+
+
+@pytest.mark.asyncio
+async def test_handler_checks_required_parameters():
+    """Test generic required-parameter and unknown-tool errors."""
+    client = AsyncMock()
+    handler = ItemHandler()
+
+    result = await handler.handle_call("item_update_tags", {"item_id": "X"}, client)
+    assert isinstance(result[0], ErrorTextContent)
+    assert result[0].text == "Missing required parameter: tags"
+
+    result = await handler.handle_call("folder_list", {}, client)
+    assert result[0].text == "Unknown tool: folder_list"
+    client.get.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_direct_api_requires_only_documented_parameters():
+    """Test that optional Direct API parameters are not enforced as required."""
+    handler = DirectApiHandler()
+    schemas = {tool.name: tool.inputSchema for tool in handler.tools}
+    assert schemas["api_item_addFromURL"]["required"] == ["url", "name"]
+    assert schemas["api_folder_update"]["required"] == ["folderId"]
+    assert schemas["api_item_list"]["required"] == []
+
+    result = await handler.handle_call("api_folder_update", {"newName": "x"}, AsyncMock())
+    assert result[0].text == "Missing required parameter: folderId"
+
+
+@pytest.mark.asyncio
+async def test_reload_notifies_sessions(monkeypatch):
+    """Test that exposing Direct API tools rebuilds the registry and notifies clients."""
+    monkeypatch.setattr(config, "expose_direct_api_tools", False)
+    server = EagleMCPServer()
+    assert "api_item_info" not in server.registry
+
+    session = AsyncMock()
+    server._sessions.add(session)
+    monkeypatch.setenv("EXPOSE_DIRECT_API_TOOLS", "true")
+    assert await server.reload_tools() is True
+    assert "api_item_info" in server.registry
+    session.send_tool_list_changed.assert_awaited_once()
+
+    # Unchanged configuration: no rebuild, no notification
+    assert await server.reload_tools() is False
+    session.send_tool_list_changed.assert_awaited_once()
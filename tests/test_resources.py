@@ -0,0 +1,59 @@
+"""Test eagle:// resources end to end against the Eagle API simulator."""
+
+import base64
+import json
+
+import httpx
+import pytest
+from mcp.types import ListResourceTemplatesRequest, ReadResourceRequest, ReadResourceRequestParams
+
+from benchmarks.eagle_simulator import TINY_PNG, EagleSimulator, SyntheticLibrary
+from eagle_client import EagleAPIError, EagleClient
+from main import EagleMCPServer
+
+
+async def read(server, uri, **meta):
+    handler = server.server.request_handlers[ReadResourceRequest]
+    params = ReadResourceRequestParams.model_validate({"uri": uri, "_meta": meta} if meta else {"uri": uri})
+    result = await handler(ReadResourceRequest(method="resources/read", params=params))
+    return result.root.contents[0]
+
+
+@pytest.mark.asyncio
+async def test_read_resources(tmp_path):
+    """Test item, folder and thumbnail reads, versions and conditional reads."""
+    simulator = EagleSimulator(SyntheticLibrary(items=10, folder_depth=2, folder_breadth=2, root=tmp_path))
+    server = EagleMCPServer()
+    server.eagle_client = EagleClient("http://eagle-simulator", transport=httpx.ASGITransport(simulator.app))
+    item_id, item = next(iter(simulator.library.items.items()))
+    
+    result = await server.server.request_handlers[ListResourceTemplatesRequest](
+        ListResourceTemplatesRequest(method="resources/templates/list"))
+    assert [t.uriTemplate for t in result.root.resourceTemplates] == [
+        "eagle://item/{id}", "eagle://folder/{id}", "eagle://thumbnail/{id}"
+    ]
+    
+    content = await read(server, f"eagle://item/{item_id}")
+    assert json.loads(content.text)["name"] == item["name"]
+    version = content.meta["version"]
+    assert version == str(item["modificationTime"])
+    
+    folder = simulator.library.folders[0]
+    content = await read(server, f"eagle://folder/{folder['id']}")
+    assert json.loads(content.text)["children"] == [child["id"] for child in folder["children"]]
+    
+    content = await read(server, f"eagle://thumbnail/{item_id}")
+    assert base64.b64decode(content.blob) == TINY_PNG
+    assert content.mimeType == "image/png"
+    assert content.meta["version"] == version
+    
+    # An unchanged thumbnail isn't sent again
+    requests = simulator.requests["/api/item/thumbnail"]
+    content = await read(server, f"eagle://thumbnail/{item_id}", ifNoneMatch=version)
+    assert content.meta["notModified"] is True and not content.text
+    assert simulator.requests["/api/item/thumbnail"] == requests
+    
+    with pytest.raises(EagleAPIError, match="Item not found"):
+        await read(server, "eagle://item/missing")
+    with pytest.raises(ValueError, match="Unknown resource"):
+        await read(server, "eagle://album/1")
@@ -0,0 +1,147 @@
+"""Test the saved-query engine and tools."""
+
+import json
+from dataclasses import replace
+
+import pytest
+from unittest.mock import AsyncMock
+from handlers.query import QueryHandler
+from schemas.base import FolderInfo, FolderListResponse, ItemInfo, ItemListResponse
+from services.item_index import ItemIndex
+from services.saved_queries import QueryEngine, QueryError, SavedQueryStore, compile_query, top_k
+
+FOLDERS = [FolderInfo(id="F1", name="写真", children=[FolderInfo(id="F2", name="素材")]), FolderInfo(id="F3", name="other")]
+
+
+def make_items():
+    return [
+        ItemInfo(id="A", name="夕焼け", size=500, ext="JPG", tags=["sky"], folders=["F1"], width=4000, height=3000,
+                 star=5, modificationTime=3000),
+        ItemInfo(id="B", name="icon", size=10, ext="png", tags=["sky", "ui"], folders=["F2"], width=64, height=64,
+                 annotation="logo", modificationTime=2000),
+        ItemInfo(id="C", name="clip", size=9000, ext="mp4", folders=["F3"], modificationTime=1000),
+        ItemInfo(id="D", name="sketch", size=200, ext="png", tags=["draft"], folders=["F2"], width=1200, height=800,
+                 star=3, modificationTime=4000),
+    ]
+
+
+def make_client():
+    """Fake Eagle client whose items and library version can be changed."""
+    client = AsyncMock()
+    state = {"version": 1, "items": make_items()}
+    
+    async def get(endpoint, params=None, priority=None, model=None):
+        if endpoint == "/api/library/info":
+            return {"status": "success", "data": {"modificationTime": state["version"], "library": {"path": "/lib"}}}
+        if endpoint == "/api/folder/list":
+            return FolderListResponse(status="success", data=FOLDERS)
+        start = params["offset"] * params["limit"]
+        return ItemListResponse(status="success", data=state["items"][start:start + params["limit"]])
+    
+    client.get.side_effect = get
+    return client, state
+
+
+def test_compile_query_plan():
+    """Test validation, subtree expansion and predicate ordering."""
+    plan = compile_query({"tags": ["sky"], "folder_id": "F1", "text": "logo", "size_min": 5}, FOLDERS)
+    assert plan.describe() == [
+        "index tags in ['sky']", "index folders in ['F1', 'F2']", "filter 5 <= size <= ", "filter text contains 'logo'"
+    ]
+    with pytest.raises(QueryError):
+        compile_query({"colour": "red"})
+    with pytest.raises(QueryError):
+        compile_query({"modified_after": "last tuesday"})
+    for filters, message in (({"tags": "風景"}, "tags must be a list of strings"),
+                             ({"ext": 5}, "ext must be a string or a list of strings"),
+                             ({"folder_id": ["F1"]}, "folder_id must be a string")):
+        with pytest.raises(QueryError, match=message):
+            compile_query(filters, FOLDERS)
+
+
+@pytest.mark.asyncio
+async def test_query_engine_patches_cached_results():
+    """Test that results are cached and only changed items are re-checked after a rebuild."""
+    client, state = make_client()
+    index = ItemIndex(page_size=2)
+    engine = QueryEngine(index)
+    await index.refresh(client)
+    
+    plan = compile_query({"ext": ["png", "jpg"], "star_min": 3})
+    assert engine.evaluate(plan) == {"A", "D"}
+    assert engine.evaluate(plan) == {"A", "D"}
+    assert engine.get_stats()["hits"] == 1
+    
+    # B gains a rating, D is removed
+    state["items"][1] = replace(state["items"][1], star=4)
+    del state["items"][3]
+    state["version"] = 2
+    await index.refresh(client)
+    assert index.changed_since(index.generation - 1) == {"B", "D"}
+    
+    plan.execute = None  # a patched result must not re-run the plan
+    assert engine.evaluate(plan) == {"A", "B"}
+
+
+@pytest.mark.asyncio
+async def test_query_tools(tmp_path):
+    """Test saving, listing, running and deleting queries through the handler."""
+    client, _ = make_client()
+    store = SavedQueryStore(tmp_path / "saved_queries.json")
+    handler = QueryHandler(ItemIndex(), store)
+    
+    result = await handler.handle_call("query_save", {
+        "name": "素材", "filters": {"folder_id": "F1", "ext": "png"}, "description": "PNG assets"
+    }, client)
+    assert result[0].text == "Saved query '素材' (2 filters)"
+    assert "素材" in SavedQueryStore(tmp_path / "saved_queries.json").list()
+    
+    result = await handler.handle_call("query_run", {"name": "素材", "format": "json"}, client)
+    data = json.loads(result[0].text)
+    assert data["total"] == 2
+    assert [item["id"] for item in data["items"]] == ["D", "B"]
+    
+    result = await handler.handle_call("query_run", {"filters": {"text": "夕焼"}}, client)
+    assert "1 items match query" in result[0].text
+    
+    result = await handler.handle_call("query_save", {"name": "bad", "filters": {"size_min": "big"}}, client)
+    assert "size_min must be a number" in result[0].text
+    
+    await handler.handle_call("query_delete", {"name": "素材"}, client)
+    result = await handler.handle_call("query_list", {}, client)
+    assert result[0].text == "No saved queries"
+
+
+@pytest.mark.asyncio
+async def test_range_queries_and_top_k():
+    """Test sorted-index bisection, range-driven plans and top-K ordering."""
+    client, _ = make_client()
+    index = ItemIndex()
+    await index.refresh(client)
+    
+    widths = index.sorted_index("width")
+    assert len(widths) == 3  # C has no width
+    assert widths.count(1000) == 2
+    assert widths.range(64, 1200) == ["B", "D"]
+    
+    # One item over 1000 bytes beats the two PNG postings
+    plan = compile_query({"ext": "png", "size_min": 1000})
+    assert plan.execute(index) == set()
+    assert plan.driver == "size range"
+    plan = compile_query({"tags": ["draft"], "size_max": 1000})
+    assert plan.execute(index) == {"D"}
+    assert plan.driver == "tags postings"
+    
+    assert [item.id for item in top_k(index, None, "size", True, 2)] == ["C", "A"]
+    assert [item.id for item in top_k(index, None, "star", False, 4)] == ["D", "A", "B", "C"]
+    assert [item.id for item in top_k(index, {"A", "B", "C"}, "width", True, 3)] == ["A", "B", "C"]
+    
+    handler = QueryHandler(index, AsyncMock())
+    result = await handler.handle_call("item_query", {
+        "filters": {"ext": "png", "width_min": 1000, "width_max": 2000}, "order_by": "size", "format": "json"
+    }, client)
+    data = json.loads(result[0].text)
+    assert [item["id"] for item in data["items"]] == ["D"]
+    assert data["plan"][0] == "driven by width range"
+    result = await handler.handle_call("item_query", {"order_by": "height", "descending": False, "limit": 1}, client)
+    assert "4 items match query (showing 1)" in result[0].text and "ID: B" in result[0].text
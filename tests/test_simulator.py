@@ -0,0 +1,68 @@
+"""Test the server end to end against the Eagle API simulator."""
+
+import json
+
+import httpx
+import pytest
+from mcp.types import CallToolRequest, CallToolRequestParams
+
+from benchmarks.eagle_simulator import EagleSimulator, SyntheticLibrary
+from eagle_client import EagleClient
+from handlers.base import ErrorTextContent
+from main import EagleMCPServer
+
+
+def make_server(tmp_path, **kwargs):
+    library = SyntheticLibrary(items=50, folder_depth=2, folder_breadth=3, root=tmp_path)
+    simulator = EagleSimulator(library, **kwargs)
+    server = EagleMCPServer()
+    server.eagle_client = EagleClient("http://eagle-simulator", transport=httpx.ASGITransport(simulator.app))
+    return server, simulator
+
+
+async def call(server, name, **arguments):
+    handler = server.server.request_handlers[CallToolRequest]
+    result = await handler(CallToolRequest(method="tools/call", params=CallToolRequestParams(name=name, arguments=arguments)))
+    return result.root
+
+
+@pytest.mark.asyncio
+async def test_tools_against_simulator(tmp_path):
+    """Test that read and write tools round-trip through the simulator."""
+    server, simulator = make_server(tmp_path)
+    library = simulator.library
+    item_id = next(iter(library.items))
+    version = library.modification_time
+    
+    result = await call(server, "item_info", item_id=item_id, format="json")
+    assert not isinstance(result.content[0], ErrorTextContent)
+    assert json.loads(result.content[0].text)["name"] == library.items[item_id]["name"]
+    
+    result = await call(server, "folder_list", format="json")
+    assert not isinstance(result.content[0], ErrorTextContent)
+    assert len(json.loads(result.content[0].text)["folders"]) == 3
+    
+    subfolder = library.folders[0]["children"][0]
+    result = await call(server, "folder_info", folder_id=subfolder["id"], format="json")
+    assert not isinstance(result.content[0], ErrorTextContent)
+    assert json.loads(result.content[0].text)["name"] == subfolder["name"]
+    
+    result = await call(server, "item_update_tags", item_id=item_id, tags=["シミュレーション"], mode="add")
+    assert not isinstance(result.content[0], ErrorTextContent)
+    assert "シミュレーション" in library.items[item_id]["tags"]
+    assert library.modification_time > version
+    
+    result = await call(server, "thumbnail_get_base64", item_id=item_id)
+    assert not isinstance(result.content[0], ErrorTextContent)
+    assert simulator.requests["/api/item/thumbnail"] == 1
+
+
+@pytest.mark.asyncio
+async def test_simulator_injects_errors(tmp_path):
+    """Test that injected Eagle failures surface as tool errors."""
+    server, simulator = make_server(tmp_path, error_rate=1.0)
+    
+    result = await call(server, "item_info", item_id=next(iter(simulator.library.items)))
+    assert isinstance(result.content[0], ErrorTextContent)
+    assert "HTTP 500" in result.content[0].text
+    assert simulator.errors_injected >= 1
@@ -0,0 +1,57 @@
+"""Test import-time budget and lazy imports at startup."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Modules owned by this project (the MCP SDK, pydantic and httpx are excluded:
+# they dominate the total but cannot be deferred)
+PROJECT_PACKAGES = ("main", "config", "eagle_client", "handlers", "services", "utils", "schemas")
+
+# Self import time budget for project modules, in milliseconds. Measured at
+# 21-28 ms with bytecode cached, which is always the case here: collecting the
+# tests has already imported (and byte-compiled) every project module. Without
+# cached bytecode it is ~115 ms, so a run that somehow compiles still fits;
+# otherwise the ~5x slack absorbs slow CI machines.
+PROJECT_IMPORT_BUDGET_MS = 150
+
+# Everything, including the MCP SDK (~600 ms measured)
+TOTAL_IMPORT_BUDGET_MS = 5000
+
+
+def _import_times(module: str):
+    """Return {module: (self_us, cumulative_us)} from ``python -X importtime``."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, capture_output=True, text=True, check=True
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times
+
+
+def _is_project_module(name: str) -> bool:
+    return name.split(".")[0] in PROJECT_PACKAGES
+
+
+def test_import_time_budget():
+    """Test that importing the server stays within the import-time budget."""
+    times = _import_times("main")
+    project_ms = sum(s for name, (s, _) in times.items() if _is_project_module(name)) / 1000
+    total_ms = times["main"][1] / 1000
+    assert project_ms < PROJECT_IMPORT_BUDGET_MS, f"project modules took {project_ms:.1f} ms"
+    assert total_ms < TOTAL_IMPORT_BUDGET_MS, f"import main took {total_ms:.1f} ms"
+
+
+def test_optional_modules_are_lazy():
+    """Test that transport, logging setup and imaging modules load only when used."""
+    times = _import_times("main")
+    assert "http_transport" not in times
+    assert "utils.logging_config" not in times
+    assert "utils.imaging" not in times and "PIL" not in times
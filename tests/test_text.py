@@ -0,0 +1,52 @@
+"""Test CJK-aware text normalisation and folded text search."""
+
+from schemas.base import ItemInfo
+from services.item_index import ItemIndex
+from services.saved_queries import QueryEngine, compile_query
+from utils import text
+from utils.encoding import format_japanese_safe, get_display_name
+
+FAMILY = "\U0001F468\u200d\U0001F469\u200d\U0001F467"
+FLAG = "\U0001F1EF\U0001F1F5"
+
+
+def test_width_and_grapheme_safe_truncation():
+    """Test that wide characters count two columns and clusters are never split."""
+    assert text.display_width("写真abc") == 7
+    assert list(text.graphemes("が" + FAMILY + FLAG + "x")) == ["が", FAMILY, FLAG, "x"]
+    assert text.display_width(FAMILY + FLAG) == 4
+    
+    assert text.truncate("夕焼けの空と海", 9) == "夕焼け..."
+    assert text.truncate("が" * 5, 6) == "が..."
+    assert text.truncate(FAMILY * 4, 7) == FAMILY * 2 + "..."
+    assert text.truncate("short", 10) == "short"
+    
+    assert format_japanese_safe("x" * 60) == "x" * 47 + "..."
+    assert format_japanese_safe("猫" * 30) == "猫" * 23 + "..."
+    assert get_display_name({"name": "a\x00b\u200bc"}) == "abc"
+    assert get_display_name({"name": "\x07"}, "fallback") == "fallback"
+
+
+def test_folding():
+    """Test NFKC, case and katakana/hiragana folding."""
+    assert text.fold("ｶﾒﾗ") == text.fold("カメラ") == text.fold("かめら") == "かめら"
+    assert text.fold("ＰＮＧ Straße") == "png strasse"
+    assert text.search_key("Logo", "", "スケッチ") == "logo\nすけっち"
+
+
+def test_text_query_uses_folded_search_keys():
+    """Test that text filters match across width, case and kana differences."""
+    index = ItemIndex()
+    index.install(None, {"items": {
+        "A": ItemInfo(id="A", name="ｽｹｯﾁ_01", ext="png"),
+        "B": ItemInfo(id="B", name="icon", ext="png", tags=["カメラ"], annotation="ＬＯＧＯ"),
+        "C": ItemInfo(id="C", name="clip", ext="mp4"),
+    }})
+    engine = QueryEngine(index)
+    assert engine.evaluate(compile_query({"text": "すけっち"})) == {"A"}
+    assert engine.evaluate(compile_query({"text": "かめら"})) == {"B"}
+    assert engine.evaluate(compile_query({"text": "Logo", "ext": "png"})) == {"B"}
+    
+    plan = compile_query({"text": "ｶﾒﾗ"})
+    assert plan.describe() == ["filter text contains 'かめら'"]
+    assert plan.matches(index.get("B")) and not plan.matches(index.get("C"))
@@ -0,0 +1,77 @@
+"""Test span-based tracing."""
+
+import asyncio
+import json
+
+import pytest
+from utils.tracing import Tracer, span_tree
+
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_tasks():
+    """Test that spans opened in child tasks attach to the calling span."""
+    tracer = Tracer(slow_threshold=0)
+
+    async def fetch(endpoint):
+        with tracer.span(f"GET {endpoint}"):
+            await asyncio.sleep(0)
+
+    with tracer.span("tool item_info", tool="item_info"):
+        with tracer.span("ItemHandler.handle_call"):
+            await asyncio.gather(fetch("/api/item/info"), fetch("/api/item/thumbnail"))
+
+    root = tracer.recent_slow(1)[0]
+    tree = span_tree(root)
+    assert tree["name"] == "tool item_info"
+    assert tree["attributes"] == {"tool": "item_info"}
+    handler = tree["children"][0]
+    assert handler["name"] == "ItemHandler.handle_call"
+    assert sorted(child["name"] for child in handler["children"]) == [
+        "GET /api/item/info", "GET /api/item/thumbnail"
+    ]
+    assert len({s.trace_id for s in root.spans}) == 1
+
+
+def test_errors_and_slow_threshold():
+    """Test that exceptions mark spans and fast traces are not retained."""
+    tracer = Tracer(slow_threshold=10)
+    with pytest.raises(ValueError):
+        with tracer.span("tool fail"):
+            raise ValueError("boom")
+    assert tracer.recent_slow() == []
+
+    tracer.slow_threshold_ns = 0
+    with pytest.raises(ValueError):
+        with tracer.span("tool fail"):
+            raise ValueError("boom")
+    assert "boom" in tracer.recent_slow()[0].error
+
+
+def test_sampling_rate_zero_records_nothing():
+    """Test that unsampled traces yield no-op spans all the way down."""
+    tracer = Tracer(sample_rate=0.0, slow_threshold=0)
+    with tracer.span("tool a") as root:
+        with tracer.span("child") as child:
+            child.set_attribute("ignored", True)
+    assert root is child
+    assert tracer.recent_slow() == []
+    assert tracer.traces_started == 1 and tracer.traces_sampled == 0
+
+
+def test_jsonl_export_is_otlp_shaped(tmp_path):
+    """Test one OTLP/JSON resourceSpans document per trace."""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(export_path=path)
+    for _ in range(2):
+        with tracer.span("tool library_info"):
+            with tracer.span("GET /api/library/info") as span:
+                span.set_attribute("http.response.body.size", 42)
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert len(lines) == 2
+    spans = json.loads(lines[0])["resourceSpans"][0]["scopeSpans"][0]["spans"]
+    root, child = spans
+    assert child["parentSpanId"] == root["spanId"]
+    assert child["traceId"] == root["traceId"]
+    assert {"key": "http.response.body.size", "value": {"intValue": "42"}} in child["attributes"]
+    assert int(child["endTimeUnixNano"]) >= int(child["startTimeUnixNano"])
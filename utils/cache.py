@@ -0,0 +1,62 @@
+"""In-memory response caches for Eagle API data."""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+
+class ResponseCache:
+    """Bounded LRU cache that remembers when each entry was stored.
+
+    Entries can be read either fresh (``max_age`` given) or stale (no age
+    limit), which lets the client fall back to the last known good response
+    when Eagle is unreachable.
+    """
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, key: Hashable, max_age: Optional[float] = None) -> Optional[Any]:
+        """Return the cached value, or None if missing or older than ``max_age``."""
+        entry = self._entries.get(key)
+        if entry is None or (max_age is not None and time.monotonic() - entry[0] > max_age):
+            self._misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self._hits += 1
+        return entry[1]
+
+    def peek(self, key: Hashable, max_age: Optional[float] = None) -> Optional[Any]:
+        """Like ``get``, but without counting a hit or miss or refreshing recency."""
+        entry = self._entries.get(key)
+        if entry is None or (max_age is not None and time.monotonic() - entry[0] > max_age):
+            return None
+        return entry[1]
+    
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        """Drop every entry."""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache size and hit/miss counters."""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self._hits,
+            "misses": self._misses,
+        }
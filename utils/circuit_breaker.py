@@ -0,0 +1,88 @@
+"""Circuit breaker for fast failure when Eagle is unavailable."""
+
+import time
+from typing import Any, Dict, Optional
+
+
+class CircuitBreaker:
+    """Classic three-state circuit breaker.
+
+    ``closed``: requests flow normally and consecutive failures are counted.
+    ``open``: requests are rejected immediately until ``reset_timeout`` passes.
+    ``half_open``: a single probe request is let through; its outcome decides
+    whether the circuit closes again or re-opens.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: Optional[float] = None
+        self._last_error: Optional[str] = None
+
+        # Metrics
+        self._times_opened = 0
+        self._rejected = 0
+
+    @property
+    def state(self) -> str:
+        """Current state, moving from open to half-open once the timeout elapses."""
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probe_started = None
+        return self._state
+
+    def allow(self) -> bool:
+        """Return True if a request may be sent now."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN:
+            now = time.monotonic()
+            # A probe that never reported back (e.g. was cancelled) must not
+            # wedge the breaker in half-open forever
+            if self._probe_started is None or now - self._probe_started >= self.reset_timeout:
+                self._probe_started = now
+                return True
+        self._rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Record a successful request and close the circuit."""
+        self._state = self.CLOSED
+        self._failures = 0
+        self._probe_started = None
+
+    def record_failure(self, error: Optional[str] = None) -> None:
+        """Record a failed request, opening the circuit past the threshold."""
+        self._failures += 1
+        self._last_error = error
+        if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self._state != self.OPEN:
+                self._times_opened += 1
+            self._state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._probe_started = None
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 when not open)."""
+        if self.state != self.OPEN:
+            return 0.0
+        return max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return a snapshot of breaker state."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_after": round(self.retry_after(), 1),
+            "times_opened": self._times_opened,
+            "rejected": self._rejected,
+            "last_error": self._last_error,
+        }
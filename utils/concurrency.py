@@ -0,0 +1,156 @@
+"""Concurrency control utilities for Eagle API access.
+
+Eagle's local API server is a single Electron process, so flooding it with
+parallel requests makes every request slower. ``AdaptiveLimiter`` bounds the
+number of in-flight requests and adjusts that bound with an AIMD
+(additive-increase / multiplicative-decrease) rule driven by observed latency
+and errors. Waiters are queued by priority so interactive calls are admitted
+before bulk jobs.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+
+class Priority(IntEnum):
+    """Request priority. Lower values are admitted first."""
+    INTERACTIVE = 0
+    BULK = 10
+
+
+class AdaptiveLimiter:
+    """Priority-aware concurrency limiter with AIMD limit adjustment."""
+
+    def __init__(self, name: str, max_limit: int, min_limit: int = 1,
+                 latency_target: float = 1.0, decrease_factor: float = 0.5,
+                 decrease_cooldown: float = 1.0):
+        if max_limit < 1:
+            raise ValueError("max_limit must be at least 1")
+        self.name = name
+        self.max_limit = max_limit
+        self.min_limit = max(1, min(min_limit, max_limit))
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+
+        self._limit = float(max_limit)
+        self._in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._last_decrease = 0.0
+
+        # Metrics
+        self._admitted = 0
+        self._queued_total = 0
+        self._max_queue_depth = 0
+        self._errors = 0
+        self._slow = 0
+        self._total_wait = 0.0
+
+    @property
+    def limit(self) -> int:
+        """Current effective concurrency limit."""
+        return max(self.min_limit, int(self._limit))
+
+    @property
+    def in_flight(self) -> int:
+        """Number of requests currently holding a slot."""
+        return self._in_flight
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests waiting for a slot."""
+        return sum(1 for _, _, waiter in self._waiters if not waiter.done())
+
+    async def acquire(self, priority: int = Priority.INTERACTIVE) -> None:
+        """Wait for a free slot, honouring priority order."""
+        if self._in_flight < self.limit and not self._waiters:
+            self._in_flight += 1
+            self._admitted += 1
+            return
+
+        waiter = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._counter), waiter))
+        self._queued_total += 1
+        self._max_queue_depth = max(self._max_queue_depth, len(self._waiters))
+
+        start = time.monotonic()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Slot was handed to us just before cancellation; pass it on
+                self._in_flight -= 1
+                self._wake_waiters()
+            raise
+        finally:
+            self._total_wait += time.monotonic() - start
+        self._admitted += 1
+
+    def release(self, latency: float, error: bool = False) -> None:
+        """Release a slot and feed the observation into the AIMD controller."""
+        self._in_flight -= 1
+        self._record(latency, error)
+        self._wake_waiters()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = Priority.INTERACTIVE) -> AsyncIterator[None]:
+        """Hold a slot for the duration of the block."""
+        await self.acquire(priority)
+        start = time.monotonic()
+        error = False
+        try:
+            yield
+        except Exception:
+            error = True
+            raise
+        finally:
+            self.release(time.monotonic() - start, error)
+
+    def _record(self, latency: float, error: bool) -> None:
+        """Apply additive increase on healthy responses, multiplicative decrease otherwise."""
+        if error:
+            self._errors += 1
+        slow = latency > self.latency_target
+        if slow:
+            self._slow += 1
+
+        if error or slow:
+            now = time.monotonic()
+            # Only back off once per cooldown window so a burst of slow
+            # responses from the same congestion event isn't counted repeatedly
+            if now - self._last_decrease >= self.decrease_cooldown:
+                self._limit = max(float(self.min_limit), self._limit * self.decrease_factor)
+                self._last_decrease = now
+        else:
+            self._limit = min(float(self.max_limit), self._limit + 1.0 / max(self._limit, 1.0))
+
+    def _wake_waiters(self) -> None:
+        """Hand free slots to the highest-priority waiters."""
+        while self._waiters and self._in_flight < self.limit:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                continue
+            self._in_flight += 1
+            waiter.set_result(None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return a snapshot of limiter state and queue metrics."""
+        return {
+            "name": self.name,
+            "limit": self.limit,
+            "max_limit": self.max_limit,
+            "in_flight": self._in_flight,
+            "queue_depth": self.queue_depth,
+            "max_queue_depth": self._max_queue_depth,
+            "admitted": self._admitted,
+            "queued_total": self._queued_total,
+            "errors": self._errors,
+            "slow_responses": self._slow,
+            "avg_wait_ms": round(self._total_wait / self._queued_total * 1000, 2) if self._queued_total else 0.0,
+        }
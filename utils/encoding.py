@@ -2,7 +2,9 @@
 
 import sys
 import os
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Optional, Union
+
+from utils import text as text_utils
 
 
 def safe_str(text: Any, fallback: str = "Unknown") -> str:
@@ -33,18 +35,16 @@ def ensure_utf8_output():
 
 
 def format_japanese_safe(text: str, max_length: int = 50) -> str:
-    """Format Japanese text safely for console output."""
+    """Format Japanese text safely for console output.
+    
+    ``max_length`` is a display width: wide (CJK) characters count as two
+    columns, and text is only cut between grapheme clusters.
+    """
     if not text:
         return "Unknown"
     
-    # Ensure we have a proper string
-    text = safe_str(text)
-    
-    # Truncate if too long
-    if len(text) > max_length:
-        text = text[:max_length-3] + "..."
-    
-    return text
+    # Memoised per unique string, so repeated names and tags cost a lookup
+    return text_utils.display(safe_str(text), max_length) or "Unknown"
 
 
 def clean_response_text(data: Union[Dict, List, str, Any]) -> Union[Dict, List, str, Any]:
@@ -54,7 +54,7 @@ def clean_response_text(data: Union[Dict, List, str, Any]) -> Union[Dict, List,
     elif isinstance(data, list):
         return [clean_response_text(item) for item in data]
     elif isinstance(data, str):
-        return safe_str(data)
+        return text_utils.clean(data)
     else:
         return data
 
@@ -66,26 +66,33 @@ def get_display_name(item: Dict[str, Any], fallback: str = "Unnamed Item") -> st
         return fallback
     
     # Clean and format for display
-    clean_name = format_japanese_safe(name)
-    return clean_name if clean_name != "Unknown" else fallback
+    return text_utils.display(safe_str(name), 50) or fallback
 
 
-def create_safe_summary(items: List[Dict[str, Any]], item_type: str = "items") -> str:
-    """Create a safe summary of items with proper Japanese text handling."""
-    if not items:
+def create_safe_summary(items: List[Dict[str, Any]], item_type: str = "items",
+                        total: Optional[int] = None, start: int = 0) -> str:
+    """Create a safe summary of items with proper Japanese text handling.
+    
+    ``items`` is the part of a listing to show (already cut to the call's
+    output budget); ``total`` is the size of the whole listing and ``start``
+    the position of the first shown item in it.
+    """
+    total = len(items) if total is None else total
+    if not total:
         return f"No {item_type} found."
     
-    summary_parts = [f"Found {len(items)} {item_type}:"]
+    summary_parts = [f"Found {total} {item_type}:"]
     
-    for i, item in enumerate(items[:10]):  # Show first 10 items
-        display_name = get_display_name(item, f"Item {i+1}")
+    for i, item in enumerate(items, start + 1):
+        display_name = get_display_name(item, f"Item {i}")
         item_id = item.get('id', 'Unknown ID')
-        summary_parts.append(f"{i+1}. {display_name} (ID: {item_id[:8]}...)")
+        summary_parts.append(f"{i}. {display_name} (ID: {item_id[:8]}...)")
     
-    if len(items) > 10:
-        summary_parts.append(f"... and {len(items) - 10} more {item_type}")
+    remaining = total - start - len(items)
+    if remaining > 0:
+        summary_parts.append(f"... and {remaining} more {item_type}")
     
-    return "\n".join(summary_parts)
+    return "\n".join(summary_parts) + "\n"
 
 
 def ascii_safe_text(text: str) -> str:
@@ -0,0 +1,96 @@
+"""Non-blocking file system access for async handlers.
+
+Every existence check, stat and read runs in a dedicated, bounded thread
+pool instead of on the event loop. Large files are read and Base64-encoded
+in chunks, each chunk a separate pool job, so one 100 MB original never
+holds a worker for the whole read and small requests queued behind it
+(thumbnails, path checks) are served between chunks.
+"""
+
+import asyncio
+import base64
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, List, Optional, TypeVar
+
+from config import FILE_IO_CHUNK_SIZE, FILE_IO_THREADS
+from utils import tracing
+
+T = TypeVar("T")
+
+
+def _read_chunk(path: str, offset: int, size: int) -> bytes:
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return f.read(size)
+
+
+def _encode_chunk(chunk: bytes) -> str:
+    return base64.b64encode(chunk).decode("ascii")
+
+
+class FileIO:
+    """Bounded thread pool for file system work."""
+    
+    def __init__(self, max_workers: int = FILE_IO_THREADS, chunk_size: int = FILE_IO_CHUNK_SIZE):
+        self.max_workers = max(1, max_workers)
+        # A multiple of 3 so chunks Base64-encode independently without padding
+        self.chunk_size = max(3, chunk_size - chunk_size % 3)
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # Created on first use; worker threads are started lazily by the pool
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="file-io")
+        return self._executor
+    
+    async def run(self, func: Callable[..., T], *args) -> T:
+        """Run a blocking function in the pool."""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, partial(func, *args))
+    
+    async def exists(self, path: str) -> bool:
+        """``os.path.exists`` off the event loop."""
+        return await self.run(os.path.exists, path)
+    
+    async def getsize(self, path: str) -> int:
+        """``os.path.getsize`` off the event loop."""
+        return await self.run(os.path.getsize, path)
+    
+    async def read_chunks(self, path: str) -> List[bytes]:
+        """Read a whole file as a list of ``chunk_size`` pieces."""
+        with tracing.span("file.read", **{"file.path": path}) as span:
+            size = await self.getsize(path)
+            chunks = []
+            for offset in range(0, size, self.chunk_size):
+                chunk = await self.run(_read_chunk, path, offset, self.chunk_size)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+            span.set_attribute("file.size", sum(len(chunk) for chunk in chunks))
+            span.set_attribute("file.chunks", len(chunks))
+            return chunks
+    
+    async def read_bytes(self, path: str) -> bytes:
+        """Read a whole file."""
+        chunks = await self.read_chunks(path)
+        # Joining hundreds of megabytes is itself slow enough to stall the loop
+        return await self.run(b"".join, chunks)
+    
+    async def read_base64(self, path: str) -> str:
+        """Read a file and Base64-encode it, chunk by chunk."""
+        chunks = await self.read_chunks(path)
+        with tracing.span("base64.encode", **{"input.size": sum(len(chunk) for chunk in chunks)}):
+            encoded = [await self.run(_encode_chunk, chunk) for chunk in chunks]
+            return await self.run("".join, encoded)
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads (waits for running jobs)."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+# Shared pool used by handlers
+FILE_IO = FileIO()
@@ -0,0 +1,196 @@
+"""Region extraction from large images (optional, requires Pillow).
+
+Install with ``pip install .[imaging]``. Decoding runs in a process pool so
+that CPU-heavy work on gigapixel scans neither blocks the event loop nor
+competes for the server's GIL. Only as much of the source is decoded as the
+format allows:
+
+- uncompressed tiled TIFFs: only the tiles overlapping the region
+- other uncompressed (raw) images such as plain TIFF and PPM: only the rows
+  spanning the region, memory-mapped where Pillow supports it
+- JPEG: DCT-domain downscaling via ``draft`` when the output is scaled down
+- everything else: a full decode, then ``reduce`` before the final resize
+
+Pillow's decompression-bomb guard (an error above about 358 MP) would
+reject exactly the scans this module is for, so the worker processes turn
+it off and ``extract_region`` applies its own ``max_source_pixels`` limit;
+memory is bounded by the decoded window and ``max_pixels`` either way.
+"""
+
+import asyncio
+import base64
+import io
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from config import IMAGE_PROCESS_WORKERS
+
+try:
+    from PIL import Image
+except ImportError:  # pragma: no cover - optional dependency
+    Image = None
+
+AVAILABLE = Image is not None
+
+OUTPUT_FORMATS = {"png": ("PNG", "image/png"), "jpeg": ("JPEG", "image/jpeg")}
+
+
+class RegionError(ValueError):
+    """Raised for regions outside the image or outputs over the pixel limit."""
+
+
+# Bytes per pixel of the raw modes whose rows can be addressed directly
+_RAW_BYTES_PER_PIXEL = {"L": 1, "P": 1, "LA": 2, "RGB": 3, "BGR": 3, "RGBA": 4, "RGBX": 4, "CMYK": 4}
+
+
+def _intersects(box: Tuple[int, int, int, int], other: Tuple[int, int, int, int]) -> bool:
+    return box[0] < other[2] and other[0] < box[2] and box[1] < other[3] and other[1] < box[3]
+
+
+def _tile(tile: tuple, extents: Tuple[int, int, int, int], offset: int) -> tuple:
+    # Tiles are plain tuples in older Pillow and named tuples in newer releases
+    fields = (tile[0], extents, offset, tile[3])
+    return fields if type(tile) is tuple else type(tile)(*fields)
+
+
+def _raw_rows(img, box: Tuple[int, int, int, int]) -> Optional[tuple]:
+    """For a single top-down raw tile, a tile covering only the rows of ``box``."""
+    if len(img.tile) != 1:
+        return None
+    tile = img.tile[0]
+    args = tile[3] if isinstance(tile[3], tuple) else (tile[3],)
+    width, height = img.size
+    if tile[0] != "raw" or tuple(tile[1]) != (0, 0, width, height) or args[0] not in _RAW_BYTES_PER_PIXEL:
+        return None
+    stride = (args[1] if len(args) > 1 else 0) or width * _RAW_BYTES_PER_PIXEL[args[0]]
+    if (args[2] if len(args) > 2 else 1) != 1:
+        return None  # bottom-up rows (e.g. BMP)
+    return _tile(tile, (0, box[1], width, box[3]), tile[2] + box[1] * stride)
+
+
+def _decode_window(img, box: Tuple[int, int, int, int]) -> Tuple[Tuple[int, int, int, int], str]:
+    """Restrict decoding to the tiles (or raw rows) covering ``box``.
+    
+    The image is shrunk to the bounding box of those tiles before loading,
+    so memory is only allocated for that window. Returns ``box`` relative to
+    the window and a description of what will be decoded.
+    """
+    total = len(img.tile)
+    rows = _raw_rows(img, box)
+    tiles = [rows] if rows is not None else [tile for tile in img.tile if _intersects(box, tile[1])]
+    if not tiles or (rows is None and len(tiles) == total):
+        return box, "full"
+    # Pillow has no public API for decoding part of an image; shrinking the
+    # private declared size makes it allocate (or memory-map) only the window.
+    # Releases without ``_size`` get a full decode instead.
+    if not isinstance(getattr(img, "_size", None), tuple):
+        return box, "full"
+    left = min(tile[1][0] for tile in tiles)
+    top = min(tile[1][1] for tile in tiles)
+    right = max(tile[1][2] for tile in tiles)
+    bottom = max(tile[1][3] for tile in tiles)
+    img.tile = [
+        _tile(tile, (tile[1][0] - left, tile[1][1] - top, tile[1][2] - left, tile[1][3] - top), tile[2])
+        for tile in tiles
+    ]
+    img._size = (right - left, bottom - top)
+    described = f"rows {top}-{bottom}" if rows is not None else f"{len(tiles)}/{total} tiles"
+    return (box[0] - left, box[1] - top, box[2] - left, box[3] - top), described
+
+
+def extract_region(path: str, x: int, y: int, width: int, height: int, scale: float = 1.0,
+                   output_format: str = "png", max_pixels: int = 0,
+                   max_source_pixels: int = 0) -> Dict[str, Any]:
+    """Crop ``(x, y, width, height)`` of the image at ``path`` and encode it.
+    
+    Coordinates are in the original image's pixels and the region is
+    clipped to the image. ``scale`` (0 < scale <= 1) downsizes the crop.
+    ``max_pixels`` caps the output and ``max_source_pixels`` the source
+    image (0 = no limit).
+    Runs in a worker process; returns plain data (Base64 image data) so the
+    result pickles.
+    """
+    if Image is None:
+        raise RuntimeError("Pillow is not installed (pip install .[imaging])")
+    if not 0 < scale <= 1:
+        raise RegionError("scale must be greater than 0 and at most 1")
+    if width <= 0 or height <= 0:
+        raise RegionError("width and height must be positive")
+    if output_format not in OUTPUT_FORMATS:
+        raise RegionError(f"Unsupported image format '{output_format}' (use {', '.join(OUTPUT_FORMATS)})")
+    pil_format, mime_type = OUTPUT_FORMATS[output_format]
+    
+    with Image.open(path) as img:
+        full_width, full_height = img.size
+        if max_source_pixels and full_width * full_height > max_source_pixels:
+            raise RegionError(f"Image of {full_width}x{full_height} exceeds {max_source_pixels} pixels")
+        box = (max(0, x), max(0, y), min(full_width, x + width), min(full_height, y + height))
+        if box[0] >= box[2] or box[1] >= box[3]:
+            raise RegionError(f"Region is outside the image ({full_width}x{full_height})")
+        target = (max(1, round((box[2] - box[0]) * scale)), max(1, round((box[3] - box[1]) * scale)))
+        if max_pixels and target[0] * target[1] > max_pixels:
+            raise RegionError(
+                f"Output of {target[0]}x{target[1]} exceeds {max_pixels} pixels; use a smaller region or scale"
+            )
+        
+        decoded = "full"
+        if img.format == "JPEG" and scale <= 0.5:
+            # Let libjpeg decode at 1/2, 1/4 or 1/8 size, then map the box
+            img.draft(img.mode, (max(1, round(full_width * scale)), max(1, round(full_height * scale))))
+            factor = img.size[0] / full_width
+            if factor < 1:
+                box = tuple(round(v * factor) for v in box)
+                decoded = f"draft 1/{round(1 / factor)}"
+        else:
+            box, decoded = _decode_window(img, box)
+        
+        region = img.crop(box)
+    
+    reduce_factor = int(min(region.size[0] / target[0], region.size[1] / target[1]))
+    if reduce_factor >= 2:
+        region = region.reduce(reduce_factor)
+    if region.size != target:
+        region = region.resize(target, Image.LANCZOS)
+    if pil_format == "JPEG" and region.mode not in ("RGB", "L"):
+        region = region.convert("RGB")
+    
+    out = io.BytesIO()
+    region.save(out, pil_format)
+    return {
+        "data": base64.b64encode(out.getvalue()).decode("ascii"),
+        "mime_type": mime_type,
+        "width": region.size[0],
+        "height": region.size[1],
+        "source_size": [full_width, full_height],
+        "decoded": decoded,
+    }
+
+
+class RegionExtractor:
+    """Process pool running ``extract_region``."""
+    
+    def __init__(self, max_workers: int = IMAGE_PROCESS_WORKERS):
+        self.max_workers = max(1, max_workers)
+        self._executor: Optional[ProcessPoolExecutor] = None
+    
+    async def extract(self, *args, **kwargs) -> Dict[str, Any]:
+        """Run ``extract_region`` in a worker process."""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.max_workers, initializer=_init_worker)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _call_extract, args, kwargs)
+    
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def _init_worker() -> None:
+    # extract_region enforces max_source_pixels itself
+    Image.MAX_IMAGE_PIXELS = None
+
+
+def _call_extract(args: tuple, kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    return extract_region(*args, **kwargs)
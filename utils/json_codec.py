@@ -0,0 +1,78 @@
+"""JSON encoding/decoding with optional fast backends.
+
+Eagle's list endpoints return multi-megabyte JSON for large libraries. When
+``orjson`` or ``msgspec`` is installed it is used for decoding; otherwise the
+standard library ``json`` module is used. ``decode_as`` additionally decodes
+straight into the typed structs from ``schemas.base``, which with msgspec
+skips every field the struct doesn't declare. Without msgspec, building the
+structs costs more than it saves, so ``TYPED_DECODING`` tells callers to
+decode plain objects instead.
+"""
+
+import json
+from typing import Any, Type, TypeVar, Union
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover - optional dependency
+    msgspec = None
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+T = TypeVar("T")
+
+if orjson is not None:
+    BACKEND = "orjson"
+elif msgspec is not None:
+    BACKEND = "msgspec"
+else:
+    BACKEND = "json"
+
+# Whether decoding straight into typed structs is faster than plain decoding
+TYPED_DECODING = msgspec is not None
+
+_msgspec_decoders: dict = {}
+
+
+def loads(data: Union[bytes, bytearray, memoryview, str]) -> Any:
+    """Decode JSON into plain Python objects using the fastest available backend."""
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, indent: bool = False, sort_keys: bool = False) -> str:
+    """Encode to a JSON string, keeping non-ASCII (e.g. Japanese) text readable.
+    
+    ``sort_keys`` sorts object keys at every level, for canonical output.
+    """
+    if orjson is not None:
+        option = orjson.OPT_INDENT_2 if indent else 0
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, option=option | orjson.OPT_NON_STR_KEYS, default=str).decode("utf-8")
+    return json.dumps(obj, indent=2 if indent else None, ensure_ascii=False, default=str, sort_keys=sort_keys)
+
+
+def decode_as(data: Union[bytes, str], type_: Type[T]) -> T:
+    """Decode JSON directly into ``type_``.
+
+    With msgspec only the fields declared on ``type_`` are materialised.
+    Without it, or when the document doesn't fit ``type_`` (an error
+    envelope whose ``data`` is a message, ``null`` lists), the document is
+    decoded normally and converted with the tolerant ``type_.from_dict``.
+    """
+    if msgspec is not None:
+        decoder = _msgspec_decoders.get(type_)
+        if decoder is None:
+            decoder = _msgspec_decoders[type_] = msgspec.json.Decoder(type_, strict=False)
+        try:
+            return decoder.decode(data)
+        except msgspec.ValidationError:
+            pass
+    return type_.from_dict(loads(data))
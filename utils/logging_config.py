@@ -0,0 +1,124 @@
+"""Logging setup: non-blocking handlers, rotation and payload redaction.
+
+Writing multi-KB log lines synchronously to stderr stalls the event loop, so
+every record is put on a queue by ``RedactingQueueHandler`` and written by a
+``QueueListener`` thread to stderr and to a rotating JSON-lines file in
+``LOG_DIR``. Before queuing, the message is rendered once, Base64 runs are
+replaced with a placeholder and overlong messages are truncated.
+"""
+
+import atexit
+import copy
+import logging
+import queue
+import re
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import (
+    LOG_FILE,
+    LOG_FILE_BACKUP_COUNT,
+    LOG_FILE_MAX_BYTES,
+    LOG_FORMAT,
+    LOG_LEVEL,
+    LOG_LEVELS,
+    LOG_MAX_MESSAGE_CHARS,
+)
+from utils import json_codec
+
+# Long unbroken Base64 runs (image payloads, data: URIs)
+_BASE64_RUN = re.compile(r"[A-Za-z0-9+/]{256,}={0,2}")
+
+_listener: Optional[QueueListener] = None
+
+
+def redact(message: str, max_chars: int = LOG_MAX_MESSAGE_CHARS) -> str:
+    """Replace Base64 payloads with a placeholder and cap the message length."""
+    if len(message) >= 256:
+        message = _BASE64_RUN.sub(lambda m: f"<base64: {len(m.group())} chars>", message)
+    if max_chars > 0 and len(message) > max_chars:
+        message = f"{message[:max_chars]}... [{len(message) - max_chars} more characters]"
+    return message
+
+
+class RedactingQueueHandler(QueueHandler):
+    """Queue handler that renders and redacts the message on the calling thread.
+    
+    Only the message is rendered here (so mutable arguments are captured as
+    they were); timestamps, formatting and I/O happen on the listener thread.
+    """
+    
+    def __init__(self, log_queue: queue.Queue, max_chars: int = LOG_MAX_MESSAGE_CHARS):
+        super().__init__(log_queue)
+        self.max_chars = max_chars
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = redact(record.getMessage(), self.max_chars)
+        record.args = None
+        return record
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record, for the log file."""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json_codec.dumps(entry)
+
+
+def _file_handler(path: Path) -> Optional[logging.Handler]:
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handler = RotatingFileHandler(
+            path, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT,
+            encoding="utf-8", delay=True
+        )
+    except OSError as e:
+        print(f"Log file disabled ({path}): {e}", file=sys.stderr)
+        return None
+    handler.setFormatter(JsonLineFormatter())
+    return handler
+
+
+def setup_logging(level: str = LOG_LEVEL, levels: Optional[Dict[str, str]] = None,
+                  log_file: Optional[Path] = LOG_FILE) -> QueueListener:
+    """Route all logging through a queue to stderr and the rotating log file.
+    
+    Safe to call more than once; later calls return the running listener.
+    """
+    global _listener
+    if _listener is not None:
+        return _listener
+    
+    stderr_handler = logging.StreamHandler(sys.stderr)
+    stderr_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    handlers = [stderr_handler]
+    if log_file is not None:
+        file_handler = _file_handler(log_file)
+        if file_handler is not None:
+            handlers.append(file_handler)
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(RedactingQueueHandler(log_queue))
+    root.setLevel(getattr(logging, level.upper(), logging.INFO))
+    for name, module_level in (LOG_LEVELS if levels is None else levels).items():
+        logging.getLogger(name).setLevel(getattr(logging, module_level, logging.INFO))
+    
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(_listener.stop)
+    return _listener
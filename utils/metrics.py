@@ -0,0 +1,278 @@
+"""In-process metrics with Prometheus text exposition.
+
+A deliberately small subset of the Prometheus data model (counters, gauges
+and histograms with labels) so the server has no extra dependency. All
+metrics live in the module-level ``REGISTRY``; ``REGISTRY.render()`` produces
+the text exposition format served by ``/metrics`` and the ``server_metrics``
+tool.
+"""
+
+import bisect
+import math
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# Latency buckets in seconds, from cache hits to a stalled Eagle
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Payload size buckets in bytes, from short text to multi-megabyte Base64
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric(ABC):
+    """Base class holding per-label-set values."""
+    
+    type_name = ""
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+    
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+    
+    @abstractmethod
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        """Yield (sample name, formatted labels, value) triples."""
+        pass
+    
+    @abstractmethod
+    def snapshot(self) -> Any:
+        """Return a JSON-friendly view of the current values."""
+        pass
+    
+    @abstractmethod
+    def reset(self) -> None:
+        """Forget every recorded value."""
+        pass
+
+
+class Counter(_Metric):
+    """Monotonically increasing value."""
+    
+    type_name = "counter"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+    
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Increase the counter for the given labels."""
+        key = self._key(labels)
+        self._values[key] = self._values.get(key, 0.0) + amount
+    
+    def get(self, **labels: Any) -> float:
+        """Current value for the given labels."""
+        return self._values.get(self._key(labels), 0.0)
+    
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for key, value in sorted(self._values.items()):
+            yield self.name, _format_labels(self.labelnames, key), value
+    
+    def snapshot(self) -> Any:
+        return [dict(zip(self.labelnames, key), value=value) for key, value in sorted(self._values.items())]
+    
+    def reset(self) -> None:
+        self._values.clear()
+
+
+class Gauge(Counter):
+    """Value that can go up and down."""
+    
+    type_name = "gauge"
+    
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        """Decrease the gauge for the given labels."""
+        self.inc(-amount, **labels)
+    
+    def set(self, value: float, **labels: Any) -> None:
+        """Set the gauge for the given labels."""
+        self._values[self._key(labels)] = float(value)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution with running sum and count."""
+    
+    type_name = "histogram"
+    
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [bucket counts..., +Inf count], sum
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+    
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one observation."""
+        key = self._key(labels)
+        entry = self._values.get(key)
+        if entry is None:
+            entry = self._values[key] = ([0] * (len(self.buckets) + 1), [0.0])
+        counts, total = entry
+        counts[bisect.bisect_left(self.buckets, value)] += 1
+        total[0] += value
+    
+    def count(self, **labels: Any) -> int:
+        """Number of observations for the given labels."""
+        entry = self._values.get(self._key(labels))
+        return sum(entry[0]) if entry else 0
+    
+    def quantile(self, q: float, **labels: Any) -> Optional[float]:
+        """Estimate a quantile as the upper bound of the bucket containing it."""
+        entry = self._values.get(self._key(labels))
+        if not entry:
+            return None
+        counts = entry[0]
+        target = q * sum(counts)
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+            cumulative += bucket_count
+            if cumulative >= target:
+                return bound
+        return math.inf
+    
+    def samples(self) -> Iterable[Tuple[str, str, float]]:
+        for key, (counts, total) in sorted(self._values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, f'le="{_format_value(bound)}"')
+                yield f"{self.name}_bucket", labels, cumulative
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum", labels, total[0]
+            yield f"{self.name}_count", labels, cumulative
+    
+    def snapshot(self) -> Any:
+        result = []
+        for key, (counts, total) in sorted(self._values.items()):
+            labels = dict(zip(self.labelnames, key))
+            count = sum(counts)
+            result.append(dict(
+                labels,
+                count=count,
+                sum=total[0],
+                p50=self.quantile(0.5, **labels),
+                p95=self.quantile(0.95, **labels),
+                p99=self.quantile(0.99, **labels),
+            ))
+        return result
+    
+    def reset(self) -> None:
+        self._values.clear()
+
+
+class MetricsRegistry:
+    """Collection of metrics plus callbacks that refresh gauges on scrape."""
+    
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+    
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric, returning the already registered one if the name exists."""
+        return self._metrics.setdefault(metric.name, metric)
+    
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+    
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames))
+    
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+    
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        """Register a callback run before every render/snapshot (e.g. to set gauges)."""
+        self._collectors.append(collector)
+    
+    def _collect(self) -> None:
+        for collector in list(self._collectors):
+            collector()
+    
+    def render(self) -> str:
+        """Render every metric in Prometheus text exposition format."""
+        self._collect()
+        lines = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type_name}")
+            for sample_name, labels, value in metric.samples():
+                lines.append(f"{sample_name}{labels} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+    
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every metric as JSON-friendly data."""
+        self._collect()
+        return {name: metric.snapshot() for name, metric in self._metrics.items()}
+    
+    def reset(self) -> None:
+        """Clear all recorded values (collectors are kept)."""
+        for metric in self._metrics.values():
+            metric.reset()
+
+
+REGISTRY = MetricsRegistry()
+
+# Tool calls
+TOOL_CALLS = REGISTRY.counter(
+    "eagle_mcp_tool_calls_total", "MCP tool calls by tool and outcome", ("tool", "status"))
+TOOL_LATENCY = REGISTRY.histogram(
+    "eagle_mcp_tool_latency_seconds", "MCP tool call latency", ("tool",))
+TOOL_RESPONSE_BYTES = REGISTRY.histogram(
+    "eagle_mcp_tool_response_bytes", "MCP tool response payload size", ("tool",), SIZE_BUCKETS)
+TOOL_IN_FLIGHT = REGISTRY.gauge(
+    "eagle_mcp_tool_in_flight", "MCP tool calls currently executing", ("tool",))
+
+# Eagle HTTP requests
+EAGLE_REQUESTS = REGISTRY.counter(
+    "eagle_mcp_eagle_requests_total", "Eagle API requests by endpoint and outcome", ("endpoint", "method", "status"))
+EAGLE_LATENCY = REGISTRY.histogram(
+    "eagle_mcp_eagle_request_latency_seconds", "Eagle API request latency", ("endpoint", "method"))
+EAGLE_RESPONSE_BYTES = REGISTRY.histogram(
+    "eagle_mcp_eagle_response_bytes", "Eagle API response payload size", ("endpoint",), SIZE_BUCKETS)
+EAGLE_COALESCED = REGISTRY.counter(
+    "eagle_mcp_eagle_coalesced_total", "GET requests served by an identical in-flight request", ("endpoint",))
+EAGLE_RETRIES = REGISTRY.counter(
+    "eagle_mcp_eagle_retries_total", "Retried Eagle API requests", ("endpoint",))
+
+# Caches
+CACHE_EVENTS = REGISTRY.counter(
+    "eagle_mcp_cache_events_total", "Cache lookups by cache and result", ("cache", "result"))
+PREFETCH_ITEMS = REGISTRY.counter(
+    "eagle_mcp_prefetch_items_total", "Search results prefetched in the background", ("result",))
+
+# MCP resources
+RESOURCE_READS = REGISTRY.counter(
+    "eagle_mcp_resource_reads_total", "Resource reads by kind and outcome (ok, not_modified)", ("kind", "result"))
+
+# Eagle client state, refreshed on scrape
+EAGLE_CONCURRENCY_LIMIT = REGISTRY.gauge(
+    "eagle_mcp_eagle_concurrency_limit", "Current adaptive concurrency limit", ("budget",))
+EAGLE_IN_FLIGHT = REGISTRY.gauge(
+    "eagle_mcp_eagle_in_flight", "Eagle API requests currently in flight", ("budget",))
+EAGLE_QUEUE_DEPTH = REGISTRY.gauge(
+    "eagle_mcp_eagle_queue_depth", "Eagle API requests waiting for a concurrency slot", ("budget",))
+EAGLE_CIRCUIT_STATE = REGISTRY.gauge(
+    "eagle_mcp_eagle_circuit_state", "Circuit breaker state (1 for the current state)", ("state",))
@@ -0,0 +1,158 @@
+"""CJK-aware text normalisation for display and search.
+
+Names, tags and annotations go through two transformations:
+
+- ``display(text, width)``: control and zero-width characters removed, then
+  cut to a terminal display width (East Asian wide characters count as two
+  columns) without splitting a grapheme cluster, so a dakuten, an emoji ZWJ
+  sequence or a flag is never cut in half.
+- ``fold(text)``: the search key. NFKC (full-width ASCII and half-width
+  katakana become their usual forms), case folding, and katakana mapped to
+  hiragana, so "ｶﾒﾗ", "カメラ" and "かめら" all match each other.
+
+Both are memoised per unique string: a library repeats the same tags on
+thousands of items, and listings show the same names on every call, so
+after the first pass each lookup is a dict hit. ASCII strings take a fast
+path that skips the Unicode tables entirely.
+"""
+
+import unicodedata
+from functools import lru_cache
+from typing import Iterator, List
+
+from config import TEXT_CACHE_SIZE
+
+ELLIPSIS = "..."
+
+# Control characters (except tab and newline) and invisible formatting characters
+# that break terminal output. ZWJ (U+200D) is kept: emoji sequences need it.
+_CLEAN_TABLE = str.maketrans(dict.fromkeys(
+    [c for c in range(0x20) if c not in (0x09, 0x0A)] + list(range(0x7F, 0xA0))
+    + [0x200B, 0x200E, 0x200F, 0x2028, 0x2029, 0x2060, 0xFEFF]
+))
+
+# Katakana ァ..ヶ and the iteration marks ヽヾ map to hiragana ぁ..ゖ and ゝゞ
+_KANA_TABLE = str.maketrans({c: c - 0x60 for c in [*range(0x30A1, 0x30F7), 0x30FD, 0x30FE]})
+
+_ZWJ = "\u200d"
+
+
+def _is_extend(char: str) -> bool:
+    """Whether ``char`` attaches to the preceding character in a grapheme cluster."""
+    code = ord(char)
+    return (unicodedata.category(char) in ("Mn", "Me", "Mc")
+            or 0xFE00 <= code <= 0xFE0F          # variation selectors
+            or 0x1F3FB <= code <= 0x1F3FF        # emoji skin tone modifiers
+            or 0xE0020 <= code <= 0xE007F        # emoji tag sequences
+            or 0xE0100 <= code <= 0xE01EF        # ideographic variation selectors
+            or 0x1160 <= code <= 0x11FF)         # Hangul medial vowels and final consonants
+
+
+def _is_regional_indicator(char: str) -> bool:
+    return 0x1F1E6 <= ord(char) <= 0x1F1FF
+
+
+def graphemes(text: str) -> Iterator[str]:
+    """Split ``text`` into user-perceived characters (extended grapheme clusters).
+    
+    Covers what occurs in names and tags: combining marks (including the
+    combining dakuten), variation selectors, emoji modifiers and ZWJ
+    sequences, flag pairs and decomposed Hangul; other characters are
+    clusters of their own.
+    """
+    if text.isascii():
+        # CR LF is the only multi-character ASCII cluster
+        if "\r\n" not in text:
+            yield from text
+            return
+    cluster = ""
+    for char in text:
+        if not cluster:
+            cluster = char
+        elif (_is_extend(char) or char == _ZWJ or cluster[-1] == _ZWJ
+              or (cluster == "\r" and char == "\n")
+              or (_is_regional_indicator(char) and len(cluster) == 1 and _is_regional_indicator(cluster))):
+            cluster += char
+        else:
+            yield cluster
+            cluster = char
+    if cluster:
+        yield cluster
+
+
+def _char_width(char: str) -> int:
+    if unicodedata.east_asian_width(char) in ("W", "F"):
+        return 2
+    if unicodedata.category(char) in ("Mn", "Me", "Cf") or _is_extend(char):
+        return 0
+    return 1
+
+
+def cluster_width(cluster: str) -> int:
+    """Display columns of one grapheme cluster."""
+    if len(cluster) == 1:
+        return 1 if cluster.isascii() else _char_width(cluster)
+    if "\ufe0f" in cluster or _is_regional_indicator(cluster[0]):
+        # Emoji presentation and flags are drawn two columns wide
+        return 2
+    return _char_width(cluster[0]) or max(map(_char_width, cluster))
+
+
+def display_width(text: str) -> int:
+    """Terminal columns ``text`` takes up."""
+    if text.isascii():
+        return len(text)
+    return sum(map(cluster_width, graphemes(text)))
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def clean(text: str) -> str:
+    """``text`` without control and invisible formatting characters."""
+    return text.translate(_CLEAN_TABLE)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def truncate(text: str, max_width: int, ellipsis: str = ELLIPSIS) -> str:
+    """Cut ``text`` to ``max_width`` columns, ending with ``ellipsis`` if it was cut.
+    
+    Never splits a grapheme cluster.
+    """
+    if display_width(text) <= max_width:
+        return text
+    budget = max(0, max_width - display_width(ellipsis))
+    if text.isascii():
+        return text[:budget] + ellipsis
+    kept: List[str] = []
+    for cluster in graphemes(text):
+        budget -= cluster_width(cluster)
+        if budget < 0:
+            break
+        kept.append(cluster)
+    return "".join(kept) + ellipsis
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def display(text: str, max_width: int) -> str:
+    """``text`` cleaned for output and cut to ``max_width`` columns."""
+    return truncate(clean(text), max_width)
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def fold(text: str) -> str:
+    """Search key for ``text``: NFKC, case-folded, katakana as hiragana."""
+    if text.isascii():
+        return text.lower()
+    return unicodedata.normalize("NFKC", text).casefold().translate(_KANA_TABLE)
+
+
+def search_key(*parts: str) -> str:
+    """Folded ``parts`` joined by newlines, for substring search across all of them.
+    
+    A folded needle never matches across two parts unless it contains a newline.
+    """
+    return "\n".join([fold(part) for part in parts if part])
+
+
+def cache_info() -> dict:
+    """Hit and miss counts of the memoised transformations."""
+    return {function.__name__: function.cache_info()._asdict() for function in (clean, truncate, display, fold)}
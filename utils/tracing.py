@@ -0,0 +1,249 @@
+"""Span-based tracing of tool calls.
+
+A tool call produces a tree of spans (tool call -> handler -> Eagle GET ->
+HTTP attempt, file reads, Base64 encoding) so slow calls can be broken down.
+The current span is kept in a ``contextvars.ContextVar``, so spans opened in
+tasks spawned by a traced call (``asyncio.gather``, coalesced GETs) attach to
+the right parent without passing anything around.
+
+Finished traces can be appended to a JSONL file in the OpenTelemetry OTLP/JSON
+layout (one ``resourceSpans`` document per line, as written by the collector's
+file exporter), and the most recent slow traces are kept in memory for the
+``trace_last`` tool. Sampling is decided once per trace at the root span.
+"""
+
+import contextvars
+import functools
+import logging
+import random
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Union
+
+from config import MCP_SERVER_NAME, MCP_SERVER_VERSION, TRACE_EXPORT_PATH, TRACE_KEEP, TRACE_SAMPLE_RATE, TRACE_SLOW_THRESHOLD
+from utils import json_codec
+
+logger = logging.getLogger(__name__)
+
+# OTLP status codes
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+
+class Span:
+    """A timed operation within a trace."""
+    
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns",
+                 "attributes", "error", "_trace")
+    
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], trace: List["Span"]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+        # Every span of the trace, shared by all spans in it
+        self._trace = trace
+    
+    @property
+    def duration_ms(self) -> float:
+        """Elapsed time in milliseconds (up to now while still open)."""
+        end = self.end_ns if self.end_ns is not None else time.time_ns()
+        return (end - self.start_ns) / 1e6
+    
+    @property
+    def spans(self) -> List["Span"]:
+        """All spans recorded in this span's trace."""
+        return self._trace
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach a key/value attribute."""
+        self.attributes[key] = value
+    
+    def set_error(self, message: str) -> None:
+        """Mark the span as failed."""
+        self.error = message
+    
+    def to_otlp(self) -> Dict[str, Any]:
+        """Convert to an OTLP/JSON span."""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns if self.end_ns is not None else time.time_ns()),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": STATUS_ERROR, "message": self.error} if self.error else {"code": STATUS_OK},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+class _NoopSpan:
+    """Stand-in yielded for traces that were not sampled."""
+    
+    __slots__ = ()
+    
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+    
+    def set_error(self, message: str) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+_current_span: contextvars.ContextVar[Union[Span, _NoopSpan, None]] = contextvars.ContextVar(
+    "eagle_mcp_current_span", default=None
+)
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+class Tracer:
+    """Creates spans, samples traces and hands finished traces to the exporter."""
+    
+    def __init__(self, sample_rate: float = 1.0, export_path: Optional[Path] = None,
+                 slow_threshold: float = 1.0, keep: int = 20):
+        self.sample_rate = sample_rate
+        self.export_path = export_path
+        self.slow_threshold_ns = int(slow_threshold * 1e9)
+        self._slow: Deque[Span] = deque(maxlen=max(keep, 1))
+        self._export_file = None
+        self.traces_started = 0
+        self.traces_sampled = 0
+    
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Union[Span, _NoopSpan]]:
+        """Open a span as a child of the current one (or as a new trace root)."""
+        parent = _current_span.get()
+        if parent is NOOP_SPAN:
+            yield NOOP_SPAN
+            return
+        
+        if parent is None:
+            self.traces_started += 1
+            if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+                token = _current_span.set(NOOP_SPAN)
+                try:
+                    yield NOOP_SPAN
+                finally:
+                    _current_span.reset(token)
+                return
+            self.traces_sampled += 1
+            span = Span(name, f"{random.getrandbits(128):032x}", None, [])
+        else:
+            span = Span(name, parent.trace_id, parent.span_id, parent.spans)
+        
+        span.attributes.update(attributes)
+        span.spans.append(span)
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set_error(repr(e))
+            raise
+        finally:
+            span.end_ns = time.time_ns()
+            _current_span.reset(token)
+            if span.parent_id is None:
+                self._finish_trace(span)
+    
+    def _finish_trace(self, root: Span) -> None:
+        """Keep slow traces and export the finished trace."""
+        if root.end_ns - root.start_ns >= self.slow_threshold_ns:
+            self._slow.append(root)
+        if self.export_path is not None:
+            self._export(root)
+    
+    def _export(self, root: Span) -> None:
+        """Append the trace to the JSONL file as one OTLP/JSON document."""
+        document = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    _otlp_attribute("service.name", MCP_SERVER_NAME),
+                    _otlp_attribute("service.version", MCP_SERVER_VERSION),
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [span.to_otlp() for span in root.spans],
+                }],
+            }]
+        }
+        try:
+            if self._export_file is None:
+                self.export_path.parent.mkdir(parents=True, exist_ok=True)
+                self._export_file = open(self.export_path, "a", encoding="utf-8")
+            self._export_file.write(json_codec.dumps(document) + "\n")
+            self._export_file.flush()
+        except OSError as e:
+            logger.warning("Disabling trace export to %s: %s", self.export_path, e)
+            self.export_path = None
+    
+    def recent_slow(self, limit: int = 5) -> List[Span]:
+        """Root spans of the most recent slow traces, newest first."""
+        return list(reversed(self._slow))[:max(limit, 0)]
+    
+    def clear(self) -> None:
+        """Forget the retained slow traces."""
+        self._slow.clear()
+
+
+def span_tree(root: Span) -> Dict[str, Any]:
+    """Nest a trace's spans under their parents, in start order."""
+    children: Dict[Optional[str], List[Span]] = {}
+    for span in sorted(root.spans, key=lambda s: s.start_ns):
+        children.setdefault(span.parent_id, []).append(span)
+    
+    def build(span: Span) -> Dict[str, Any]:
+        node = {
+            "name": span.name,
+            "span_id": span.span_id,
+            "start_offset_ms": round((span.start_ns - root.start_ns) / 1e6, 3),
+            "duration_ms": round(span.duration_ms, 3),
+            "attributes": span.attributes,
+            "children": [build(child) for child in children.get(span.span_id, [])],
+        }
+        if span.error:
+            node["error"] = span.error
+        return node
+    
+    return build(root)
+
+
+TRACER = Tracer(TRACE_SAMPLE_RATE, TRACE_EXPORT_PATH, TRACE_SLOW_THRESHOLD, TRACE_KEEP)
+
+
+def span(name: str, **attributes: Any):
+    """Open a span on the global tracer (use as a ``with`` block)."""
+    return TRACER.span(name, **attributes)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Decorate a coroutine function so each call runs in its own span."""
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+        
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            with TRACER.span(span_name):
+                return await func(*args, **kwargs)
+        return wrapper
+    return decorator